@@ -0,0 +1,316 @@
+# src/array_store.py
+"""
+Store de Triplas Codificado por Dicionário, apoiado em arrays de inteiros.
+
+O store em memória padrão do rdflib mantém vários dicionários aninhados de
+objetos Python por tripla. Aqui cada URI, nó em branco ou literal é internado
+uma única vez como um id inteiro, e as triplas vivem em três permutações
+ordenadas (SPO, POS e OSP) guardadas em `array('I')` (3 inteiros de 32 bits por
+tripla em cada permutação). Um padrão como `(?, rec:executaAcao, ?)` ou
+`(?, rdf:type, rec:ZEIS)` vira uma busca binária na permutação cujo prefixo
+são os termos fixos, seguida de uma varredura contígua. O intervalo de linhas
+de cada primeiro id fica numa tabela por permutação, de modo que as buscas
+pontuais do raciocinador (`(s, p, ?)`, `(?, p, o)`, pertinência) não repetem a
+busca binária na permutação inteira.
+
+O store é pensado para leitura e economia de memória (bases carregadas por
+`src.parallel_load` ou `src.snapshot.load_graph`). Ele também serve de alvo do
+raciocinador, mas o `CompiledReasoner` ainda roda cerca de 1,5x mais devagar
+que no store `Memory`, pois cada consulta converte ids em termos. Para
+construir uma base grande, raciocine sobre o `Memory` e carregue o resultado
+aqui.
+
+Inserções e remoções ficam num buffer indexado por posição, consultado junto
+com as permutações, e só são intercaladas a elas quando o buffer cresce, de
+modo que cargas em lote (parse, inferência) pagam poucas ordenações. O store
+é registrado como plugin do rdflib:
+
+    Graph(store="ArrayStore")
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+
+from rdflib import plugin
+from rdflib.store import Store
+
+# Ordem dos componentes (s=0, p=1, o=2) em cada permutação
+PERMUTATIONS = {"spo": (0, 1, 2), "pos": (1, 2, 0), "osp": (2, 0, 1)}
+
+# Tamanho mínimo do buffer de escrita antes de intercalá-lo às permutações
+FLUSH_THRESHOLD = 4096
+
+
+def select_permutation(s, p, o):
+    """Permutação e prefixo de ids fixos que atendem ao padrão (ids ou None)."""
+    if s is not None:
+        if p is not None:
+            return "spo", (s, p) if o is None else (s, p, o)
+        if o is not None:
+            return "osp", (o, s)
+        return "spo", (s,)
+    if p is not None:
+        return "pos", (p,) if o is None else (p, o)
+    if o is not None:
+        return "osp", (o,)
+    return "spo", ()
+
+
+def range_scan(index, n_rows, prefix, lo=0, hi=None):
+    """
+    Linhas (em ordem da permutação) de `index` que começam por `prefix`.
+
+    `lo` e `hi` restringem a busca binária a um intervalo de linhas já
+    conhecido (ex: o do primeiro id do prefixo).
+    """
+    k = len(prefix)
+    if hi is None:
+        hi = n_rows
+    if k:
+        rows = range(n_rows)
+
+        def key(r):
+            return tuple(index[3 * r:3 * r + k])
+
+        lo = bisect_left(rows, prefix, lo, hi, key=key)
+        hi = bisect_right(rows, prefix, lo, hi, key=key)
+    for r in range(lo, hi):
+        yield index[3 * r], index[3 * r + 1], index[3 * r + 2]
+
+
+def to_spo(name, row):
+    """Converte uma linha da permutação `name` para a ordem (s, p, o)."""
+    spo = [0, 0, 0]
+    for position, i in zip(PERMUTATIONS[name], row):
+        spo[position] = i
+    return tuple(spo)
+
+
+class NamespaceBindings:
+    """Prefixos de um store não contextual (mesma semântica do store Memory)."""
+
+    def _init_namespaces(self):
+        self._namespace = {}
+        self._prefix = {}
+
+    def bind(self, prefix, namespace, override=True):
+        if not override and (prefix in self._namespace or namespace in self._prefix):
+            return
+        self._prefix.pop(self._namespace.pop(prefix, None), None)
+        self._namespace.pop(self._prefix.pop(namespace, None), None)
+        self._namespace[prefix] = namespace
+        self._prefix[namespace] = prefix
+
+    def namespace(self, prefix):
+        return self._namespace.get(prefix)
+
+    def prefix(self, namespace):
+        return self._prefix.get(namespace)
+
+    def namespaces(self):
+        return iter(list(self._namespace.items()))
+
+
+class ArrayStore(NamespaceBindings, Store):
+    """Store rdflib não contextual com termos internados e permutações ordenadas."""
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, configuration=None, identifier=None):
+        super().__init__(configuration, identifier)
+        self._init_namespaces()
+        self._ids = {}
+        self._terms = []
+        self._index = {name: array("I") for name in PERMUTATIONS}
+        self._n = 0
+        # Por permutação, intervalo de linhas de cada primeiro id (montado sob demanda)
+        self._ranges = {}
+        # Buffers de escrita, em ids na ordem (s, p, o). As inserções pendentes são
+        # indexadas por posição para que leituras não precisem intercalar o buffer.
+        self._pending_add = set()
+        self._pending_by = ({}, {}, {})
+        self._pending_remove = set()
+
+    @classmethod
+    def from_rows(cls, terms, rows):
+        """
+        Monta o store de uma vez, sem passar pelos buffers de escrita.
+
+        Args:
+            terms (list): Dicionário de termos; o id de cada termo é sua posição.
+            rows (iterable): Triplas em ids (s, p, o), sem repetições.
+        """
+        store = cls()
+        store._terms = list(terms)
+        store._ids = {term: i for i, term in enumerate(store._terms)}
+        rows = list(rows)
+        for name, order in PERMUTATIONS.items():
+            index = array("I")
+            for row in sorted(tuple(r[i] for i in order) for r in rows):
+                index.extend(row)
+            store._index[name] = index
+        store._n = len(rows)
+        return store
+
+    # -------------------------------------------------------------------------
+    # Dicionário de termos
+    # -------------------------------------------------------------------------
+
+    def _intern(self, term):
+        i = self._ids.get(term)
+        if i is None:
+            i = self._ids[term] = len(self._terms)
+            self._terms.append(term)
+        return i
+
+    def term(self, i):
+        return self._terms[i]
+
+    def term_id(self, term):
+        return self._ids.get(term)
+
+    # -------------------------------------------------------------------------
+    # Permutações e buffers
+    # -------------------------------------------------------------------------
+
+    def _first_range(self, name, first):
+        """
+        Intervalo de linhas da permutação `name` cujo primeiro id é `first`.
+
+        As buscas com termos fixos (as do raciocinador, ex: `(s, p, ?)` ou
+        `(?, p, o)`) partem deste intervalo em vez de fazer a busca binária na
+        permutação inteira com chaves montadas em Python. A tabela é refeita
+        na primeira busca depois de cada `flush`.
+        """
+        ranges = self._ranges.get(name)
+        if ranges is None:
+            ranges = self._ranges[name] = {}
+            firsts = self._index[name][::3]
+            lo = 0
+            for r in range(1, self._n + 1):
+                if r == self._n or firsts[r] != firsts[lo]:
+                    ranges[firsts[lo]] = (lo, r)
+                    lo = r
+        return ranges.get(first, (0, 0))
+
+    def _scan(self, name, prefix):
+        if not prefix:
+            return range_scan(self._index[name], self._n, prefix)
+        lo, hi = self._first_range(name, prefix[0])
+        # Com um só id fixo o intervalo já é a resposta, sem busca binária
+        return range_scan(self._index[name], self._n, prefix if len(prefix) > 1 else (), lo, hi)
+
+    def _in_base(self, row):
+        return any(True for _ in self._scan("spo", row))
+
+    def _pending_matches(self, ids):
+        """Inserções pendentes que casam com o padrão de ids."""
+        candidates = None
+        for position, i in enumerate(ids):
+            if i is not None:
+                rows = self._pending_by[position].get(i, ())
+                if candidates is None or len(rows) < len(candidates):
+                    candidates = rows
+        if candidates is None:
+            candidates = self._pending_add
+        return [row for row in candidates
+                if all(i is None or row[k] == i for k, i in enumerate(ids))]
+
+    def _buffer_add(self, row):
+        self._pending_add.add(row)
+        for position, i in enumerate(row):
+            self._pending_by[position].setdefault(i, set()).add(row)
+
+    def _buffer_discard(self, row):
+        self._pending_add.discard(row)
+        for position, i in enumerate(row):
+            self._pending_by[position][i].discard(row)
+
+    def flush(self):
+        """Intercala os buffers de escrita nas três permutações ordenadas."""
+        if not self._pending_add and not self._pending_remove:
+            return
+        removed = self._pending_remove
+        for name, order in PERMUTATIONS.items():
+            old = self._index[name]
+            base = (tuple(old[3 * r:3 * r + 3]) for r in range(self._n))
+            if removed:
+                dropped = {tuple(row[i] for i in order) for row in removed}
+                base = (row for row in base if row not in dropped)
+            added = sorted(tuple(row[i] for i in order) for row in self._pending_add)
+            new = array("I")
+            for row in merge(base, added):
+                new.extend(row)
+            self._index[name] = new
+        self._n = len(self._index["spo"]) // 3
+        self._ranges = {}
+        self._pending_add = set()
+        self._pending_by = ({}, {}, {})
+        self._pending_remove = set()
+
+    def _maybe_flush(self):
+        # O custo da intercalação é linear no tamanho do store: só vale a pena
+        # quando o buffer já é uma fração relevante dele
+        if len(self._pending_add) + len(self._pending_remove) > max(FLUSH_THRESHOLD, self._n // 4):
+            self.flush()
+
+    # -------------------------------------------------------------------------
+    # Interface de store
+    # -------------------------------------------------------------------------
+
+    def add(self, triple, context=None, quoted=False):
+        row = tuple(self._intern(t) for t in triple)
+        if row in self._pending_remove:
+            self._pending_remove.discard(row)
+        elif row not in self._pending_add and not self._in_base(row):
+            self._buffer_add(row)
+            self._maybe_flush()
+        super().add(triple, context, quoted)
+
+    def remove(self, triple_pattern, context=None):
+        for triple, _ in list(self.triples(triple_pattern)):
+            row = tuple(self._ids[t] for t in triple)
+            if row in self._pending_add:
+                self._buffer_discard(row)
+            else:
+                self._pending_remove.add(row)
+            super().remove(triple, context)
+        self._maybe_flush()
+
+    def triples(self, triple_pattern, context=None):
+        ids = []
+        for term in triple_pattern:
+            if term is None:
+                ids.append(None)
+            else:
+                i = self._ids.get(term)
+                if i is None:
+                    return
+                ids.append(i)
+        terms = self._terms
+        removed = self._pending_remove
+        name, prefix = select_permutation(*ids)
+        for row in self._scan(name, prefix):
+            s, p, o = spo = to_spo(name, row)
+            if removed and spo in removed:
+                continue
+            yield (terms[s], terms[p], terms[o]), iter(())
+        for s, p, o in self._pending_matches(ids):
+            yield (terms[s], terms[p], terms[o]), iter(())
+
+    def __len__(self, context=None):
+        return self._n + len(self._pending_add) - len(self._pending_remove)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def memory_usage(self):
+        """Bytes dos arrays de permutação (o dicionário de termos não entra na conta)."""
+        self.flush()
+        return sum(index.itemsize * len(index) for index in self._index.values())
+
+
+plugin.register("ArrayStore", Store, "src.array_store", "ArrayStore")
@@ -0,0 +1,66 @@
+# src/artifacts.py
+"""
+Gravação Assíncrona de Artefatos da Pipeline.
+
+As etapas da pipeline passam grafos umas às outras em memória; gravar cada
+um em disco (Turtle, snapshot) é só persistência e não precisa bloquear a
+etapa seguinte. O `ArtifactWriter` executa essas gravações, na ordem em que
+foram pedidas, numa única thread em segundo plano. Cada pedido recebe uma
+cópia do grafo feita no momento do pedido (copiar em memória custa uma fração
+da serialização), então a etapa seguinte pode continuar modificando o
+original. Erros de gravação são levantados em `wait`/`close`.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from rdflib import Graph
+
+
+def copy_graph(graph):
+    """Cópia em memória de um grafo, com os mesmos prefixos."""
+    copy = Graph()
+    for prefix, ns in graph.namespaces():
+        copy.bind(prefix, ns, override=True, replace=True)
+    copy.addN((s, p, o, copy) for s, p, o in graph)
+    return copy
+
+
+class ArtifactWriter:
+    """Fila de gravações executada em segundo plano, em ordem de chegada."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-writer")
+        self._futures = []
+
+    def submit(self, fn, *args, **kwargs):
+        """Agenda `fn(*args, **kwargs)` depois das gravações já pedidas."""
+        future = self._executor.submit(fn, *args, **kwargs)
+        self._futures.append(future)
+        return future
+
+    def write_graph(self, graph, path):
+        """
+        Agenda a serialização em Turtle de uma cópia de `graph`.
+
+        Args:
+            graph (rdflib.Graph): Grafo a gravar; pode ser modificado logo após a chamada.
+            path (str): Arquivo de destino.
+        """
+        return self.submit(copy_graph(graph).serialize, destination=path, format="turtle")
+
+    def wait(self):
+        """Espera todas as gravações pedidas; levanta o primeiro erro ocorrido."""
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,224 @@
+# src/backward_chaining.py
+"""
+Raciocínio em Tempo de Consulta (backward chaining) para a Ontologia de Conflitos Urbanos.
+
+Em vez de materializar todo o fechamento OWL-RL antes de consultar, o
+`BackwardChainingGraph` responde a cada padrão de tripla pedido pelo avaliador
+SPARQL do rdflib derivando, sob demanda, apenas as entailments daquele padrão:
+
+- rdf:type: hierarquia de classes (cax-sco/eqc) e tipagem por domínio/imagem
+- propriedades: subpropriedades (prp-spo1/eqp), simetria e transitividade
+
+Cada subobjetivo (instâncias de uma classe, tipos de um recurso, arestas de uma
+propriedade) é memoizado, então a memória cresce com os padrões efetivamente
+consultados e não com o fechamento completo. A TBox é fechada uma única vez na
+construção, usando as mesmas regras do `IncrementalReasoner`.
+"""
+from collections import defaultdict
+
+from rdflib import Graph, Literal, RDF
+from rdflib.paths import Path
+
+from src.equivalence_index import EquivalenceIndex
+from src.reasoner import (
+    IncrementalReasoner, META_CLASSES, RulePlan, SCHEMA_PREDICATES,
+)
+
+
+class BackwardChainingGraph(Graph):
+    """Visão somente-leitura de um grafo asserido que deriva entailments sob demanda."""
+
+    def __init__(self, asserted):
+        """
+        Args:
+            asserted (rdflib.Graph): Grafo asserido (schema + instâncias), sem inferência.
+        """
+        super().__init__(store=asserted.store, identifier=asserted.identifier,
+                         namespace_manager=asserted.namespace_manager)
+        self.asserted = asserted
+        self.reset()
+
+    def reset(self):
+        """
+        Recompila a TBox e descarta os subobjetivos memoizados.
+
+        Deve ser chamado quando o grafo asserido muda; `SPARQLQueryEngine` o faz
+        ao detectar uma nova versão do grafo.
+        """
+        # Fecha apenas a TBox, buscando-a pelos índices do grafo (sem varrer as instâncias)
+        self.tbox = Graph()
+        schema = [t for pred in SCHEMA_PREDICATES for t in self.asserted.triples((None, pred, None))]
+        schema += [t for cls in META_CLASSES for t in self.asserted.triples((None, RDF.type, cls))]
+        IncrementalReasoner(self.tbox).add(schema)
+        plan = self.plan = RulePlan(self.tbox)
+
+        self._subclasses = defaultdict(set)
+        for c, supers in plan.superclasses.items():
+            for sup in supers:
+                self._subclasses[sup].add(c)
+        self._subproperties = defaultdict(set)
+        for p, supers in plan.superproperties.items():
+            for sup in supers:
+                self._subproperties[sup].add(p)
+        self._domain_of = defaultdict(set)
+        self._range_of = defaultdict(set)
+        for p, classes in plan.domains.items():
+            for c in classes:
+                self._domain_of[c].add(p)
+        for p, classes in plan.ranges.items():
+            for c in classes:
+                self._range_of[c].add(p)
+
+        # Subobjetivos memoizados
+        self._edges = {}
+        self._instances = {}
+        self._types = {}
+
+    # -------------------------------------------------------------------------
+    # Subobjetivos
+    # -------------------------------------------------------------------------
+
+    def _derives(self, p):
+        """Indica se a propriedade tem alguma entailment além das triplas asseridas."""
+        return bool(self._subproperties.get(p)) or p in self.plan.symmetric or p in self.plan.transitive
+
+    def edges(self, p):
+        """Arestas entailed de `p` como (saída: s -> {o}, entrada: o -> {s})."""
+        if p in self._edges:
+            return self._edges[p]
+        # Marca o subobjetivo em andamento (propriedades equivalentes formam ciclos)
+        self._edges[p] = (defaultdict(set), defaultdict(set))
+
+        pairs = set(self.asserted.subject_objects(p))
+        for q in self._subproperties.get(p, ()):
+            if self._derives(q):
+                out = self.edges(q)[0]
+                pairs.update((s, o) for s, objs in out.items() for o in objs)
+            else:
+                pairs.update(self.asserted.subject_objects(q))
+
+        if p in self.plan.symmetric:
+            pairs |= {(o, s) for s, o in pairs}
+        if p in self.plan.transitive:
+            if p in self.plan.symmetric:
+                pairs = {(a, b) for cluster in EquivalenceIndex(pairs).clusters()
+                         for a in cluster for b in cluster}
+            else:
+                pairs = self._transitive_closure(pairs)
+
+        out, inn = self._edges[p]
+        for s, o in pairs:
+            out[s].add(o)
+            inn[o].add(s)
+        return out, inn
+
+    @staticmethod
+    def _transitive_closure(pairs):
+        succ = defaultdict(set)
+        for s, o in pairs:
+            succ[s].add(o)
+        closure = set()
+        for start in list(succ):
+            stack, seen = list(succ[start]), set()
+            while stack:
+                node = stack.pop()
+                if node in seen:
+                    continue
+                seen.add(node)
+                stack.extend(succ.get(node, ()))
+            closure.update((start, node) for node in seen)
+        return closure
+
+    def instances(self, cls):
+        """Todos os recursos entailed como instâncias de `cls`."""
+        if cls in self._instances:
+            return self._instances[cls]
+        members = set()
+        for c in self._subclasses.get(cls, set()) | {cls}:
+            members.update(self.asserted.subjects(RDF.type, c))
+        for p in self._domain_of.get(cls, ()):
+            members.update(self.edges(p)[0])
+        for p in self._range_of.get(cls, ()):
+            members.update(self.edges(p)[1])
+        self._instances[cls] = members
+        return members
+
+    def types(self, x):
+        """Todos os tipos entailed de `x` (inclui superclasses e owl:Thing)."""
+        if x in self._types:
+            return self._types[x]
+        plan = self.plan
+        direct = set(self.asserted.objects(x, RDF.type))
+        for q in set(self.asserted.predicates(x, None)):
+            direct |= plan.domains.get(q, frozenset())
+            for p in plan.superproperties.get(q, frozenset()) | {q}:
+                if p in plan.symmetric:
+                    direct |= plan.domains.get(p, frozenset()) | plan.ranges.get(p, frozenset())
+        for q in set(self.asserted.predicates(None, x)):
+            direct |= plan.ranges.get(q, frozenset())
+            for p in plan.superproperties.get(q, frozenset()) | {q}:
+                if p in plan.symmetric:
+                    direct |= plan.domains.get(p, frozenset()) | plan.ranges.get(p, frozenset())
+        types = set(direct)
+        for c in direct:
+            types |= plan.superclasses.get(c, frozenset())
+        self._types[x] = types
+        return types
+
+    def _predicates(self):
+        preds = set(self.asserted.predicates())
+        for p in list(preds):
+            preds |= self.plan.superproperties.get(p, frozenset())
+        preds.add(RDF.type)
+        return preds
+
+    # -------------------------------------------------------------------------
+    # Interface de grafo usada pelo avaliador SPARQL
+    # -------------------------------------------------------------------------
+
+    def triples(self, triple):
+        s, p, o = triple
+        if isinstance(p, Path):
+            for _s, _o in p.eval(self, s, o):
+                yield _s, p, _o
+        elif p is None:
+            for pred in self._predicates():
+                yield from self.triples((s, pred, o))
+        elif p == RDF.type:
+            yield from self._type_triples(s, o)
+        elif p in SCHEMA_PREDICATES:
+            yield from self.tbox.triples((s, p, o))
+        elif not self._derives(p):
+            yield from self.asserted.triples((s, p, o))
+        else:
+            out, inn = self.edges(p)
+            if s is not None:
+                for obj in out.get(s, ()):
+                    if o is None or o == obj:
+                        yield s, p, obj
+            elif o is not None:
+                for subj in inn.get(o, ()):
+                    yield subj, p, o
+            else:
+                for subj, objs in out.items():
+                    for obj in objs:
+                        yield subj, p, obj
+
+    def _type_triples(self, s, o):
+        if o in META_CLASSES:
+            yield from self.tbox.triples((s, RDF.type, o))
+        elif o is not None:
+            if s is None:
+                for x in self.instances(o):
+                    yield x, RDF.type, o
+            elif o in self.types(s):
+                yield s, RDF.type, o
+        elif s is not None:
+            for c in self.types(s):
+                yield s, RDF.type, c
+        else:
+            nodes = set(self.asserted.subjects()) | set(self.asserted.objects())
+            for x in nodes:
+                if not isinstance(x, Literal):
+                    for c in self.types(x):
+                        yield x, RDF.type, c
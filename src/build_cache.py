@@ -0,0 +1,105 @@
+# src/build_cache.py
+"""
+Cache de Artefatos da Pipeline por Hash de Conteúdo.
+
+Cada etapa (schema → instâncias → inferência) é identificada por uma chave
+calculada a partir de tudo o que determina seu resultado: o código-fonte da
+etapa, as versões das bibliotecas, os parâmetros e a chave da etapa anterior
+(que por sua vez resume tudo o que determinou o artefato dela). Como a chave
+não depende do artefato anterior já estar em disco, as etapas podem passar
+grafos em memória e gravar os arquivos em segundo plano. O manifesto (JSON)
+guarda, por etapa, a última chave e o hash de cada arquivo produzido; se a
+chave coincide e os arquivos continuam em disco com o mesmo conteúdo, a etapa
+é pulada e o artefato existente é reutilizado.
+
+Ao final, `format_report` resume quais etapas foram acertos (hit) ou falhas
+(miss) do cache e quanto tempo cada uma levou.
+"""
+import hashlib
+import inspect
+import json
+import os
+
+# Bytes lidos por vez ao calcular o hash de um arquivo
+READ_SIZE = 1 << 20
+
+
+def file_hash(path):
+    """SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_hash(*objects):
+    """SHA-256 do código-fonte de funções, classes ou módulos (a "versão do código" de uma etapa)."""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def fingerprint(*parts):
+    """Chave de uma etapa: SHA-256 da representação de suas entradas."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class BuildCache:
+    """Manifesto de chaves e artefatos por etapa, com relatório de hits/misses."""
+
+    def __init__(self, manifest_path, enabled=True):
+        """
+        Args:
+            manifest_path (str): Arquivo JSON do manifesto.
+            enabled (bool): Se False, toda etapa é executada (e o manifesto atualizado).
+        """
+        self.manifest_path = manifest_path
+        self.enabled = enabled
+        self.manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self.report = []
+        self._pending = {}
+
+    def is_hit(self, stage, key):
+        """Indica se a etapa tem a mesma chave e todos os artefatos intactos."""
+        entry = self.manifest.get(stage)
+        if not self.enabled or entry is None or entry["key"] != key:
+            return False
+        return all(os.path.exists(path) and file_hash(path) == digest
+                   for path, digest in entry["outputs"].items())
+
+    def check(self, stage, inputs):
+        """Chave da etapa para estas entradas e se ela é um acerto do cache."""
+        key = fingerprint(stage, *inputs)
+        return key, self.is_hit(stage, key)
+
+    def record(self, stage, key, outputs):
+        """Registra os artefatos de uma etapa refeita; seus hashes são calculados em `save`."""
+        self._pending[stage] = (key, outputs)
+
+    def log(self, stage, key, hit, elapsed):
+        """Acrescenta uma etapa ao relatório."""
+        self.report.append({"stage": stage, "status": "hit" if hit else "miss", "key": key[:12],
+                            "time": elapsed})
+
+    def save(self):
+        """Grava o manifesto; os artefatos registrados já devem estar em disco."""
+        for stage, (key, outputs) in self._pending.items():
+            self.manifest[stage] = {
+                "key": key,
+                "outputs": {path: file_hash(path) for path in outputs if os.path.exists(path)},
+            }
+        self._pending = {}
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def format_report(self):
+        """Tabela das etapas executadas nesta sessão: status, prefixo da chave e tempo."""
+        lines = [f"{'Etapa':<12} {'Cache':<6} {'Chave':<14} Tempo"]
+        for entry in self.report:
+            lines.append(f"{entry['stage']:<12} {entry['status']:<6} {entry['key']:<14} {entry['time']:.3f}s")
+        return "\n".join(lines)
@@ -14,20 +14,80 @@ Pipeline de Execução:
 3. Inferência Lógica (OWL-RL Reasoner)
 4. Validação e Consultas
 """
+import importlib
+import importlib.metadata
+import inspect
 import time
 import os
+import rdflib
 from rdflib import Graph, Namespace, Literal, RDF, RDFS, OWL, XSD
-import owlrl
+
+try:
+    from src.artifacts import ArtifactWriter, copy_graph
+    from src.build_cache import BuildCache, file_hash, source_hash
+    from src.ingestion import ingest
+    from src.justifications import JustificationStore
+    from src.profiling import RuleProfile
+    from src.snapshot import load_graph, snapshot_path_for, write_snapshot
+    from src.sqlite_store import copy_kb, is_sqlite_path, open_kb
+    from src.streaming import is_line_based, load_ntriples, write_ntriples
+except ImportError:  # execução direta: python src/build_knowledge_base.py
+    from artifacts import ArtifactWriter, copy_graph
+    from build_cache import BuildCache, file_hash, source_hash
+    from ingestion import ingest
+    from justifications import JustificationStore
+    from profiling import RuleProfile
+    from snapshot import load_graph, snapshot_path_for, write_snapshot
+    from sqlite_store import copy_kb, is_sqlite_path, open_kb
+    from streaming import is_line_based, load_ntriples, write_ntriples
 
 # --- SETUP DE CAMINHOS ROBUSTOS ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
-os.makedirs(DATA_DIR, exist_ok=True)
+
+JUSTIFICATIONS_PATH = os.path.join(DATA_DIR, "kb_conflito_v5_justificativas.pkl")
+PROFILE_PATH = os.path.join(DATA_DIR, "kb_conflito_v5_inferido.profile.json")
+BUILD_CACHE_PATH = os.path.join(DATA_DIR, "build_cache.json")
 
 # Namespace principal
 REC = Namespace("http://recife.leg.br/ontologia-conflito#")
 
+def _lazy(module):
+    """
+    Importa um módulo de src/ no primeiro uso.
+
+    Os motores de inferência (e, com eles, o owlrl) só são necessários para
+    construir a base; quem importa este módulo apenas pelas constantes ou
+    pelas funções de leitura não paga por eles.
+    """
+    try:
+        return importlib.import_module(f"src.{module}")
+    except ImportError:  # execução direta: python src/build_knowledge_base.py
+        return importlib.import_module(module)
+
+def _ensure_data_dir():
+    os.makedirs(DATA_DIR, exist_ok=True)
+
 def build_schema():
+    """
+    Constrói o schema (ver `schema_graph`) e o salva em Turtle.
+
+    Returns:
+        str: Caminho do schema salvo.
+    """
+    g = schema_graph()
+    _ensure_data_dir()
+    output_path = os.path.join(DATA_DIR, "ontologia_conflito_urbano_schema_v5.ttl")
+    g.serialize(destination=output_path, format="turtle")
+    
+    print("\n" + "=" * 80)
+    print(f"✓ SCHEMA V5 COMPLETO SALVO EM: {output_path}")
+    print(f"✓ Total de triplas (axiomas + definições): {len(g)}")
+    print("=" * 80)
+    
+    return output_path
+
+def schema_graph():
     """
     Constrói o Schema Completo da Ontologia com 7 Eixos Temáticos.
     
@@ -489,20 +549,57 @@ def build_schema():
     g.add((REC.classifica, RDFS.range, REC.EspacoDeConflito))
     g.add((REC.classifica, RDFS.comment, Literal("Categoria normativa classifica um espaço físico (ex: Categoria_ZEIS classifica ZEIS_Coque)")))
     
-    # =========================================================================
-    # SALVAR SCHEMA
-    # =========================================================================
-    output_path = os.path.join(DATA_DIR, "ontologia_conflito_urbano_schema_v5.ttl")
-    g.serialize(destination=output_path, format="turtle")
+    return g
+
+def _load(g, path):
+    """Carrega `path` em `g`: Turtle, ou N-Triples/N-Quads lidos em blocos."""
+    if is_line_based(path):
+        load_ntriples(g, path)
+    else:
+        g.parse(path, format="turtle")
+
+def populate_instances(schema_path, store_path=None, data_paths=()):
+    """
+    Carrega o schema, instancia o caso de estudo (ver `instantiate`) e salva a base.
+
+    Args:
+        schema_path (str): Caminho do schema (Turtle).
+        store_path (str, opcional): Base SQLite (ver `src.sqlite_store`) a gravar em vez
+            do Turtle; schema e instâncias entram numa única transação.
+        data_paths (list[str]): Arquivos CSV/JSON-Lines de entidades e relações
+            (ex: dados abertos da prefeitura) carregados em lote após o caso de
+            estudo e validados contra o schema (ver `src.ingestion`).
+
+    Returns:
+        str: Caminho da base asserida salva.
+    """
+    g = _open_store(store_path) if store_path else Graph()
+    _load(g, schema_path)
+    instantiate(g, data_paths)
+    
+    if store_path:
+        output_path = store_path
+        g.commit()
+    else:
+        _ensure_data_dir()
+        output_path = os.path.join(DATA_DIR, "kb_conflito_v5_final.ttl")
+        g.serialize(destination=output_path, format="turtle")
     
     print("\n" + "=" * 80)
-    print(f"✓ SCHEMA V5 COMPLETO SALVO EM: {output_path}")
-    print(f"✓ Total de triplas (axiomas + definições): {len(g)}")
+    print(f"✓ BASE DE CONHECIMENTO INSTANCIADA SALVA EM: {output_path}")
+    print(f"✓ Total de triplas (schema + instâncias): {len(g)}")
     print("=" * 80)
+    g.close()
     
     return output_path
 
-def populate_instances(schema_path):
+def _open_store(store_path):
+    """Abre a base SQLite da etapa de instâncias, vazia."""
+    g = open_kb(store_path)
+    g.remove((None, None, None))
+    return g
+
+def instantiate(g, data_paths=()):
     """
     Instancia o Conflito Urbano Real: PREZEIS vs Remembramento.
     
@@ -510,14 +607,18 @@ def populate_instances(schema_path):
     - Lei do PREZEIS (1995): Protege comunidades de baixa renda
     - Lei do Remembramento (2020): Permite fusão de lotes em ZEIS
     - CONFLITO: Remembramento pode facilitar gentrificação
+
+    Args:
+        g (rdflib.Graph): Grafo com o schema; as instâncias são adicionadas a ele.
+        data_paths (list[str]): Arquivos de dados tabulares; ver `populate_instances`.
+
+    Returns:
+        rdflib.Graph: O próprio `g`.
     """
     print("\n" + "=" * 80)
     print("INSTANCIANDO CONFLITO URBANO: PREZEIS vs REMEMBRAMENTO")
     print("=" * 80)
     
-    g = Graph()
-    g.parse(schema_path, format="turtle")
-    
     # =========================================================================
     # AGENTES DO CONFLITO
     # =========================================================================
@@ -716,46 +817,370 @@ def populate_instances(schema_path):
            Literal("Fiscalizar e impugnar atos que violem o interesse público")))
     
     # =========================================================================
-    # SALVAR BASE DE CONHECIMENTO
+    # DADOS TABULARES (INGESTÃO EM LOTE)
     # =========================================================================
-    output_path = os.path.join(DATA_DIR, "kb_conflito_v5_final.ttl")
-    g.serialize(destination=output_path, format="turtle")
-    
-    print("\n" + "=" * 80)
-    print(f"✓ BASE DE CONHECIMENTO INSTANCIADA SALVA EM: {output_path}")
-    print(f"✓ Total de triplas (schema + instâncias): {len(g)}")
-    print("=" * 80)
-    
-    return output_path
+    if data_paths:
+        print("\n[INGESTÃO] Carregando arquivos de dados...")
+        report = ingest(g, data_paths)
+        print(f"Registros lidos: {report['records']} | Triplas gravadas: {report['triples']}"
+              f" | Registros rejeitados: {report['rejected']}")
+        for error in report["errors"]:
+            print(f"⚠️  {error}")
+    
+    return g
 
-def run_inference(kb_path):
-    """Executa o reasoner OWL e salva o grafo inferido."""
-    print("\n--- Passo 3: Executando o Reasoner OWL DL ---")
-    g = Graph()
-    g.parse(kb_path, format="turtle")
-    triplas_antes = len(g)
-    print(f"Triplas antes da inferência: {triplas_antes}")
+def run_inference(kb_path, incremental=False, reasoner="compiled", collapse_equivalences=False,
+                  workers=None, justify=False, max_justifications=None, profile=False, lean=False,
+                  snapshot=True, dump_path=None, graph=None, writer=None):
+    """
+    Executa o reasoner OWL e salva o grafo inferido.
 
-    start_time = time.time()
-    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
-    elapsed_time = time.time() - start_time
+    Args:
+        kb_path (str): Caminho da base asserida (schema + instâncias).
+        incremental (bool): Se True e já houver um grafo inferido anterior, reaproveita-o
+            e materializa apenas as consequências das triplas novas (ver `src.reasoner`).
+            Remoções de triplas asseridas não são detectadas neste modo; para elas
+            use `retract_assertions`.
+        reasoner (str): Motor do fechamento completo: "compiled" (regras compiladas a
+            partir do schema), "parallel" (regras compiladas particionadas em um pool
+            de processos) ou "owlrl" (DeductiveClosure genérico). Os motores compilados
+            recorrem ao owlrl se o grafo usar construtos que eles não cobrem.
+        collapse_equivalences (bool): Com o motor compilado, não materializa o fechamento
+            de propriedades simétricas e transitivas (coincideCom); as consultas de
+            sobreposição resolvem os grupos pelo índice de equivalência.
+        workers (int, opcional): Número de processos do motor "parallel" (padrão: nº de CPUs).
+        justify (bool): Registra a regra e as premissas de cada tripla inferida e as salva
+            em JUSTIFICATIONS_PATH, para consulta com `explain`. Desligado por padrão;
+            com ele o motor "parallel" dá lugar ao "compiled" e o "owlrl" não registra nada.
+        max_justifications (int, opcional): Limite de triplas no store de justificativas.
+        profile (bool): Grava em PROFILE_PATH um relatório JSON com disparos, triplas
+            novas/duplicadas e tempo por regra, e iterações até o ponto fixo por fase.
+        lean (bool): Modo enxuto dos motores compilados e incremental: nunca gera
+            tipagens owl:Thing, owl:sameAs reflexivo, triplas axiomáticas de datatypes
+            nem tipagens de literais, que nenhuma consulta lê. No modo incremental, o
+            grafo anterior deve ter sido gerado com o mesmo valor.
+        snapshot (bool): Grava também o snapshot binário do grafo inferido
+            (kb_conflito_v5_inferido.kbsnap), aberto via mmap por `src.snapshot.load_graph`.
+        dump_path (str, opcional): Exporta também o grafo inferido em N-Triples
+            (`.nt`, ou `.nt.gz` comprimido), gravado tripla a tripla por `src.streaming`.
+        graph (rdflib.Graph, opcional): A base asserida já em memória (ex: devolvida por
+            `instantiate`); dispensa a leitura de `kb_path` e é expandida no lugar.
+        writer (ArtifactWriter, opcional): Grava o Turtle, o snapshot e o dump em
+            segundo plano (ver `src.artifacts`) em vez de bloquear o retorno.
+
+    `kb_path` pode ser Turtle ou N-Triples/N-Quads (`.nt`, `.nq`, com `.gz` opcional);
+    estes são lidos em blocos de tamanho fixo. Se for uma base SQLite (`src.sqlite_store`),
+    o grafo inferido também é: kb_conflito_v5_inferido.sqlite, uma cópia da base asserida
+    expandida no lugar e confirmada numa única transação, sem Turtle nem snapshot.
+    """
+    if reasoner not in ("compiled", "parallel", "owlrl"):
+        raise ValueError(f"Reasoner desconhecido: {reasoner}")
+    if lean and reasoner == "owlrl":
+        raise ValueError("O modo enxuto exige um motor compilado ('compiled' ou 'parallel').")
+    _ensure_data_dir()
+    sqlite = is_sqlite_path(kb_path)
+    output_path = os.path.join(DATA_DIR, "kb_conflito_v5_inferido" + (".sqlite" if sqlite else ".ttl"))
+    justifications = None
+    if justify:
+        if incremental and os.path.exists(output_path) and os.path.exists(JUSTIFICATIONS_PATH):
+            justifications = JustificationStore.load(JUSTIFICATIONS_PATH)
+        else:
+            justifications = JustificationStore(max_entries=max_justifications)
+        if reasoner == "parallel":
+            reasoner = "compiled"
+    rule_profile = RuleProfile() if profile else None
+
+    if incremental and os.path.exists(output_path):
+        print("\n--- Passo 3: Inferência Incremental (semi-naive) ---")
+        if sqlite:
+            g = open_kb(output_path)
+            asserted = graph if graph is not None else open_kb(kb_path, read_only=True)
+        else:
+            g = Graph()
+            g.parse(output_path, format="turtle")
+            asserted = graph
+            if asserted is None:
+                asserted = Graph()
+                _load(asserted, kb_path)
+        triplas_antes = len(g)
+        novas = [t for t in asserted if t not in g]
+        if asserted is not graph:
+            asserted.close()
+        print(f"Triplas no grafo inferido anterior: {triplas_antes}")
+        print(f"Triplas asseridas novas: {len(novas)}")
 
-    triplas_depois = len(g)
-    print(f"Triplas depois da inferência: {triplas_depois}")
-    print(f"Novas triplas inferidas: {triplas_depois - triplas_antes}")
-    print(f"Inferência concluída em {elapsed_time:.3f} segundos.")
+        start_time = time.time()
+        checker = _lazy("consistency").ConsistencyChecker(g, materialized=True)
+        violations = checker.add(novas)
+        reasoner_incremental = _lazy("reasoner").IncrementalReasoner(g, justifications=justifications, profile=rule_profile,
+                                                   lean=lean, collapse_equivalences=collapse_equivalences)
+        if rule_profile is not None:
+            with rule_profile.phase("incremental"):
+                delta = reasoner_incremental.add(novas)
+        else:
+            delta = reasoner_incremental.add(novas)
+        elapsed_time = time.time() - start_time
+        print(f"Novas triplas inferidas: {len(delta['inferred'])}")
+        print(f"Inferência incremental concluída em {elapsed_time:.3f} segundos.")
+        for v in violations:
+            print(f"⚠️  Violação de disjunção: {v.individual} é {v.class1} e {v.class2} (tripla: {v.triple})")
+    else:
+        print("\n--- Passo 3: Executando o Reasoner OWL DL ---")
+        if graph is not None:
+            g = graph
+        elif sqlite:
+            copy_kb(kb_path, output_path)
+            g = open_kb(output_path)
+        else:
+            g = Graph()
+            _load(g, kb_path)
+        triplas_antes = len(g)
+        print(f"Triplas antes da inferência: {triplas_antes}")
+
+        start_time = time.time()
+        if reasoner in ("compiled", "parallel"):
+            engines = _lazy("reasoner")
+            try:
+                if reasoner == "parallel":
+                    engine = engines.ParallelReasoner(g, workers=workers, collapse_equivalences=collapse_equivalences,
+                                              profile=rule_profile, lean=lean)
+                else:
+                    engine = engines.CompiledReasoner(g, collapse_equivalences=collapse_equivalences,
+                                              justifications=justifications, profile=rule_profile,
+                                              lean=lean)
+                engine.expand()
+            except engines.UnsupportedConstructError as e:
+                print(f"⚠️  Motor compilado indisponível ({e}); usando owlrl.")
+                reasoner = "owlrl"
+        if reasoner == "owlrl" and justifications is not None:
+            print("⚠️  O owlrl não registra justificativas.")
+            justifications = None
+        if reasoner == "owlrl":
+            import owlrl
+            if rule_profile is not None:
+                # O owlrl não expõe contadores por regra: só o tempo da fase
+                with rule_profile.phase("owlrl"):
+                    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+            else:
+                owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+        elapsed_time = time.time() - start_time
+
+        triplas_depois = len(g)
+        print(f"Triplas depois da inferência: {triplas_depois}")
+        print(f"Novas triplas inferidas: {triplas_depois - triplas_antes}")
+        print(f"Inferência concluída em {elapsed_time:.3f} segundos.")
 
     # SALVAR
-    output_path = os.path.join(DATA_DIR, "kb_conflito_v5_inferido.ttl")
+    if sqlite:
+        g.commit()
+        print(f"✓ Grafo inferido salvo em: {output_path}")
+        if dump_path:
+            _dump(g, dump_path)
+    elif writer is not None:
+        writer.submit(_save_inferred, copy_graph(g), output_path, snapshot, dump_path)
+        print(f"Gravação do grafo inferido agendada em segundo plano: {output_path}")
+    else:
+        _save_inferred(g, output_path, snapshot, dump_path)
+    if justifications is not None:
+        justifications.save(JUSTIFICATIONS_PATH)
+        print(f"Justificativas: {len(justifications)} triplas, "
+              f"{justifications.memory_usage() / 1024:.1f} KiB em memória"
+              + (f", {justifications.dropped} descartadas pelo limite" if justifications.dropped else ""))
+        print(f"✓ Justificativas salvas em: {JUSTIFICATIONS_PATH}")
+    if rule_profile is not None:
+        rule_profile.save(PROFILE_PATH)
+        print(f"✓ Perfil de regras salvo em: {PROFILE_PATH}")
+    if g is not graph:
+        g.close()
+    return output_path
+
+def _dump(g, dump_path):
+    count = write_ntriples(g, dump_path)
+    print(f"✓ Dump N-Triples ({count} triplas) salvo em: {dump_path}")
+
+def _save_inferred(g, output_path, snapshot, dump_path):
+    """Grava o grafo inferido em Turtle e, opcionalmente, o snapshot e o dump N-Triples."""
     g.serialize(destination=output_path, format="turtle")
     print(f"✓ Grafo inferido salvo em: {output_path}")
-    return output_path
+    if snapshot:
+        snapshot_path = write_snapshot(g, snapshot_path_for(output_path), source_path=output_path)
+        print(f"✓ Snapshot binário salvo em: {snapshot_path}")
+    if dump_path:
+        _dump(g, dump_path)
+
+def explain(triple, justifications_path=JUSTIFICATIONS_PATH):
+    """
+    Árvore de prova de uma tripla inferida, lida do store salvo por `run_inference(justify=True)`.
+
+    Args:
+        triple (tuple): Tripla (s, p, o) do grafo inferido.
+        justifications_path (str): Caminho do store de justificativas.
+
+    Returns:
+        dict: {"triple", "rule", "premises"}; ver `JustificationStore.explain`.
+    """
+    return JustificationStore.load(justifications_path).explain(triple)
+
+def retract_assertions(triples, kb_path=None, lean=False, collapse_equivalences=False, history_path=None,
+                       revision_name=None):
+    """
+    Retira triplas asseridas (ex: de uma lei revogada) da base asserida e da inferida.
+
+    Usa over-delete/rederive (DRed): removem-se apenas as inferências que não têm
+    mais nenhuma derivação a partir do que resta, sem refazer o fechamento completo.
+    Os nós de inconsistência (cax-dw) são refeitos para o grafo resultante.
+
+    Args:
+        triples (iterable): Triplas (s, p, o) asseridas a retirar.
+        kb_path (str, opcional): Caminho da base asserida (padrão: kb_conflito_v5_final.ttl).
+            Se for uma base SQLite, a inferida (kb_conflito_v5_inferido.sqlite) é
+            alterada no lugar; com Turtle, a inferida é lida pelo snapshot quando ele
+            está em dia, e Turtle e snapshot são regravados.
+        lean (bool): A base inferida foi gerada no modo enxuto (ver `run_inference`).
+        collapse_equivalences (bool): A base inferida foi gerada sem o fechamento das
+            propriedades simétricas e transitivas (ver `run_inference`).
+        history_path (str, opcional): Base versionada (ver `src.versioning`) onde o
+            grafo inferido resultante é gravado como uma nova revisão.
+        revision_name (str, opcional): Nome dessa revisão (ex: a lei revogadora).
+
+    Returns:
+        dict: Resultado de `IncrementalReasoner.retract`, com as inconsistências atuais em "errors".
+    """
+    kb_path = kb_path or os.path.join(DATA_DIR, "kb_conflito_v5_final.ttl")
+    sqlite = is_sqlite_path(kb_path)
+    output_path = os.path.join(DATA_DIR, "kb_conflito_v5_inferido" + (".sqlite" if sqlite else ".ttl"))
+    print("\n--- Retração de Asserções (DRed) ---")
+    if sqlite:
+        asserted = open_kb(kb_path)
+        g = open_kb(output_path)
+    else:
+        asserted = Graph()
+        _load(asserted, kb_path)
+        stored = load_graph(output_path)
+        g = copy_graph(stored)
+        stored.close()
+
+    justifications = None
+    if os.path.exists(JUSTIFICATIONS_PATH):
+        justifications = JustificationStore.load(JUSTIFICATIONS_PATH)
+
+    start_time = time.time()
+    engines = _lazy("reasoner")
+    result = engines.IncrementalReasoner(g, asserted=asserted, justifications=justifications, lean=lean,
+                                         collapse_equivalences=collapse_equivalences).retract(triples)
+    result["errors"] = engines.refresh_error_messages(g)
+    elapsed_time = time.time() - start_time
+    for t in result["retracted"]:
+        asserted.remove(t)
+    print(f"Triplas asseridas retiradas: {len(result['retracted'])}")
+    print(f"Triplas removidas do grafo inferido: {len(result['removed'])}")
+    print(f"Triplas rederivadas: {len(result['rederived'])}")
+    print(f"Inconsistências restantes: {len(result['errors'])}")
+    print(f"Retração concluída em {elapsed_time:.3f} segundos.")
+
+    if sqlite:
+        asserted.commit()
+        g.commit()
+        print(f"✓ Grafo inferido salvo em: {output_path}")
+    else:
+        asserted.serialize(destination=kb_path, format="turtle")
+        _save_inferred(g, output_path, os.path.exists(snapshot_path_for(output_path)), None)
+    if history_path is not None:
+        history = _lazy("versioning").open_versioned(history_path)
+        try:
+            rev = history.commit_revision(g, name=revision_name)
+        finally:
+            history.close()
+        print(f"✓ Revisão {rev} gravada em: {history_path}")
+    if justifications is not None:
+        justifications.save(JUSTIFICATIONS_PATH)
+    asserted.close()
+    g.close()
+    return result
+
+def main(incremental=False, store_path=None, use_cache=True, data_paths=(), wait=True):
+    """
+    Executa a pipeline completa.
+
+    As etapas passam o grafo umas às outras em memória (schema → instâncias →
+    inferência), sem serializar e reler Turtle entre elas; os artefatos são
+    gravados em segundo plano por um `ArtifactWriter`. Cada etapa é pulada
+    quando seu código, suas bibliotecas, seus parâmetros e a etapa anterior não
+    mudaram desde a última execução (ver `src.build_cache`); ao final é
+    impresso o relatório de hits/misses.
+
+    Args:
+        incremental (bool): Ver `run_inference`.
+        store_path (str, opcional): Base SQLite usada entre as etapas no lugar do Turtle;
+            nesse caso ela própria é o meio de passagem e as escritas são síncronas.
+        use_cache (bool): Se False, executa todas as etapas (e atualiza o cache).
+        data_paths (list[str]): Arquivos de dados tabulares; ver `populate_instances`.
+        wait (bool): Espera as gravações em segundo plano antes de retornar. Com False,
+            elas (e a atualização do manifesto do cache) terminam na thread de
+            gravação, que o interpretador aguarda ao encerrar.
+    """
+    _ensure_data_dir()
+    cache = BuildCache(BUILD_CACHE_PATH, enabled=use_cache)
+    writer = ArtifactWriter()
+    versions = (rdflib.__version__, importlib.metadata.version("owlrl"))
+    # Grafo produzido pela última etapa refeita; None se ela veio do cache
+    g = None
+
+    schema_file = os.path.join(DATA_DIR, "ontologia_conflito_urbano_schema_v5.ttl")
+    start = time.perf_counter()
+    key, hit = cache.check("schema", [source_hash(build_schema, schema_graph), versions])
+    if not hit:
+        g = schema_graph()
+        writer.write_graph(g, schema_file)
+        cache.record("schema", key, [schema_file])
+    cache.log("schema", key, hit, time.perf_counter() - start)
+
+    kb_file = store_path or os.path.join(DATA_DIR, "kb_conflito_v5_final.ttl")
+    start = time.perf_counter()
+    code = source_hash(populate_instances, instantiate, _load, _open_store, inspect.getmodule(ingest))
+    key, hit = cache.check("instances", [code, versions, key, store_path, [file_hash(p) for p in data_paths]])
+    if not hit:
+        if g is None:
+            writer.wait()
+            g = Graph()
+            _load(g, schema_file)
+        if store_path:
+            schema, g = g, _open_store(store_path)
+            for prefix, ns in schema.namespaces():
+                g.bind(prefix, ns)
+            g.addN((s, p, o, g) for s, p, o in schema)
+            instantiate(g, data_paths)
+            g.commit()
+            g.close()
+            g = None
+        else:
+            instantiate(g, data_paths)
+            writer.write_graph(g, kb_file)
+        cache.record("instances", key, [kb_file])
+    else:
+        g = None
+    cache.log("instances", key, hit, time.perf_counter() - start)
+
+    inferred_file = os.path.join(DATA_DIR, "kb_conflito_v5_inferido" + (".sqlite" if store_path else ".ttl"))
+    outputs = [inferred_file] if store_path else [inferred_file, snapshot_path_for(inferred_file)]
+    start = time.perf_counter()
+    code = source_hash(run_inference, _save_inferred, _lazy("reasoner"),
+                       inspect.getmodule(write_snapshot))
+    key, hit = cache.check("inference", [code, versions, key, incremental])
+    if not hit:
+        if g is None:
+            # Base asserida vinda do cache (ou da base SQLite): lida do disco
+            writer.wait()
+        run_inference(kb_file, incremental=incremental, graph=g, writer=writer)
+        cache.record("inference", key, outputs)
+    cache.log("inference", key, hit, time.perf_counter() - start)
+
+    # O manifesto só é gravado depois dos artefatos que ele descreve
+    writer.submit(cache.save)
+    if wait:
+        writer.close()
 
-def main():
-    """Executa a pipeline completa."""
-    schema_file = build_schema()
-    kb_file = populate_instances(schema_file)
-    run_inference(kb_file)
+    print("\n" + cache.format_report())
     print("\nPipeline de construção da base de conhecimento concluída com sucesso!")
 
 if __name__ == "__main__":
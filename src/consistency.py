@@ -0,0 +1,111 @@
+# src/consistency.py
+"""
+Verificação Incremental de Consistência para axiomas owl:disjointWith.
+
+O `ConsistencyChecker` mantém, para cada classe envolvida em alguma disjunção,
+o conjunto de indivíduos que pertencem a ela (por tipagem direta, hierarquia
+ou domínio/imagem de propriedades). Cada tripla adicionada é examinada
+isoladamente: calculam-se os tipos que ela implica, e um indivíduo que entre em
+duas classes disjuntas é reportado no mesmo instante, sem reler o grafo.
+
+Sobre um grafo já materializado (ex: a base inferida da execução anterior), a
+pertinência inicial vem direto das tipagens `rdf:type` das classes disjuntas,
+buscadas pelo índice do grafo, sem percorrer as demais triplas.
+"""
+from collections import defaultdict, deque, namedtuple
+
+from rdflib import Graph, Literal, RDF, OWL
+
+try:
+    from src.reasoner import (
+        IncrementalReasoner, META_CLASSES, RulePlan, SCHEMA_PREDICATES, instance_consequences, is_schema_triple,
+    )
+except ImportError:  # execução direta: python src/build_knowledge_base.py
+    from reasoner import (
+        IncrementalReasoner, META_CLASSES, RulePlan, SCHEMA_PREDICATES, instance_consequences, is_schema_triple,
+    )
+
+DisjointnessViolation = namedtuple('DisjointnessViolation', ['individual', 'class1', 'class2', 'triple'])
+
+
+class ConsistencyChecker:
+    """Índice de pertinência por classe que detecta violações de disjunção ao adicionar triplas."""
+
+    def __init__(self, graph, materialized=False):
+        """
+        Compila a TBox do grafo e indexa as instâncias existentes.
+
+        Args:
+            graph (rdflib.Graph): Grafo asserido ou inferido (schema + instâncias).
+            materialized (bool): Se True, o grafo já está fechado pelas regras e a
+                pertinência é lida das tipagens das classes disjuntas; caso contrário,
+                as instâncias são percorridas uma vez e os tipos implicados, calculados.
+        """
+        # TBox buscada pelos índices do grafo, sem varrer as instâncias
+        tbox = Graph()
+        schema = [t for pred in SCHEMA_PREDICATES for t in graph.triples((None, pred, None))]
+        schema += [t for cls in META_CLASSES for t in graph.triples((None, RDF.type, cls))]
+        IncrementalReasoner(tbox).add(schema)
+        self.plan = RulePlan(tbox)
+
+        self.disjoint = defaultdict(set)
+        for c1, c2 in self.plan.disjoint:
+            self.disjoint[c1].add(c2)
+            self.disjoint[c2].add(c1)
+        self.members = {c: set() for c in self.disjoint}
+        self.violations = []
+        if materialized:
+            self._seed(graph)
+        else:
+            self.add(t for t in graph if not is_schema_triple(t))
+
+    def _seed(self, graph):
+        """Pertinência inicial a partir das tipagens já materializadas das classes disjuntas."""
+        for x in graph.subjects(RDF.type, OWL.Nothing):
+            self.violations.append(DisjointnessViolation(x, OWL.Nothing, OWL.Nothing, (x, RDF.type, OWL.Nothing)))
+        for c, members in self.members.items():
+            members.update(graph.subjects(RDF.type, c))
+        for c1, c2 in self.plan.disjoint:
+            for x in self.members[c1] & self.members[c2]:
+                self.violations.append(DisjointnessViolation(x, c2, c1, (x, RDF.type, c2)))
+
+    def entailed_types(self, triple):
+        """Pares (indivíduo, classe) implicados por uma tripla de instância."""
+        seen = {triple}
+        queue = deque(seen)
+        while queue:
+            for new in instance_consequences(self.plan, queue.popleft()):
+                if new not in seen and not isinstance(new[1], Literal):
+                    seen.add(new)
+                    queue.append(new)
+        return {(s, o) for s, p, o in seen if p == RDF.type}
+
+    def add(self, triples):
+        """
+        Registra triplas de instância e retorna as violações que elas introduzem.
+
+        Args:
+            triples (iterable): Triplas (s, p, o) recém-adicionadas ao grafo.
+
+        Returns:
+            list[DisjointnessViolation]: Violações novas (também acumuladas em `violations`).
+        """
+        found = []
+        for triple in triples:
+            for x, c in self.entailed_types(triple):
+                if c == OWL.Nothing:
+                    found.append(DisjointnessViolation(x, OWL.Nothing, OWL.Nothing, triple))
+                    continue
+                members = self.members.get(c)
+                if members is None or x in members:
+                    continue
+                members.add(x)
+                for other in self.disjoint[c]:
+                    if x in self.members[other]:
+                        found.append(DisjointnessViolation(x, c, other, triple))
+        self.violations.extend(found)
+        return found
+
+    @property
+    def is_consistent(self):
+        return not self.violations
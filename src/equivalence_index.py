@@ -0,0 +1,89 @@
+# src/equivalence_index.py
+"""
+Índice de Classes de Equivalência para propriedades simétricas e transitivas.
+
+Uma propriedade como `rec:coincideCom` (owl:SymmetricProperty e
+owl:TransitiveProperty) particiona os espaços em grupos onde todos coincidem
+com todos. Materializar o fechamento gera k² triplas por grupo de k zonas; este
+índice (union-find) guarda cada grupo uma única vez e responde em tempo
+praticamente constante se duas zonas coincidem e quais zonas coincidem com uma
+dada zona.
+"""
+from rdflib import RDF, OWL
+
+
+def symmetric_transitive_properties(graph):
+    """Retorna as propriedades declaradas simétricas E transitivas no grafo."""
+    return set(graph.subjects(RDF.type, OWL.SymmetricProperty)) & \
+        set(graph.subjects(RDF.type, OWL.TransitiveProperty))
+
+
+class EquivalenceIndex:
+    """Union-find com os membros de cada grupo mantidos na raiz."""
+
+    def __init__(self, pairs=()):
+        """
+        Args:
+            pairs (iterable): Pares (a, b) ligados pela propriedade.
+        """
+        self._parent = {}
+        self._members = {}
+        for a, b in pairs:
+            self.add(a, b)
+
+    @classmethod
+    def from_graph(cls, graph, prop):
+        """Constrói o índice a partir das arestas de `prop` (asseridas ou inferidas)."""
+        return cls(graph.subject_objects(prop))
+
+    def _find(self, x):
+        parent = self._parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # Compressão de caminho
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def add(self, a, b):
+        """Registra que `a` e `b` estão relacionados (une os dois grupos)."""
+        for x in (a, b):
+            if x not in self._parent:
+                self._parent[x] = x
+                self._members[x] = {x}
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return
+        # União por tamanho: o grupo menor é absorvido pelo maior
+        if len(self._members[ra]) < len(self._members[rb]):
+            ra, rb = rb, ra
+        self._parent[rb] = ra
+        self._members[ra] |= self._members.pop(rb)
+
+    def same(self, a, b):
+        """Indica se (a, b) pertence ao fechamento simétrico-transitivo (inclui a == b)."""
+        if a not in self._parent or b not in self._parent:
+            return False
+        return self._find(a) == self._find(b)
+
+    def members(self, x):
+        """
+        Retorna o grupo de `x` (incluindo o próprio `x`), ou um conjunto vazio.
+
+        O conjunto retornado é o armazenado no índice e não deve ser modificado.
+        """
+        if x not in self._parent:
+            return frozenset()
+        return self._members[self._find(x)]
+
+    def clusters(self):
+        """Itera sobre todos os grupos."""
+        return iter(self._members.values())
+
+    def __contains__(self, x):
+        return x in self._parent
+
+    def __len__(self):
+        """Número de grupos."""
+        return len(self._members)
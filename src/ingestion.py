@@ -0,0 +1,184 @@
+# src/ingestion.py
+"""
+Ingestão em Lote de Instâncias a partir de Arquivos Tabulares.
+
+Os dados abertos da prefeitura (lotes, leis, ações...) chegam como CSV ou
+JSON-Lines, opcionalmente comprimidos com gzip. Cada registro é de um de dois
+tipos, reconhecido pelas colunas:
+
+- entidade: `id`, `class` e, opcionalmente, `label`
+  (ex: `ZEIS_Coque,ZEIS,ZEIS do Coque`);
+- relação: `subject`, `property`, `object` e, opcionalmente, `lang`
+  (ex: `ZEIS_Coque,permiteRemembramento,false`).
+
+Ids, classes e propriedades são nomes locais do namespace `rec:` ou URIs
+completas. Cada registro é validado contra o schema: a classe deve ser uma
+owl:Class, a propriedade deve estar declarada, e o objeto vira um recurso
+(owl:ObjectProperty) ou um literal tipado pelo rdfs:range
+(owl:DatatypeProperty). Registros inválidos são reportados e descartados.
+
+Os arquivos são lidos registro a registro e as triplas são gravadas com
+`addN` em lotes de tamanho fixo, então a memória usada não cresce com o
+tamanho do arquivo.
+"""
+import csv
+import gzip
+import json
+from itertools import islice
+
+from rdflib import Literal, Namespace, RDF, RDFS, OWL, URIRef, XSD
+
+REC = Namespace("http://recife.leg.br/ontologia-conflito#")
+
+# Triplas por chamada a `addN`
+BATCH_SIZE = 10000
+
+# Erros guardados no relatório (os demais são apenas contados)
+MAX_ERRORS = 100
+
+
+class SchemaIndex:
+    """Classes e propriedades declaradas no schema, para validar registros."""
+
+    def __init__(self, graph):
+        """
+        Args:
+            graph (rdflib.Graph): Grafo com o schema (ex: o schema V5 ou a base asserida).
+        """
+        self.classes = set(graph.subjects(RDF.type, OWL.Class))
+        self.object_properties = set(graph.subjects(RDF.type, OWL.ObjectProperty))
+        self.datatype_properties = {p: graph.value(p, RDFS.range)
+                                    for p in graph.subjects(RDF.type, OWL.DatatypeProperty)}
+        self.annotation_properties = {RDFS.label, RDFS.comment}
+
+
+def _resource(name):
+    if not isinstance(name, str):
+        raise ValueError(f"Nome deve ser texto: {name!r}")
+    name = name.strip()
+    return URIRef(name) if ":" in name else REC[name]
+
+
+def _open_text(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_records(path):
+    """
+    Lê um arquivo CSV (com cabeçalho) ou JSON-Lines registro a registro.
+
+    Yields:
+        tuple: (número da linha, registro): um dict para CSV e o texto da linha
+        para JSON-Lines, decodificado por `record_triples` (uma linha malformada
+        vira um registro rejeitado, não um erro de leitura).
+    """
+    with _open_text(path) as f:
+        if ".jsonl" in str(path) or ".ndjson" in str(path):
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    yield number, line
+        else:
+            for number, row in enumerate(csv.DictReader(f), 2):
+                yield number, row
+
+
+def record_triples(record, schema):
+    """
+    Triplas de um registro, validado contra o schema.
+
+    Args:
+        record (dict | str): Registro, ou uma linha JSON ainda não decodificada.
+        schema (SchemaIndex): Índice do schema.
+
+    Raises:
+        ValueError: Se o registro for malformado, não for reconhecido ou violar o schema.
+    """
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {e.msg}") from None
+    if not isinstance(record, dict):
+        raise ValueError(f"Registro deve ser um objeto, não {type(record).__name__}")
+    if record.get("class"):
+        if not record.get("id"):
+            raise ValueError("Entidade sem 'id'")
+        subject, cls = _resource(record["id"]), _resource(record["class"])
+        if cls not in schema.classes:
+            raise ValueError(f"Classe desconhecida no schema: {record['class']}")
+        triples = [(subject, RDF.type, cls)]
+        if record.get("label"):
+            triples.append((subject, RDFS.label, Literal(record["label"])))
+        return triples
+
+    if record.get("property"):
+        if not record.get("subject") or record.get("object") in (None, ""):
+            raise ValueError("Relação sem 'subject' ou 'object'")
+        subject, prop, value = _resource(record["subject"]), _resource(record["property"]), record["object"]
+        if prop in schema.object_properties:
+            obj = _resource(str(value))
+        elif prop in schema.datatype_properties:
+            datatype = schema.datatype_properties[prop]
+            if isinstance(value, bool):
+                value = str(value).lower()
+            if datatype is None or datatype == XSD.string:
+                # Mesma forma das atribuições literais de `populate_instances`
+                obj = Literal(str(value), lang=record.get("lang") or None)
+            else:
+                obj = Literal(str(value), datatype=datatype)
+                if obj.ill_typed:
+                    raise ValueError(f"Valor inválido para {datatype.n3()}: {value!r}")
+        elif prop in schema.annotation_properties:
+            obj = Literal(str(value), lang=record.get("lang") or None)
+        else:
+            raise ValueError(f"Propriedade desconhecida no schema: {record['property']}")
+        return [(subject, prop, obj)]
+
+    raise ValueError("Registro sem 'class' (entidade) nem 'property' (relação)")
+
+
+def ingest(graph, paths, schema=None, strict=False):
+    """
+    Carrega arquivos de entidades e relações em `graph` com escritas em lote.
+
+    Args:
+        graph (rdflib.Graph): Grafo de destino (deve conter o schema, se `schema` for None).
+        paths (iterable[str]): Arquivos .csv ou .jsonl (com `.gz` opcional).
+        schema (SchemaIndex, opcional): Índice do schema usado na validação.
+        strict (bool): Se True, o primeiro registro inválido interrompe a carga.
+
+    Returns:
+        dict: {"records", "triples", "rejected", "errors"}, com até MAX_ERRORS
+        mensagens "arquivo:linha: motivo".
+
+    Raises:
+        ValueError: No modo estrito, para o primeiro registro inválido.
+    """
+    schema = schema or SchemaIndex(graph)
+    report = {"records": 0, "triples": 0, "rejected": 0, "errors": []}
+
+    def quads():
+        for path in paths:
+            for number, record in iter_records(path):
+                report["records"] += 1
+                try:
+                    triples = record_triples(record, schema)
+                except ValueError as e:
+                    if strict:
+                        raise ValueError(f"{path}:{number}: {e}") from None
+                    report["rejected"] += 1
+                    if len(report["errors"]) < MAX_ERRORS:
+                        report["errors"].append(f"{path}:{number}: {e}")
+                    continue
+                for s, p, o in triples:
+                    yield s, p, o, graph
+
+    stream = quads()
+    while True:
+        batch = list(islice(stream, BATCH_SIZE))
+        if not batch:
+            return report
+        graph.addN(batch)
+        report["triples"] += len(batch)
@@ -0,0 +1,160 @@
+# src/justifications.py
+"""
+Armazenamento Compacto de Justificativas para as triplas inferidas.
+
+Para cada tripla derivada guarda-se a regra e as premissas que a produziram
+na primeira vez em que foi inferida. Triplas viram inteiros por um dicionário
+(tripla -> id), e regras e premissas ficam em arrays de inteiros, de modo que
+o custo por justificativa é de alguns bytes além da entrada no dicionário.
+`explain` percorre a árvore de prova a partir dessas tabelas, sem refazer o
+raciocínio: as folhas são triplas asseridas ou axiomáticas.
+"""
+import pickle
+import sys
+from array import array
+
+
+class JustificationStore:
+    """Regra + premissas (como ids inteiros) de cada tripla inferida."""
+
+    def __init__(self, max_entries=None):
+        """
+        Args:
+            max_entries (int, opcional): Limite de triplas no dicionário. Ao atingi-lo,
+                novas justificativas deixam de ser registradas (contadas em `dropped`).
+        """
+        self.max_entries = max_entries
+        self.dropped = 0
+        self._ids = {}
+        self._triples = []
+        # Código 0: sem justificativa (tripla asserida ou apenas usada como premissa)
+        self._rule_names = [None]
+        self._rule_codes = {}
+        self._rule = array('H')
+        self._start = array('I')
+        self._count = array('B')
+        self._premises = array('I')
+
+    def _intern(self, triple):
+        tid = self._ids.get(triple)
+        if tid is None:
+            tid = self._ids[triple] = len(self._triples)
+            self._triples.append(triple)
+            self._rule.append(0)
+            self._start.append(0)
+            self._count.append(0)
+        return tid
+
+    def record(self, triple, rule, premises=()):
+        """
+        Registra a derivação de `triple` por `rule` a partir de `premises`.
+
+        Só a primeira derivação é guardada: as premissas já estavam no grafo
+        quando a tripla surgiu, o que garante uma árvore de prova sem ciclos.
+        """
+        tid = self._ids.get(triple)
+        if tid is not None and self._rule[tid]:
+            return
+        if self.max_entries is not None and len(self._triples) + len(premises) + 1 > self.max_entries:
+            self.dropped += 1
+            return
+        code = self._rule_codes.get(rule)
+        if code is None:
+            code = self._rule_codes[rule] = len(self._rule_names)
+            self._rule_names.append(rule)
+        ids = [self._intern(p) for p in premises]
+        tid = self._intern(triple)
+        self._rule[tid] = code
+        self._start[tid] = len(self._premises)
+        self._count[tid] = len(ids)
+        self._premises.extend(ids)
+
+    def discard(self, triple):
+        """
+        Esquece a justificativa de uma tripla que saiu do grafo (ex: retração).
+
+        O id da tripla é mantido: outras justificativas podem tê-la como
+        premissa, e se ela for derivada de novo, `record` preenche o mesmo
+        slot e essas provas voltam a enxergar a nova derivação.
+        """
+        tid = self._ids.get(triple)
+        if tid is not None:
+            self._rule[tid] = 0
+            self._count[tid] = 0
+
+    def rule_of(self, triple):
+        """Nome da regra que derivou `triple`, ou None se não houver justificativa."""
+        tid = self._ids.get(triple)
+        return self._rule_names[self._rule[tid]] if tid is not None else None
+
+    def premises_of(self, triple):
+        """Premissas da justificativa de `triple` (lista vazia para folhas)."""
+        tid = self._ids.get(triple)
+        if tid is None or not self._rule[tid]:
+            return []
+        start = self._start[tid]
+        return [self._triples[i] for i in self._premises[start:start + self._count[tid]]]
+
+    def explain(self, triple):
+        """
+        Árvore de prova de `triple`.
+
+        Returns:
+            dict: {"triple": tripla, "rule": nome ou None, "premises": [subárvores]}.
+            Nós com "rule" None são folhas (asserções ou axiomas).
+        """
+        return self._explain(self._ids.get(triple), triple, set())
+
+    def _explain(self, tid, triple, path):
+        if tid is None or not self._rule[tid] or tid in path:
+            return {"triple": triple, "rule": None, "premises": []}
+        path.add(tid)
+        start = self._start[tid]
+        premises = [self._explain(i, self._triples[i], path)
+                    for i in self._premises[start:start + self._count[tid]]]
+        path.discard(tid)
+        return {"triple": triple, "rule": self._rule_names[self._rule[tid]], "premises": premises}
+
+    def render(self, triple, namespace_manager=None):
+        """Texto indentado da árvore de prova, uma tripla por linha."""
+        def fmt(term):
+            return term.n3(namespace_manager) if namespace_manager is not None else term.n3()
+
+        lines = []
+
+        def walk(node, depth):
+            rule = f"[{node['rule']}]" if node["rule"] else "[asserida]"
+            lines.append("  " * depth + " ".join(fmt(t) for t in node["triple"]) + f"  {rule}")
+            for child in node["premises"]:
+                walk(child, depth + 1)
+
+        walk(self.explain(triple), 0)
+        return "\n".join(lines)
+
+    def memory_usage(self):
+        """
+        Bytes ocupados pelas estruturas do store.
+
+        Os termos RDF das triplas são compartilhados com o grafo e não entram na conta.
+        """
+        return (sys.getsizeof(self._ids) + sys.getsizeof(self._triples)
+                + sum(sys.getsizeof(t) for t in self._triples)
+                + sum(sys.getsizeof(a) for a in (self._rule, self._start, self._count, self._premises)))
+
+    def __len__(self):
+        """Número de triplas com justificativa."""
+        return sum(1 for tid in self._ids.values() if self._rule[tid])
+
+    def __contains__(self, triple):
+        tid = self._ids.get(triple)
+        return tid is not None and bool(self._rule[tid])
+
+    def save(self, path):
+        """Grava o store em disco (pickle), para `explain` em outro processo."""
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
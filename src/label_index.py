@@ -0,0 +1,46 @@
+# src/label_index.py
+"""
+Índice de Rótulos para Materialização Tardia.
+
+Quase toda consulta predefinida junta `rdfs:label` a cada variável só para
+exibi-la, o que alarga as junções e multiplica as linhas quando um recurso
+tem vários rótulos. O `LabelIndex` guarda, para cada recurso, um único
+rótulo preferido, escolhido por uma lista de idiomas; as consultas resolvem
+a estrutura só com URIs e os rótulos são anexados no fim (ver
+`SPARQLQueryEngine`, opção `labels`).
+
+O índice é construído numa única varredura de `(?, rdfs:label, ?)` e
+reconstruído quando a versão do grafo muda (ver `src.result_cache.GraphVersion`).
+"""
+from rdflib import RDFS
+
+# Português primeiro, depois rótulos sem idioma; os demais idiomas vêm por último
+DEFAULT_LANGUAGES = ("pt", "")
+
+
+class LabelIndex:
+    """Rótulo preferido de cada recurso, de acordo com uma ordem de idiomas."""
+
+    def __init__(self, graph, languages=DEFAULT_LANGUAGES):
+        """
+        Args:
+            graph (rdflib.Graph): Grafo de onde os rótulos são lidos.
+            languages (tuple): Idiomas em ordem de preferência ("" = rótulo sem idioma).
+                Rótulos em outros idiomas só são usados na falta destes.
+        """
+        self.languages = tuple(languages)
+        rank = {lang: i for i, lang in enumerate(self.languages)}
+        best = {}
+        for resource, label in graph.subject_objects(RDFS.label):
+            key = (rank.get(getattr(label, "language", None) or "", len(rank)), str(label))
+            current = best.get(resource)
+            if current is None or key < current[0]:
+                best[resource] = (key, label)
+        self._labels = {resource: label for resource, (_, label) in best.items()}
+
+    def get(self, resource):
+        """Rótulo preferido do recurso, ou None se ele não tem rótulo."""
+        return self._labels.get(resource)
+
+    def __len__(self):
+        return len(self._labels)
@@ -0,0 +1,522 @@
+# src/native_queries.py
+"""
+Execução Nativa das Consultas Predefinidas.
+
+As dez consultas de `SPARQLQueryEngine` têm formas fixas: junções em estrela
+sobre `rdfs:label`, a cadeia agente → ação → dano em dois saltos e pares
+simétricos filtrados por `STR(?a) < STR(?b)`. Aqui cada uma é executada como
+um plano escrito à mão: buscas diretas nos índices do store
+(`graph.subjects`, `graph.objects`, `graph.subject_objects`) combinadas por
+junções de hash, sem passar pelo avaliador genérico de SPARQL e seu custo por
+linha.
+
+As linhas produzidas são as mesmas da versão SPARQL, com a mesma semântica de
+multiconjunto (uma linha por solução, inclusive repetidas), variáveis não
+ligadas de OPTIONAL ausentes do dicionário e ORDER BY com a mesma ordenação
+de termos do rdflib. O motor usa este caminho com `native=True`.
+
+Os planos leem o grafo por um `Scans`, que memoriza cada padrão de tripla já
+varrido (as instâncias de uma classe, os pares de um predicado, os rótulos de
+um recurso). Um único `Scans` compartilhado por várias consultas (ver
+`SPARQLQueryEngine.run_batch`) faz cada padrão comum ser varrido uma só vez,
+e junções intermediárias, como os pares agente → ação, serem reaproveitadas.
+
+Os planos estruturais (`LATE_PLANS`) resolvem as mesmas consultas só com
+URIs, sem nenhuma junção de `rdfs:label`: cada linha traz os recursos, e o
+motor anexa um rótulo preferido por recurso no fim (ver `src.label_index`) ou
+devolve as URIs como estão. Como um recurso sem rótulo não elimina a linha,
+os OPTIONAL não dependem de rótulos: o instrumento de uma ação é qualquer
+`utilizaInstrumento`, e a norma é a que institui esse instrumento. Com
+`use_index=True`, os planos espaciais resolvem `coincideCom` pelos grupos do
+índice de equivalência (ver `src.equivalence_index`), como o caminho com
+rótulos completos, e respondem igual sobre um grafo com o fechamento colapsado.
+"""
+from collections import defaultdict, namedtuple
+
+from rdflib import Literal, Namespace, OWL, RDF, RDFS, Variable
+from rdflib.plugins.sparql.evalutils import _val
+
+try:
+    from src.equivalence_index import EquivalenceIndex
+except ImportError:  # execução direta: python src/sparql_queries.py
+    from equivalence_index import EquivalenceIndex
+
+REC = Namespace("http://recife.leg.br/ontologia-conflito#")
+
+
+class Scans:
+    """Varreduras de padrões de tripla memorizadas, compartilháveis entre consultas."""
+
+    def __init__(self, graph, equivalences=None):
+        """
+        Args:
+            graph (rdflib.Graph): Grafo consultado.
+            equivalences (callable, opcional): Propriedade -> `EquivalenceIndex` (ex:
+                `SPARQLQueryEngine.equivalence_index`). Sem ele, o índice é montado a
+                partir de `pairs`.
+        """
+        self.graph = graph
+        self._equivalences = equivalences
+        self._memo = {}
+
+    def _get(self, key, scan):
+        result = self._memo.get(key)
+        if result is None:
+            result = self._memo[key] = scan()
+        return result
+
+    def labels(self, resource):
+        """Rótulos de um recurso: padrão (recurso, rdfs:label, ?)."""
+        return self.objects(resource, RDFS.label)
+
+    def objects(self, subject, predicate):
+        return self._get(("o", subject, predicate), lambda: list(self.graph.objects(subject, predicate)))
+
+    def subjects(self, predicate, obj):
+        return self._get(("s", predicate, obj), lambda: list(self.graph.subjects(predicate, obj)))
+
+    def typed(self, cls):
+        """Instâncias de uma classe, como conjunto: padrão (?, rdf:type, classe)."""
+        return self._get(("t", cls), lambda: set(self.subjects(RDF.type, cls)))
+
+    def pairs(self, predicate):
+        """Pares (sujeito, objeto) de um predicado: padrão (?, predicado, ?)."""
+        return self._get(("p", predicate), lambda: list(self.graph.subject_objects(predicate)))
+
+    def equivalences(self, predicate):
+        """Grupos de uma propriedade simétrica e transitiva (índice union-find)."""
+        if self._equivalences is not None:
+            return self._equivalences(predicate)
+        return self._get(("eq", predicate), lambda: EquivalenceIndex(self.pairs(predicate)))
+
+    def by_subject(self, predicate):
+        """Objetos de um predicado agrupados por sujeito, a partir de `pairs`."""
+        def build():
+            index = defaultdict(list)
+            for s, o in self.pairs(predicate):
+                index[s].append(o)
+            return index
+        return self._get(("bs", predicate), build)
+
+    def by_object(self, predicate):
+        """Sujeitos de um predicado agrupados por objeto, a partir de `pairs`."""
+        def build():
+            index = defaultdict(list)
+            for s, o in self.pairs(predicate):
+                index[o].append(s)
+            return index
+        return self._get(("bo", predicate), build)
+
+
+def _order_by(rows, *names):
+    """ORDER BY ascendente pelas variáveis, como o `evalOrderBy` do rdflib (ordenações estáveis)."""
+    for name in reversed(names):
+        rows = sorted(rows, key=lambda row: _val(row.get(name, Variable(name))))
+    return rows
+
+
+def normative_conflict(scans):
+    labels = scans.labels
+    rows = []
+    for norma1 in scans.typed(REC.Norma):
+        for norma2 in scans.by_subject(REC.conflitaCom).get(norma1, ()):
+            if not str(norma1) < str(norma2):
+                continue
+            for l1 in labels(norma1):
+                for l2 in labels(norma2):
+                    rows.append({'norma1_label': l1, 'norma2_label': l2})
+    return rows
+
+
+def ambiguous_actors(scans):
+    labels = scans.labels
+    propositivas = scans.typed(REC.Acao_Propositiva)
+    impeditivas = scans.typed(REC.Acao_Impeditiva)
+    executa = scans.by_subject(REC.executaAcao)
+    rows, seen = [], set()
+    for ator in scans.typed(REC.AgenteUrbano):
+        acoes = set(executa.get(ator, ()))
+        for acao_p in acoes & propositivas:
+            for acao_i in acoes & impeditivas:
+                for la in labels(ator):
+                    for lp in labels(acao_p):
+                        for li in labels(acao_i):
+                            if (la, lp, li) not in seen:
+                                seen.add((la, lp, li))
+                                rows.append({'ator_label': la, 'acao_propositiva_label': lp,
+                                             'acao_impeditiva_label': li})
+    return rows
+
+
+def causality_chain(scans, dano=None):
+    labels = scans.labels
+    impeditivas = scans.typed(REC.Acao_Impeditiva)
+    agentes = scans.by_object(REC.executaAcao)
+    pairs = scans.pairs(REC.causa_direta) if dano is None else (
+        (acao, dano) for acao in scans.by_object(REC.causa_direta).get(dano, ()))
+    rows = []
+    for acao, d in pairs:
+        if acao not in impeditivas:
+            continue
+        for agente in agentes.get(acao, ()):
+            for la in labels(acao):
+                for lg in labels(agente):
+                    for ld in labels(d):
+                        rows.append({'agente_label': lg, 'acao_label': la, 'dano_label': ld})
+    return rows
+
+
+def _overlapping_pairs(scans):
+    """Pares (espaco1, espaco2) de cada grupo do índice de 'coincideCom', sem varrer o fechamento."""
+    for cluster in scans.equivalences(REC.coincideCom).clusters():
+        espacos = sorted(cluster, key=str)
+        for i, espaco1 in enumerate(espacos):
+            for espaco2 in espacos[i + 1:]:
+                yield espaco1, espaco2
+
+
+def spatial_overlap(scans, use_index=False):
+    labels = scans.labels
+    rows, seen = [], set()
+    pairs = _overlapping_pairs(scans) if use_index else scans.pairs(REC.coincideCom)
+    for espaco1, espaco2 in pairs:
+        if not str(espaco1) < str(espaco2):
+            continue
+        for l1 in labels(espaco1):
+            for l2 in labels(espaco2):
+                if (l1, l2) not in seen:
+                    seen.add((l1, l2))
+                    rows.append({'espaco1_label': l1, 'espaco2_label': l2})
+    return rows
+
+
+def legal_breaches(scans):
+    labels = scans.labels
+    impeditivas = scans.typed(REC.Acao_Impeditiva)
+    danos = scans.by_subject(REC.causa_direta)
+    rows = []
+    for norma, acao in scans.pairs(REC.permiteExcecao):
+        if acao not in impeditivas:
+            continue
+        for dano in danos.get(acao, ()):
+            for ln in labels(norma):
+                for la in labels(acao):
+                    for ld in labels(dano):
+                        rows.append({'norma_label': ln, 'acao_label': la, 'dano_label': ld})
+    return rows
+
+
+def institutional_fragmentation(scans):
+    labels = scans.labels
+    excluded = {OWL.Thing, REC.PoderPublico, REC.AgenteUrbano}
+    rows = []
+    for agencia in scans.typed(REC.PoderPublico):
+        for la in labels(agencia):
+            for tipo in scans.objects(agencia, RDF.type):
+                if tipo in excluded:
+                    continue
+                atribuicoes = scans.objects(agencia, REC.temAtribuicaoLegal)
+                if not atribuicoes:
+                    rows.append({'agencia_label': la, 'tipo': tipo})
+                for atribuicao in atribuicoes:
+                    rows.append({'agencia_label': la, 'tipo': tipo, 'atribuicao': atribuicao})
+    return _order_by(rows, 'tipo')
+
+
+def benefit_damage_reversals(scans):
+    labels = scans.labels
+    causadores = scans.by_object(REC.causa_direta)
+    geradoras = scans.by_object(REC.gera_beneficio)
+    rows = []
+    for beneficio, dano in scans.pairs(REC.e_reversao_de):
+        negativas = causadores.get(dano)
+        if not negativas:
+            continue
+        for positiva in geradoras.get(beneficio, ()):
+            for negativa in negativas:
+                for lb in labels(beneficio):
+                    for ld in labels(dano):
+                        for lp in labels(positiva):
+                            for ln in labels(negativa):
+                                rows.append({'beneficio_label': lb, 'dano_label': ld,
+                                             'acao_positiva_label': lp, 'acao_negativa_label': ln})
+    return rows
+
+
+def market_pressure_on_zeis(scans):
+    labels = scans.labels
+    rows = []
+    for zeis in scans.typed(REC.ZEIS):
+        pressoes = [{'agente_mercado_label': l}
+                    for agente in scans.objects(zeis, REC.estaSobPressaoImobiliaria)
+                    for l in labels(agente)] or [{}]
+        remembramentos = [{'permite_remembramento': v}
+                          for v in scans.objects(zeis, REC.permiteRemembramento)] or [{}]
+        for lz in labels(zeis):
+            for pressao in pressoes:
+                for remembramento in remembramentos:
+                    rows.append({'zeis_label': lz, **pressao, **remembramento})
+    return rows
+
+
+def conflicting_jurisdictions(scans, use_index=False):
+    labels = scans.labels
+    orgaos = scans.by_object(REC.exerceTutelaSobre)
+    if use_index:
+        index = scans.equivalences(REC.coincideCom)
+        pairs = ((espaco1, espaco2) for espaco1 in orgaos for espaco2 in index.members(espaco1))
+    else:
+        pairs = scans.pairs(REC.coincideCom)
+    rows = []
+    for espaco1, espaco2 in pairs:
+        for orgao1 in orgaos.get(espaco1, ()):
+            for orgao2 in orgaos.get(espaco2, ()):
+                if orgao1 == orgao2 or not str(orgao1) < str(orgao2):
+                    continue
+                for l1 in labels(orgao1):
+                    for l2 in labels(orgao2):
+                        for le in labels(espaco1):
+                            rows.append({'orgao1_label': l1, 'orgao2_label': l2, 'espaco_label': le})
+    return rows
+
+
+def full_conflict_narrative(scans):
+    labels = scans.labels
+    # Sem ?instrumento ligado pelo primeiro OPTIONAL, o segundo casa com qualquer norma
+    # que institua qualquer instrumento (semântica do LeftJoin do SPARQL)
+    instituidoras = scans.by_object(REC.institui)
+    todas = [(norma, instrumento) for norma, instrumento in scans.pairs(REC.institui)]
+    danos = scans.by_subject(REC.causa_direta)
+    beneficios = scans.by_subject(REC.gera_beneficio)
+    instrumentos_de = scans.by_subject(REC.utilizaInstrumento)
+
+    rows = []
+    for agente, acao in scans.pairs(REC.executaAcao):
+        outcomes = ([{'resultado_label': l, 'tipo_resultado': Literal("DANO")}
+                     for resultado in danos.get(acao, ()) for l in labels(resultado)]
+                    + [{'resultado_label': l, 'tipo_resultado': Literal("BENEFÍCIO")}
+                       for resultado in beneficios.get(acao, ()) for l in labels(resultado)])
+        if not outcomes:
+            continue
+        instrumentos = [(instrumento, {'instrumento_label': l})
+                        for instrumento in instrumentos_de.get(acao, ())
+                        for l in labels(instrumento)]
+        if instrumentos:
+            left = [(binding, instituidoras.get(instrumento, ())) for instrumento, binding in instrumentos]
+        else:
+            left = [({}, [norma for norma, _ in todas])]
+        for lg in labels(agente):
+            for la in labels(acao):
+                for binding, normas in left:
+                    normas = [{'norma_label': l} for norma in normas for l in labels(norma)] or [{}]
+                    for norma in normas:
+                        for outcome in outcomes:
+                            rows.append({'agente_label': lg, 'acao_label': la, **binding, **norma, **outcome})
+    return _order_by(rows, 'agente_label', 'tipo_resultado')
+
+
+EXECUTORS = {
+    "normative_conflict": normative_conflict,
+    "ambiguous_actors": ambiguous_actors,
+    "causality_chain": causality_chain,
+    "spatial_overlap": spatial_overlap,
+    "legal_breaches": legal_breaches,
+    "institutional_fragmentation": institutional_fragmentation,
+    "benefit_damage_reversals": benefit_damage_reversals,
+    "market_pressure_on_zeis": market_pressure_on_zeis,
+    "conflicting_jurisdictions": conflicting_jurisdictions,
+    "full_conflict_narrative": full_conflict_narrative,
+}
+
+
+# -----------------------------------------------------------------------------
+# Planos estruturais: só URIs, rótulos anexados depois
+# -----------------------------------------------------------------------------
+
+# plan(scans, **ligações) -> linhas de recursos; labels: variável -> chave do rótulo;
+# order: variáveis do ORDER BY
+LatePlan = namedtuple('LatePlan', ['plan', 'labels', 'order'])
+
+
+def _distinct(rows):
+    seen, unique = set(), []
+    for row in rows:
+        key = tuple(row.items())
+        if key not in seen:
+            seen.add(key)
+            unique.append(row)
+    return unique
+
+
+def _normative_conflict_uris(scans):
+    conflitos = scans.by_subject(REC.conflitaCom)
+    return [{'norma1': norma1, 'norma2': norma2}
+            for norma1 in scans.typed(REC.Norma)
+            for norma2 in conflitos.get(norma1, ())
+            if str(norma1) < str(norma2)]
+
+
+def _ambiguous_actors_uris(scans):
+    propositivas = scans.typed(REC.Acao_Propositiva)
+    impeditivas = scans.typed(REC.Acao_Impeditiva)
+    executa = scans.by_subject(REC.executaAcao)
+    rows = []
+    for ator in scans.typed(REC.AgenteUrbano):
+        acoes = set(executa.get(ator, ()))
+        rows.extend({'ator': ator, 'acao_propositiva': p, 'acao_impeditiva': i}
+                    for p in acoes & propositivas for i in acoes & impeditivas)
+    return _distinct(rows)
+
+
+def _causality_chain_uris(scans, dano=None):
+    impeditivas = scans.typed(REC.Acao_Impeditiva)
+    agentes = scans.by_object(REC.executaAcao)
+    pairs = scans.pairs(REC.causa_direta) if dano is None else (
+        (acao, dano) for acao in scans.by_object(REC.causa_direta).get(dano, ()))
+    return [{'agente': agente, 'acao': acao, 'dano': d}
+            for acao, d in pairs if acao in impeditivas
+            for agente in agentes.get(acao, ())]
+
+
+def _spatial_overlap_uris(scans, use_index=False):
+    if use_index:
+        pairs = ((e1, e2) for cluster in scans.equivalences(REC.coincideCom).clusters()
+                 for e1 in cluster for e2 in cluster)
+    else:
+        pairs = scans.pairs(REC.coincideCom)
+    return _distinct({'espaco1': e1, 'espaco2': e2} for e1, e2 in pairs if str(e1) < str(e2))
+
+
+def _legal_breaches_uris(scans):
+    impeditivas = scans.typed(REC.Acao_Impeditiva)
+    danos = scans.by_subject(REC.causa_direta)
+    return [{'norma': norma, 'acao': acao, 'dano': dano}
+            for norma, acao in scans.pairs(REC.permiteExcecao) if acao in impeditivas
+            for dano in danos.get(acao, ())]
+
+
+def _institutional_fragmentation_uris(scans):
+    excluded = {OWL.Thing, REC.PoderPublico, REC.AgenteUrbano}
+    rows = []
+    for agencia in scans.typed(REC.PoderPublico):
+        atribuicoes = [{'atribuicao': a} for a in scans.objects(agencia, REC.temAtribuicaoLegal)] or [{}]
+        rows.extend({'agencia': agencia, 'tipo': tipo, **atribuicao}
+                    for tipo in scans.objects(agencia, RDF.type) if tipo not in excluded
+                    for atribuicao in atribuicoes)
+    return rows
+
+
+def _benefit_damage_reversals_uris(scans):
+    causadores = scans.by_object(REC.causa_direta)
+    geradoras = scans.by_object(REC.gera_beneficio)
+    return [{'beneficio': beneficio, 'dano': dano, 'acao_positiva': positiva, 'acao_negativa': negativa}
+            for beneficio, dano in scans.pairs(REC.e_reversao_de)
+            for positiva in geradoras.get(beneficio, ())
+            for negativa in causadores.get(dano, ())]
+
+
+def _market_pressure_on_zeis_uris(scans):
+    rows = []
+    for zeis in scans.typed(REC.ZEIS):
+        pressoes = [{'agente_mercado': a} for a in scans.objects(zeis, REC.estaSobPressaoImobiliaria)] or [{}]
+        remembramentos = [{'permite_remembramento': v}
+                          for v in scans.objects(zeis, REC.permiteRemembramento)] or [{}]
+        rows.extend({'zeis': zeis, **pressao, **remembramento}
+                    for pressao in pressoes for remembramento in remembramentos)
+    return rows
+
+
+def _conflicting_jurisdictions_uris(scans, use_index=False):
+    orgaos = scans.by_object(REC.exerceTutelaSobre)
+    if use_index:
+        index = scans.equivalences(REC.coincideCom)
+        pairs = ((e1, e2) for e1 in orgaos for e2 in index.members(e1))
+    else:
+        pairs = scans.pairs(REC.coincideCom)
+    return [{'orgao1': orgao1, 'orgao2': orgao2, 'espaco1': espaco1}
+            for espaco1, espaco2 in pairs
+            for orgao1 in orgaos.get(espaco1, ())
+            for orgao2 in orgaos.get(espaco2, ())
+            if orgao1 != orgao2 and str(orgao1) < str(orgao2)]
+
+
+def _full_conflict_narrative_uris(scans):
+    instituidoras = scans.by_object(REC.institui)
+    danos = scans.by_subject(REC.causa_direta)
+    beneficios = scans.by_subject(REC.gera_beneficio)
+    instrumentos_de = scans.by_subject(REC.utilizaInstrumento)
+    rows = []
+    for agente, acao in scans.pairs(REC.executaAcao):
+        outcomes = ([{'resultado': r, 'tipo_resultado': Literal("DANO")} for r in danos.get(acao, ())]
+                    + [{'resultado': r, 'tipo_resultado': Literal("BENEFÍCIO")} for r in beneficios.get(acao, ())])
+        if not outcomes:
+            continue
+        instrumentos = [{'instrumento': i, **norma}
+                        for i in instrumentos_de.get(acao, ())
+                        for norma in ([{'norma': n} for n in instituidoras.get(i, ())] or [{}])] or [{}]
+        rows.extend({'agente': agente, 'acao': acao, **instrumento, **outcome}
+                    for instrumento in instrumentos for outcome in outcomes)
+    return rows
+
+
+LATE_PLANS = {
+    "normative_conflict": LatePlan(_normative_conflict_uris,
+                                   {'norma1': 'norma1_label', 'norma2': 'norma2_label'}, ()),
+    "ambiguous_actors": LatePlan(_ambiguous_actors_uris,
+                                 {'ator': 'ator_label', 'acao_propositiva': 'acao_propositiva_label',
+                                  'acao_impeditiva': 'acao_impeditiva_label'}, ()),
+    "causality_chain": LatePlan(_causality_chain_uris,
+                                {'agente': 'agente_label', 'acao': 'acao_label', 'dano': 'dano_label'}, ()),
+    "spatial_overlap": LatePlan(_spatial_overlap_uris,
+                                {'espaco1': 'espaco1_label', 'espaco2': 'espaco2_label'}, ()),
+    "legal_breaches": LatePlan(_legal_breaches_uris,
+                               {'norma': 'norma_label', 'acao': 'acao_label', 'dano': 'dano_label'}, ()),
+    "institutional_fragmentation": LatePlan(_institutional_fragmentation_uris,
+                                            {'agencia': 'agencia_label'}, ('tipo',)),
+    "benefit_damage_reversals": LatePlan(_benefit_damage_reversals_uris,
+                                         {'beneficio': 'beneficio_label', 'dano': 'dano_label',
+                                          'acao_positiva': 'acao_positiva_label',
+                                          'acao_negativa': 'acao_negativa_label'}, ()),
+    "market_pressure_on_zeis": LatePlan(_market_pressure_on_zeis_uris,
+                                        {'zeis': 'zeis_label', 'agente_mercado': 'agente_mercado_label'}, ()),
+    "conflicting_jurisdictions": LatePlan(_conflicting_jurisdictions_uris,
+                                          {'orgao1': 'orgao1_label', 'orgao2': 'orgao2_label',
+                                           'espaco1': 'espaco_label'}, ()),
+    "full_conflict_narrative": LatePlan(_full_conflict_narrative_uris,
+                                        {'agente': 'agente_label', 'acao': 'acao_label',
+                                         'instrumento': 'instrumento_label', 'norma': 'norma_label',
+                                         'resultado': 'resultado_label'}, ('agente', 'tipo_resultado')),
+}
+
+
+def materialize(name, scans, label_index=None, **bindings):
+    """
+    Executa um plano estrutural e anexa os rótulos no fim.
+
+    Args:
+        name (str): Consulta (chave de `LATE_PLANS`).
+        scans (Scans): Varreduras do grafo.
+        label_index (LabelIndex, opcional): Rótulos preferidos. Sem ele, as linhas
+            trazem as URIs nas variáveis de recurso (ex: 'norma1' em vez de 'norma1_label').
+
+    Returns:
+        list[dict]: As linhas, com as mesmas chaves da consulta SPARQL quando há rótulos;
+        um recurso sem rótulo fica sem a chave correspondente.
+    """
+    plan, labels, order = LATE_PLANS[name]
+    rows = plan(scans, **bindings)
+    if label_index is None:
+        return _order_by(rows, *order)
+    labeled = []
+    for row in rows:
+        out = {}
+        for var, value in row.items():
+            key = labels.get(var)
+            if key is None:
+                out[var] = value
+            else:
+                label = label_index.get(value)
+                if label is not None:
+                    out[key] = label
+        labeled.append(out)
+    return _order_by(labeled, *(labels.get(var, var) for var in order))
@@ -0,0 +1,154 @@
+# src/parallel_load.py
+"""
+Carga Paralela de N-Triples em Blocos de Bytes.
+
+Interpretar a base inferida é um parse de uma thread só. Num arquivo com uma
+declaração por linha (N-Triples/N-Quads, ou Turtle normalizado para esse
+formato), as linhas são independentes: o arquivo é dividido em faixas de
+bytes alinhadas a quebras de linha e cada faixa é interpretada num processo
+do pool. Cada processo devolve só o seu dicionário local de termos (termos
+codificados com `encode_term`, ver `src.snapshot`) e as triplas em ids locais,
+que são baratos de transferir; o processo principal unifica os dicionários
+num só, remapeia os ids e monta um `ArrayStore` (ver `src.array_store`) de
+uma vez, com as permutações ordenadas sem passar pelos buffers de escrita.
+
+O resultado é um `rdflib.Graph` comum, então serve direto ao motor:
+
+    SPARQLQueryEngine(parallel_load("data/kb_conflito_v5_inferido.nt"))
+
+Nós em branco com o mesmo rótulo resolvem para o mesmo `BNode` em todo o
+arquivo, mesmo em faixas diferentes. Arquivos `.gz` não admitem divisão por
+bytes e são lidos num único bloco; o grafo nomeado das N-Quads é ignorado.
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from rdflib import BNode, Graph
+from rdflib.plugins.parsers.ntriples import ParseError
+
+try:
+    from src.array_store import ArrayStore
+    from src.snapshot import decode_term, encode_term
+    from src.streaming import _LineParser, _open
+except ImportError:  # execução direta: python src/parallel_load.py
+    from array_store import ArrayStore
+    from snapshot import decode_term, encode_term
+    from streaming import _LineParser, _open
+
+# Tamanho mínimo de uma faixa: abaixo disso o custo do pool supera o ganho
+MIN_CHUNK_BYTES = 1 << 20
+
+
+class _Labels(dict):
+    """Contexto de nós em branco que preserva o rótulo do arquivo (unificado no processo principal)."""
+
+    def get(self, label, default=None):
+        return label
+
+
+def byte_ranges(path, n_chunks):
+    """
+    Divide um arquivo em até `n_chunks` faixas [início, fim) terminadas em quebra de linha.
+
+    Returns:
+        list[tuple]: Faixas não vazias, em ordem, cobrindo o arquivo inteiro.
+    """
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for k in range(1, n_chunks):
+            target = max(size * k // n_chunks, bounds[-1])
+            f.seek(target)
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _lines(path, start, end):
+    if end is None:
+        with _open(path, "r") as f:
+            yield from enumerate(f)
+        return
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    offset = start
+    for line in data.split(b"\n"):
+        yield offset, line.decode("utf-8")
+        offset += len(line) + 1
+
+
+def _parse_range(task):
+    """
+    Interpreta uma faixa do arquivo no processo do pool.
+
+    Returns:
+        tuple: (termos codificados, triplas em ids locais como `array('I')` plano).
+    """
+    path, start, end = task
+    parser = _LineParser()
+    labels = _Labels()
+    ids = {}
+    rows = array("I")
+    for position, line in _lines(path, start, end):
+        try:
+            statement = parser.statement(line.rstrip("\r\n"), labels)
+        except ParseError as e:
+            where = f"linha {position + 1}" if end is None else f"byte {position}"
+            raise ParseError(f"{path}:{where}: {e}") from None
+        if statement is None:
+            continue
+        for term in statement[:3]:
+            key = encode_term(term)
+            i = ids.get(key)
+            if i is None:
+                i = ids[key] = len(ids)
+            rows.append(i)
+    return list(ids), rows
+
+
+def parallel_load(path, workers=None, chunk_bytes=MIN_CHUNK_BYTES):
+    """
+    Carrega um arquivo de uma declaração por linha em paralelo.
+
+    Args:
+        path (str): Arquivo N-Triples/N-Quads (ou Turtle normalizado, uma tripla por linha).
+        workers (int, opcional): Número de processos (padrão: os.cpu_count()).
+            Com 1, ou com um arquivo menor que `chunk_bytes`, tudo roda no próprio processo.
+        chunk_bytes (int): Tamanho mínimo de cada faixa.
+
+    Returns:
+        rdflib.Graph: Grafo sobre um `ArrayStore` com o dicionário de termos unificado.
+    """
+    workers = workers or os.cpu_count() or 1
+    if str(path).endswith(".gz"):
+        tasks = [(path, 0, None)]
+    else:
+        n_chunks = max(1, min(workers, os.path.getsize(path) // max(chunk_bytes, 1)))
+        tasks = [(path, start, end) for start, end in byte_ranges(path, n_chunks)]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_parse_range, tasks))
+    else:
+        results = [_parse_range(task) for task in tasks]
+
+    ids = {}
+    terms = []
+    bnodes = {}
+    rows = set()
+    for keys, local_rows in results:
+        remap = array("I")
+        for key in keys:
+            i = ids.get(key)
+            if i is None:
+                i = ids[key] = len(terms)
+                term = decode_term(key)
+                if isinstance(term, BNode):
+                    term = bnodes.setdefault(term, BNode())
+                terms.append(term)
+            remap.append(i)
+        rows.update(zip(*[(remap[i] for i in local_rows[k::3]) for k in range(3)]))
+    return Graph(store=ArrayStore.from_rows(terms, rows))
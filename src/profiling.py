@@ -0,0 +1,63 @@
+# src/profiling.py
+"""
+Instrumentação dos Motores de Inferência.
+
+Um `RuleProfile` passado aos reasoners acumula, para cada regra, quantas vezes
+ela disparou (conclusões produzidas), quantas dessas conclusões eram novas ou
+duplicadas e o tempo gasto, além do número de iterações até o ponto fixo em
+cada fase (TBox, instâncias, incremental). O relatório é um JSON gravado ao
+lado do grafo inferido, para comparar execuções quando o schema muda.
+"""
+import json
+import time
+from contextlib import contextmanager
+
+
+class RuleProfile:
+    """Contadores por regra e por fase de uma execução do reasoner."""
+
+    def __init__(self):
+        self.rules = {}
+        self.phases = {}
+        self._current = None
+
+    @contextmanager
+    def phase(self, name):
+        """Delimita uma fase: mede o tempo total e recebe as iterações de `iteration`."""
+        stats = self.phases.setdefault(name, {"iterations": 0, "time": 0.0})
+        previous, self._current = self._current, stats
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats["time"] += time.perf_counter() - start
+            self._current = previous
+
+    def iteration(self):
+        """Conta uma iteração (uma geração de triplas novas) na fase corrente."""
+        if self._current is not None:
+            self._current["iterations"] += 1
+
+    def record(self, rule, new=0, duplicate=0, elapsed=0.0):
+        """Acumula as conclusões novas/duplicadas e o tempo de uma aplicação de `rule`."""
+        stats = self.rules.get(rule)
+        if stats is None:
+            stats = self.rules[rule] = {"fired": 0, "new": 0, "duplicate": 0, "time": 0.0}
+        stats["fired"] += new + duplicate
+        stats["new"] += new
+        stats["duplicate"] += duplicate
+        stats["time"] += elapsed
+
+    def as_dict(self):
+        """Relatório ordenado por tempo gasto em cada regra (maior primeiro)."""
+        rules = sorted(self.rules.items(), key=lambda item: item[1]["time"], reverse=True)
+        return {
+            "phases": self.phases,
+            "iterations": sum(p["iterations"] for p in self.phases.values()),
+            "rules": dict(rules),
+        }
+
+    def save(self, path):
+        """Grava o relatório em JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2, ensure_ascii=False)
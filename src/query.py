@@ -0,0 +1,131 @@
+# src/query.py
+"""
+Ponto de Entrada Leve para Consultas.
+
+Processos de consulta de vida curta gastam mais tempo importando módulos do
+que respondendo. Este módulo só importa o motor de consultas e o carregamento
+da base pronta (snapshot, Turtle ou SQLite): o reasoner, o owlrl, a pilha de
+visualização (matplotlib, networkx, pyvis) e as dependências de notebook
+ficam de fora, e os módulos pesados de `src` são importados no primeiro uso.
+
+    python -m src.query normative_conflict
+    python -m src.query --benchmark
+
+O modo `--benchmark` mede, em interpretadores novos, o tempo de importação,
+de carga da base e da primeira consulta, e lista os módulos pesados que
+acabaram importados (deve ser vazio).
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+try:
+    from src.sparql_queries import SPARQLQueryEngine
+except ImportError:  # execução direta: python src/query.py
+    from sparql_queries import SPARQLQueryEngine
+
+DEFAULT_KB = "data/kb_conflito_v5_inferido.ttl"
+
+# Módulos que uma consulta nunca deve importar
+HEAVY_MODULES = ("owlrl", "src.reasoner", "src.consistency", "matplotlib", "networkx", "pyvis",
+                 "pandas", "IPython", "ipykernel")
+
+QUERIES = {
+    "normative_conflict": "query_normative_conflict",
+    "ambiguous_actors": "query_ambiguous_actors",
+    "causality_chain": "query_causality_chain",
+    "spatial_overlap": "query_spatial_overlap",
+    "legal_breaches": "query_legal_breaches",
+    "institutional_fragmentation": "query_institutional_fragmentation",
+    "benefit_damage_reversals": "query_benefit_damage_reversals",
+    "market_pressure_on_zeis": "query_market_pressure_on_zeis",
+    "conflicting_jurisdictions": "query_conflicting_jurisdictions",
+    "full_conflict_narrative": "query_full_conflict_narrative",
+}
+
+# Executado em um interpretador novo por `startup_benchmark`
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from src.query import HEAVY_MODULES, open_engine, run_query
+imported = time.perf_counter()
+engine = open_engine({path!r})
+loaded = time.perf_counter()
+run_query(engine, {query!r})
+queried = time.perf_counter()
+print(json.dumps({{"import": imported - start, "load": loaded - imported, "query": queried - loaded,
+                  "heavy": [m for m in HEAVY_MODULES if m in sys.modules]}}))
+"""
+
+
+def open_engine(path=DEFAULT_KB, native=False, labels="all"):
+    """Abre uma base já construída (Turtle com snapshot ou SQLite) para consulta."""
+    return SPARQLQueryEngine.from_file(path, native=native, labels=labels)
+
+
+def run_query(engine, name):
+    """
+    Executa uma das consultas predefinidas pelo nome curto (ver `QUERIES`).
+
+    Raises:
+        KeyError: Se a consulta não existe.
+    """
+    if name not in QUERIES:
+        raise KeyError(f"Consulta inexistente: {name}")
+    return getattr(engine, QUERIES[name])()
+
+
+def startup_benchmark(path=DEFAULT_KB, query="normative_conflict", runs=5):
+    """
+    Mede o início a frio de um processo de consulta, em `runs` interpretadores novos.
+
+    Returns:
+        list[dict]: Por execução, os tempos de importação, carga e primeira
+        consulta (segundos) e os módulos pesados importados.
+    """
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(path=path, query=query)],
+                             capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout))
+    return results
+
+
+def format_benchmark(results):
+    """Tabela com a mediana e o mínimo de cada fase do início a frio."""
+    lines = [f"{'Fase':<10} {'Mediana':>9} {'Mínimo':>9}"]
+    for phase in ("import", "load", "query"):
+        times = sorted(r[phase] for r in results)
+        lines.append(f"{phase:<10} {times[len(times) // 2]:>8.3f}s {times[0]:>8.3f}s")
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    lines.append(f"Módulos pesados importados: {', '.join(heavy) if heavy else 'nenhum'}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta uma base de conhecimento já construída.")
+    parser.add_argument("query", nargs="?", choices=sorted(QUERIES), help="Consulta predefinida.")
+    parser.add_argument("--kb", default=DEFAULT_KB, help="Base inferida (.ttl ou .sqlite).")
+    parser.add_argument("--native", action="store_true", help="Usa os planos nativos em vez do SPARQL.")
+    parser.add_argument("--labels", choices=("all", "preferred", "none"), default="all",
+                        help="Todos os rótulos, só o preferido (anexado no fim) ou só URIs.")
+    parser.add_argument("--benchmark", action="store_true", help="Mede o tempo de início a frio.")
+    parser.add_argument("--runs", type=int, default=5, help="Execuções do benchmark.")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        print(format_benchmark(startup_benchmark(args.kb, args.query or "normative_conflict", args.runs)))
+        return
+    if args.query is None:
+        parser.error("informe uma consulta ou --benchmark")
+    start = time.perf_counter()
+    results = run_query(open_engine(args.kb, native=args.native, labels=args.labels), args.query)
+    for row in results:
+        print(json.dumps({k: str(v) for k, v in row.items()}, ensure_ascii=False))
+    print(f"{len(results)} resultado(s) em {time.perf_counter() - start:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1070 @@
+# src/reasoner.py
+"""
+Motores de Inferência especializados para a Ontologia de Conflitos Urbanos.
+
+1. IncrementalReasoner: materialização incremental (semi-naive).
+2. CompiledReasoner: fechamento completo com regras compiladas a partir do schema.
+3. ParallelReasoner: o fechamento compilado particionado por sujeito em um pool de processos.
+
+O `owlrl.DeductiveClosure` reavalia todas as regras sobre o grafo inteiro a cada
+ciclo. Aqui as mesmas regras OWL-RL usadas pelo nosso schema são avaliadas de
+forma dirigida por delta: cada tripla nova é combinada apenas com o que já está
+no grafo, e somente as consequências ainda inéditas entram na fila. O custo de
+uma edição passa a acompanhar o tamanho da mudança, não o tamanho da base.
+
+Regras cobertas (mesma nomenclatura do perfil OWL 2 RL):
+- eq-ref
+- prp-dom, prp-rng, prp-symp, prp-trp, prp-spo1, prp-eqp1/2
+- cax-sco, cax-eqc1/2
+- scm-cls, scm-sco, scm-eqc1/2, scm-op/dp, scm-spo, scm-eqp1/2,
+  scm-dom1/2, scm-rng1/2
+- dt-type2 (tipagem de literais com datatype)
+
+Para o IncrementalReasoner, o grafo de partida deve já estar fechado (por
+exemplo, a saída de `run_inference`), pois as regras axiomáticas de execução
+única do owlrl (cls-thing, prp-ap, dt-type1) não são reaplicadas. Com o conjunto
+de triplas asseridas, ele também retira asserções (`retract`) no estilo DRed:
+super-remove tudo o que dependia delas e rederiva o que ainda tem outro suporte.
+
+O CompiledReasoner lê o schema, fecha a TBox uma única vez e traduz o que
+sobra em tabelas de despacho por predicado (superclasses, superpropriedades,
+domínio/imagem, simetria, transitividade). As instâncias são então
+materializadas com consultas diretas a dicionários, sem reavaliar as dezenas
+de regras OWL-RL que nunca disparam para o nosso vocabulário.
+"""
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+
+from rdflib import BNode, Literal, Namespace, RDF, RDFS, OWL
+from owlrl.OWLRL import OWLRL_Annotation_properties
+from owlrl.XsdDatatypes import OWL_RL_Datatypes, OWL_Datatype_Subsumptions
+
+PROPERTY_TYPES = (OWL.ObjectProperty, OWL.DatatypeProperty, RDF.Property)
+
+
+# =============================================================================
+# REGRAS DIRIGIDAS POR DELTA
+# Cada regra recebe o grafo e uma tripla recém-adicionada e devolve pares
+# (conclusão, demais premissas) para as conclusões que envolvem essa tripla
+# como uma das premissas; as demais premissas são () nas regras de uma só.
+# Regras com duas premissas são tratadas nos dois sentidos, já que qualquer
+# uma delas pode ser a tripla nova.
+# =============================================================================
+
+def _rule_eq_ref(g, triple):
+    s, p, o = triple
+    yield (s, OWL.sameAs, s), ()
+    yield (p, OWL.sameAs, p), ()
+    yield (o, OWL.sameAs, o), ()
+
+
+def _rule_dt_type2(g, triple):
+    o = triple[2]
+    if isinstance(o, Literal) and o.datatype in OWL_RL_Datatypes:
+        yield (o, RDF.type, o.datatype), ()
+        for super_dt in OWL_Datatype_Subsumptions.get(o.datatype, ()):
+            yield (o, RDF.type, super_dt), ()
+
+
+def _rule_prp_dom_rng(g, triple):
+    s, p, o = triple
+    if p == RDFS.domain:
+        for x, y in g.subject_objects(s):
+            yield (x, RDF.type, o), ((x, s, y),)
+    elif p == RDFS.range:
+        for x, y in g.subject_objects(s):
+            yield (y, RDF.type, o), ((x, s, y),)
+    for c in g.objects(p, RDFS.domain):
+        yield (s, RDF.type, c), ((p, RDFS.domain, c),)
+    for c in g.objects(p, RDFS.range):
+        yield (o, RDF.type, c), ((p, RDFS.range, c),)
+
+
+def _rule_prp_symp(g, triple):
+    s, p, o = triple
+    if p == RDF.type and o == OWL.SymmetricProperty:
+        for x, y in g.subject_objects(s):
+            yield (y, s, x), ((x, s, y),)
+    if (p, RDF.type, OWL.SymmetricProperty) in g:
+        yield (o, p, s), ((p, RDF.type, OWL.SymmetricProperty),)
+
+
+def _rule_prp_trp(g, triple):
+    s, p, o = triple
+    if p == RDF.type and o == OWL.TransitiveProperty:
+        for x, y in g.subject_objects(s):
+            for z in g.objects(y, s):
+                yield (x, s, z), ((x, s, y), (y, s, z))
+    if (p, RDF.type, OWL.TransitiveProperty) in g:
+        for z in g.objects(o, p):
+            yield (s, p, z), ((o, p, z),)
+        for w in g.subjects(p, s):
+            yield (w, p, o), ((w, p, s),)
+
+
+def _rule_prp_spo1_eqp(g, triple):
+    s, p, o = triple
+    if p == RDFS.subPropertyOf:
+        for x, y in g.subject_objects(s):
+            yield (x, o, y), ((x, s, y),)
+    elif p == OWL.equivalentProperty and s != o:
+        for x, y in g.subject_objects(s):
+            yield (x, o, y), ((x, s, y),)
+        for x, y in g.subject_objects(o):
+            yield (x, s, y), ((x, o, y),)
+    for p2 in g.objects(p, RDFS.subPropertyOf):
+        yield (s, p2, o), ((p, RDFS.subPropertyOf, p2),)
+    for p2 in g.objects(p, OWL.equivalentProperty):
+        yield (s, p2, o), ((p, OWL.equivalentProperty, p2),)
+    for p2 in g.subjects(OWL.equivalentProperty, p):
+        yield (s, p2, o), ((p2, OWL.equivalentProperty, p),)
+
+
+def _rule_cax_sco_eqc(g, triple):
+    s, p, o = triple
+    if p == RDFS.subClassOf and s != o:
+        for x in g.subjects(RDF.type, s):
+            yield (x, RDF.type, o), ((x, RDF.type, s),)
+    elif p == OWL.equivalentClass and s != o:
+        for x in g.subjects(RDF.type, s):
+            yield (x, RDF.type, o), ((x, RDF.type, s),)
+        for x in g.subjects(RDF.type, o):
+            yield (x, RDF.type, s), ((x, RDF.type, o),)
+    elif p == RDF.type:
+        for c in g.objects(o, RDFS.subClassOf):
+            yield (s, RDF.type, c), ((o, RDFS.subClassOf, c),)
+        for c in g.objects(o, OWL.equivalentClass):
+            yield (s, RDF.type, c), ((o, OWL.equivalentClass, c),)
+        for c in g.subjects(OWL.equivalentClass, o):
+            yield (s, RDF.type, c), ((c, OWL.equivalentClass, o),)
+
+
+def _rule_scm_cls_op(g, triple):
+    s, p, o = triple
+    if p != RDF.type:
+        return
+    if o == OWL.Class:
+        yield (s, RDFS.subClassOf, s), ()
+        yield (s, OWL.equivalentClass, s), ()
+        yield (s, RDFS.subClassOf, OWL.Thing), ()
+        yield (OWL.Nothing, RDFS.subClassOf, s), ()
+    elif o in PROPERTY_TYPES:
+        yield (s, RDFS.subPropertyOf, s), ()
+        yield (s, OWL.equivalentProperty, s), ()
+
+
+def _hierarchy_rules(g, triple, sub, equivalent):
+    """scm-sco/scm-spo (transitividade) e scm-eqc/scm-eqp para uma hierarquia."""
+    s, p, o = triple
+    if p == sub and s != o:
+        for c3 in g.objects(o, sub):
+            if s != c3:
+                yield (s, sub, c3), ((o, sub, c3),)
+        for c0 in g.subjects(sub, s):
+            if c0 != s and c0 != o:
+                yield (c0, sub, o), ((c0, sub, s),)
+        if (o, sub, s) in g:
+            yield (s, equivalent, o), ((o, sub, s),)
+            yield (o, equivalent, s), ((o, sub, s),)
+    elif p == equivalent and s != o:
+        yield (s, sub, o), ()
+        yield (o, sub, s), ()
+
+
+def _rule_scm_sco_eqc(g, triple):
+    return _hierarchy_rules(g, triple, RDFS.subClassOf, OWL.equivalentClass)
+
+
+def _rule_scm_spo_eqp(g, triple):
+    return _hierarchy_rules(g, triple, RDFS.subPropertyOf, OWL.equivalentProperty)
+
+
+def _rule_scm_dom_rng(g, triple):
+    s, p, o = triple
+    if p in (RDFS.domain, RDFS.range):
+        # scm-dom1 / scm-rng1
+        for c2 in g.objects(o, RDFS.subClassOf):
+            if c2 != o:
+                yield (s, p, c2), ((o, RDFS.subClassOf, c2),)
+        # scm-dom2 / scm-rng2
+        for p1 in g.subjects(RDFS.subPropertyOf, s):
+            if p1 != s:
+                yield (p1, p, o), ((p1, RDFS.subPropertyOf, s),)
+    elif p == RDFS.subClassOf and s != o:
+        for prop in g.subjects(RDFS.domain, s):
+            yield (prop, RDFS.domain, o), ((prop, RDFS.domain, s),)
+        for prop in g.subjects(RDFS.range, s):
+            yield (prop, RDFS.range, o), ((prop, RDFS.range, s),)
+    elif p == RDFS.subPropertyOf and s != o:
+        for c in g.objects(o, RDFS.domain):
+            yield (s, RDFS.domain, c), ((o, RDFS.domain, c),)
+        for c in g.objects(o, RDFS.range):
+            yield (s, RDFS.range, c), ((o, RDFS.range, c),)
+
+
+DELTA_RULES = [
+    ("eq-ref", _rule_eq_ref),
+    ("dt-type2", _rule_dt_type2),
+    ("prp-dom/rng", _rule_prp_dom_rng),
+    ("prp-symp", _rule_prp_symp),
+    ("prp-trp", _rule_prp_trp),
+    ("prp-spo1/eqp", _rule_prp_spo1_eqp),
+    ("cax-sco/eqc", _rule_cax_sco_eqc),
+    ("scm-cls/op", _rule_scm_cls_op),
+    ("scm-sco/eqc", _rule_scm_sco_eqc),
+    ("scm-spo/eqp", _rule_scm_spo_eqp),
+    ("scm-dom/rng", _rule_scm_dom_rng),
+]
+
+# Modo enxuto: sem eq-ref (owl:sameAs reflexivo) nem dt-type2 (tipagem de literais)
+LEAN_RULES = [(name, rule) for name, rule in DELTA_RULES if name not in ("eq-ref", "dt-type2")]
+
+
+def _collapsed_rules(rules, collapsed):
+    """
+    Regras delta sem o fechamento simétrico-transitivo das propriedades `collapsed`.
+
+    prp-symp e prp-trp deixam de gerar triplas dessas propriedades; em troca, cada
+    aresta tipa os dois extremos com o domínio e a imagem (ver `instance_consequences`).
+    """
+    def skipping(rule):
+        def wrapped(g, triple):
+            return ((new, others) for new, others in rule(g, triple) if new[1] not in collapsed)
+        return wrapped
+
+    def prp_symp_dom_rng(g, triple):
+        s, p, o = triple
+        if p not in collapsed:
+            return
+        symmetric = (p, RDF.type, OWL.SymmetricProperty)
+        for c in g.objects(p, RDFS.domain):
+            yield (o, RDF.type, c), (symmetric, (p, RDFS.domain, c))
+        for c in g.objects(p, RDFS.range):
+            yield (s, RDF.type, c), (symmetric, (p, RDFS.range, c))
+
+    return [(name, skipping(rule) if name in ("prp-symp", "prp-trp") else rule) for name, rule in rules] \
+        + [("prp-symp/dom/rng", prp_symp_dom_rng)]
+
+
+def is_low_value(triple):
+    """
+    Indica se a tripla é uma entailment trivial que nenhuma consulta lê.
+
+    São as que o modo enxuto nunca gera: tipagens owl:Thing, owl:sameAs
+    reflexivo e tipagens de literais (por dt-type2 ou pela imagem de uma
+    propriedade de dados). As triplas axiomáticas de datatypes nem chegam a
+    ser produzidas, pois o modo enxuto não roda as regras de execução única.
+    """
+    s, p, o = triple
+    if p == RDF.type:
+        return o == OWL.Thing or isinstance(s, Literal)
+    return p == OWL.sameAs and s == o
+
+
+# Triplas axiomáticas das regras de execução única do owlrl (cls-thing,
+# cls-nothing1, prp-ap, dt-type1). Nenhuma regra delta as deriva, então a
+# retração as trata como fatos de base, assim como as asserções.
+AXIOMATIC_TRIPLES = frozenset(
+    [(OWL.Thing, RDF.type, OWL.Class), (OWL.Nothing, RDF.type, OWL.Class)]
+    + [(an, RDF.type, OWL.AnnotationProperty) for an in OWLRL_Annotation_properties]
+    + [(dt, RDF.type, RDFS.Datatype) for dt in OWL_RL_Datatypes]
+)
+
+
+class IncrementalReasoner:
+    """Mantém um grafo fechado e materializa apenas as consequências de novas triplas."""
+
+    def __init__(self, graph, rules=None, asserted=None, justifications=None, profile=None,
+                 lean=False, collapse_equivalences=False):
+        """
+        Inicializa o reasoner sobre um grafo já inferido.
+
+        Args:
+            graph (rdflib.Graph): Grafo fechado (asserções + inferências anteriores).
+                É modificado no lugar a cada chamada de `add` ou `retract`.
+            rules (list, opcional): Lista de pares (nome, função) de regras delta.
+            asserted (iterable, opcional): Triplas asseridas do grafo (ex: o conteúdo de
+                kb_conflito_v5_final.ttl). Necessário para `retract`.
+            justifications (JustificationStore, opcional): Se informado, registra a regra
+                e as premissas de cada tripla inferida (ver `src.justifications`).
+            profile (RuleProfile, opcional): Se informado, acumula disparos, conclusões
+                novas/duplicadas e tempo por regra (ver `src.profiling`).
+            lean (bool): Nunca gera as entailments triviais de `is_low_value`. Use-o
+                sobre grafos produzidos também no modo enxuto.
+            collapse_equivalences (bool): Não materializa o fechamento das propriedades
+                simétricas e transitivas, como `CompiledReasoner(collapse_equivalences=True)`.
+                Use-o sobre grafos produzidos também nesse modo.
+        """
+        self.graph = graph
+        self.lean = lean
+        if rules is None:
+            rules = LEAN_RULES if lean else DELTA_RULES
+        self.collapsed = collapsible_properties(RulePlan(graph)) if collapse_equivalences else frozenset()
+        if self.collapsed:
+            rules = _collapsed_rules(rules, self.collapsed)
+        self.rules = rules
+        self.asserted = set(asserted) if asserted is not None else None
+        self.justifications = justifications
+        self.profile = profile
+
+    def add(self, triples):
+        """
+        Adiciona triplas asseridas e calcula o ponto fixo apenas a partir delas.
+
+        Args:
+            triples (iterable): Triplas (s, p, o) a inserir.
+
+        Returns:
+            dict: {"asserted": set, "inferred": set} com as triplas efetivamente novas.
+        """
+        g = self.graph
+        asserted = set()
+        for t in triples:
+            if self.asserted is not None:
+                self.asserted.add(t)
+            if t not in g:
+                g.add(t)
+                asserted.add(t)
+
+        inferred = self._propagate(asserted)
+        return {"asserted": asserted, "inferred": inferred}
+
+    def _propagate(self, seeds):
+        """Ponto fixo semi-naive a partir de triplas já presentes no grafo."""
+        g = self.graph
+        justifications = self.justifications
+        profile = self.profile
+        lean = self.lean
+        inferred = set()
+        delta = deque(seeds)
+        while delta:
+            if profile is not None:
+                profile.iteration()
+            # Uma geração por vez: as triplas novas entram no fim da fila
+            for _ in range(len(delta)):
+                triple = delta.popleft()
+                for name, rule in self.rules:
+                    if profile is not None:
+                        start, new_count, duplicates = time.perf_counter(), 0, 0
+                    for new, others in rule(g, triple):
+                        # Assim como no owlrl, nunca se gera tripla com predicado literal
+                        if isinstance(new[1], Literal) or (lean and is_low_value(new)):
+                            continue
+                        if new in g:
+                            if profile is not None:
+                                duplicates += 1
+                            continue
+                        g.add(new)
+                        inferred.add(new)
+                        delta.append(new)
+                        if justifications is not None:
+                            justifications.record(new, name, (triple,) + others)
+                        if profile is not None:
+                            new_count += 1
+                    if profile is not None and (new_count or duplicates):
+                        profile.record(name, new_count, duplicates, time.perf_counter() - start)
+        return inferred
+
+    def retract(self, triples):
+        """
+        Remove triplas asseridas e apenas as inferências que perderam todo suporte (DRed).
+
+        1. Super-remoção: marca tudo o que foi derivado, direta ou indiretamente, com
+           alguma das triplas retiradas como premissa.
+        2. Remove as marcadas do grafo.
+        3. Rederivação: recupera as marcadas que ainda têm uma derivação de um passo a
+           partir do que restou, e propaga as consequências delas.
+
+        Args:
+            triples (iterable): Triplas asseridas a retirar (ex: as de uma lei revogada).
+
+        Returns:
+            dict: {"retracted": set, "removed": set, "rederived": set}, onde "removed"
+            são as triplas que efetivamente saíram do grafo.
+        """
+        if self.asserted is None:
+            raise ValueError("A retração exige o conjunto de triplas asseridas (parâmetro 'asserted').")
+        g = self.graph
+        retracted = {t for t in triples if t in self.asserted}
+        self.asserted -= retracted
+
+        # 1. Super-remoção, avaliada sobre o grafo ainda completo
+        marked = set(retracted)
+        queue = deque(retracted)
+        while queue:
+            triple = queue.popleft()
+            for _, rule in self.rules:
+                for t, _ in rule(g, triple):
+                    if t in marked or t not in g or t in self.asserted or t in AXIOMATIC_TRIPLES:
+                        continue
+                    marked.add(t)
+                    queue.append(t)
+
+        # 2. Remoção
+        for t in marked:
+            g.remove(t)
+            if self.justifications is not None:
+                self.justifications.discard(t)
+
+        # 3. Rederivação de um passo e propagação
+        derivations = {t: self._derivation(t) for t in marked}
+        rederived = {t for t, d in derivations.items() if d is not None}
+        for t in rederived:
+            g.add(t)
+            if self.justifications is not None:
+                self.justifications.record(t, *derivations[t])
+        rederived |= self._propagate(rederived)
+
+        return {"retracted": retracted, "removed": marked - rederived, "rederived": rederived}
+
+    def _derivation(self, triple):
+        """(regra, premissas) de uma derivação de `triple` sobre o grafo atual, ou None."""
+        names = {name for name, _ in self.rules}
+        for name, premises in self._derivations(triple):
+            if name in names and all(t in self.graph for t in premises):
+                return name, premises
+        return None
+
+    def _derivations(self, triple):
+        """
+        Derivações candidatas de `triple`, uma regra por vez, buscadas pela forma da conclusão.
+
+        Cada regra é invertida: a partir da conclusão, os índices do grafo dão as
+        premissas de schema (domínio, imagem, superclasses, superpropriedades...) e
+        só então as de instância, sem varrer tudo o que toca o sujeito ou o objeto.
+        """
+        g = self.graph
+        s, p, o = triple
+        if p == OWL.sameAs and s == o:
+            # eq-ref: basta o termo ainda ocorrer em alguma tripla
+            for pattern in ((s, None, None), (None, s, None), (None, None, s)):
+                for premise in g.triples(pattern):
+                    yield "eq-ref", (premise,)
+                    return
+            return
+        if p in SCHEMA_PREDICATES:
+            # Regras scm-*: todas as premissas pertencem à TBox
+            for term in (s, o):
+                for pred in SCHEMA_PREDICATES:
+                    for pattern in ((term, pred, None), (None, pred, term)):
+                        for premise in g.triples(pattern):
+                            for name, rule in self.rules:
+                                for new, others in rule(g, premise):
+                                    if new == triple:
+                                        yield name, (premise,) + others
+            for cls in META_CLASSES:
+                for term in (s, o):
+                    if (term, RDF.type, cls) in g:
+                        for name, rule in self.rules:
+                            for new, others in rule(g, (term, RDF.type, cls)):
+                                if new == triple:
+                                    yield name, ((term, RDF.type, cls),) + others
+            return
+        if p == RDF.type:
+            c = o
+            # prp-dom / prp-rng
+            for q in g.subjects(RDFS.domain, c):
+                for y in g.objects(s, q):
+                    yield "prp-dom/rng", ((s, q, y), (q, RDFS.domain, c))
+            for q in g.subjects(RDFS.range, c):
+                for x in g.subjects(q, s):
+                    yield "prp-dom/rng", ((x, q, s), (q, RDFS.range, c))
+            # cax-sco / cax-eqc
+            for c0 in g.subjects(RDFS.subClassOf, c):
+                if c0 != c:
+                    yield "cax-sco/eqc", ((s, RDF.type, c0), (c0, RDFS.subClassOf, c))
+            for c0 in g.objects(c, OWL.equivalentClass):
+                yield "cax-sco/eqc", ((s, RDF.type, c0), (c, OWL.equivalentClass, c0))
+            for c0 in g.subjects(OWL.equivalentClass, c):
+                yield "cax-sco/eqc", ((s, RDF.type, c0), (c0, OWL.equivalentClass, c))
+            # prp-symp/dom/rng: no fechamento colapsado, membros do grupo nos dois papéis
+            for q in self.collapsed:
+                if (q, RDFS.domain, c) in g:
+                    for w in g.subjects(q, s):
+                        yield "prp-symp/dom/rng", ((w, q, s), (q, RDF.type, OWL.SymmetricProperty),
+                                                   (q, RDFS.domain, c))
+                if (q, RDFS.range, c) in g:
+                    for y in g.objects(s, q):
+                        yield "prp-symp/dom/rng", ((s, q, y), (q, RDF.type, OWL.SymmetricProperty),
+                                                   (q, RDFS.range, c))
+            # dt-type2: o literal ocorre como objeto de alguma tripla
+            if isinstance(s, Literal) and (c == s.datatype or c in OWL_Datatype_Subsumptions.get(s.datatype, ())):
+                for premise in g.triples((None, None, s)):
+                    yield "dt-type2", (premise,)
+                    break
+        if p in self.collapsed:
+            return
+        # prp-symp
+        if (p, RDF.type, OWL.SymmetricProperty) in g:
+            yield "prp-symp", ((o, p, s), (p, RDF.type, OWL.SymmetricProperty))
+        # prp-trp: junção pelo nó intermediário, a partir do sujeito
+        if (p, RDF.type, OWL.TransitiveProperty) in g:
+            for y in g.objects(s, p):
+                if y != o and y != s:
+                    yield "prp-trp", ((s, p, y), (y, p, o))
+        # prp-spo1 / prp-eqp
+        for q in g.subjects(RDFS.subPropertyOf, p):
+            if q != p:
+                yield "prp-spo1/eqp", ((s, q, o), (q, RDFS.subPropertyOf, p))
+        for q in g.objects(p, OWL.equivalentProperty):
+            if q != p:
+                yield "prp-spo1/eqp", ((s, q, o), (p, OWL.equivalentProperty, q))
+        for q in g.subjects(OWL.equivalentProperty, p):
+            if q != p:
+                yield "prp-spo1/eqp", ((s, q, o), (q, OWL.equivalentProperty, p))
+
+
+# =============================================================================
+# MOTOR COMPILADO A PARTIR DO SCHEMA
+# =============================================================================
+
+ERRNS = Namespace("http://www.daml.org/2002/03/agents/agent-ont#")
+
+# Predicados que descrevem o schema (TBox)
+SCHEMA_PREDICATES = {
+    RDFS.subClassOf, RDFS.subPropertyOf, OWL.equivalentClass,
+    OWL.equivalentProperty, RDFS.domain, RDFS.range, OWL.disjointWith,
+}
+
+# Metaclasses cuja tipagem também pertence ao schema
+META_CLASSES = {
+    OWL.Class, RDFS.Class, RDF.Property, RDFS.Datatype, OWL.ObjectProperty,
+    OWL.DatatypeProperty, OWL.AnnotationProperty, OWL.SymmetricProperty,
+    OWL.TransitiveProperty,
+}
+
+# Construtos OWL-RL que o motor compilado não implementa
+UNSUPPORTED_PREDICATES = {
+    OWL.inverseOf, OWL.propertyChainAxiom, OWL.hasKey, OWL.onProperty,
+    OWL.someValuesFrom, OWL.allValuesFrom, OWL.hasValue, OWL.intersectionOf,
+    OWL.unionOf, OWL.complementOf, OWL.oneOf, OWL.maxCardinality,
+    OWL.maxQualifiedCardinality, OWL.sourceIndividual, OWL.propertyDisjointWith,
+}
+UNSUPPORTED_TYPES = {
+    OWL.FunctionalProperty, OWL.InverseFunctionalProperty, OWL.IrreflexiveProperty,
+    OWL.AsymmetricProperty, OWL.AllDifferent, OWL.AllDisjointClasses,
+    OWL.AllDisjointProperties,
+}
+
+
+class UnsupportedConstructError(ValueError):
+    """O grafo usa um construto OWL que o motor compilado não cobre."""
+
+
+def is_schema_triple(triple):
+    """Indica se a tripla pertence à TBox (axiomas e declarações do schema)."""
+    _, p, o = triple
+    return p in SCHEMA_PREDICATES or (p == RDF.type and o in META_CLASSES)
+
+
+def check_supported(graph):
+    """Lança UnsupportedConstructError se o grafo usar construtos fora do escopo."""
+    for s, p, o in graph:
+        if p in UNSUPPORTED_PREDICATES:
+            raise UnsupportedConstructError(f"Predicado não suportado: {p}")
+        if p == RDF.type and o in UNSUPPORTED_TYPES:
+            raise UnsupportedConstructError(f"Tipo não suportado: {o}")
+        if p == OWL.sameAs and s != o:
+            raise UnsupportedConstructError(f"owl:sameAs não reflexivo: {s} = {o}")
+        # Axiomas sobre o próprio vocabulário do schema (meta-modelagem)
+        if s in SCHEMA_PREDICATES or s == RDF.type:
+            if p in (RDFS.domain, RDFS.range, RDFS.subPropertyOf, OWL.equivalentProperty) or p == RDF.type:
+                raise UnsupportedConstructError(f"Meta-modelagem não suportada: {s} {p} {o}")
+        if p in (RDFS.domain, RDFS.range, RDFS.subClassOf) and o in META_CLASSES:
+            raise UnsupportedConstructError(f"Meta-modelagem não suportada: {s} {p} {o}")
+        if p == RDFS.subPropertyOf and (o in SCHEMA_PREDICATES or o == RDF.type):
+            raise UnsupportedConstructError(f"Meta-modelagem não suportada: {s} {p} {o}")
+
+
+class RulePlan:
+    """Tabelas de despacho compiladas a partir de uma TBox já fechada."""
+
+    def __init__(self, tbox):
+        """
+        Args:
+            tbox (rdflib.Graph): TBox fechada (saída de `IncrementalReasoner` sobre o schema).
+        """
+        def _without(items, x):
+            return frozenset(i for i in items if i != x)
+
+        self.superclasses = {}
+        for c in set(tbox.subjects(RDFS.subClassOf, None)):
+            supers = set(tbox.objects(c, RDFS.subClassOf))
+            supers |= set(tbox.objects(c, OWL.equivalentClass))
+            supers |= set(tbox.subjects(OWL.equivalentClass, c))
+            self.superclasses[c] = _without(supers, c)
+
+        self.superproperties = {}
+        for p in set(tbox.subjects(RDFS.subPropertyOf, None)) | set(tbox.subjects(OWL.equivalentProperty, None)):
+            supers = set(tbox.objects(p, RDFS.subPropertyOf))
+            supers |= set(tbox.objects(p, OWL.equivalentProperty))
+            supers |= set(tbox.subjects(OWL.equivalentProperty, p))
+            self.superproperties[p] = _without(supers, p)
+
+        self.domains = defaultdict(frozenset)
+        self.ranges = defaultdict(frozenset)
+        for p in set(tbox.subjects(RDFS.domain, None)):
+            self.domains[p] = frozenset(tbox.objects(p, RDFS.domain))
+        for p in set(tbox.subjects(RDFS.range, None)):
+            self.ranges[p] = frozenset(tbox.objects(p, RDFS.range))
+
+        self.symmetric = frozenset(tbox.subjects(RDF.type, OWL.SymmetricProperty))
+        self.transitive = frozenset(tbox.subjects(RDF.type, OWL.TransitiveProperty))
+        self.disjoint = sorted(set(tbox.subject_objects(OWL.disjointWith)))
+
+    @property
+    def active_rules(self):
+        """Nomes das regras de instância que podem disparar para este schema."""
+        rules = []
+        if any(self.superclasses.values()):
+            rules.append("cax-sco/eqc")
+        if any(self.superproperties.values()):
+            rules.append("prp-spo1/eqp")
+        if self.domains:
+            rules.append("prp-dom")
+        if self.ranges:
+            rules.append("prp-rng")
+        if self.symmetric:
+            rules.append("prp-symp")
+        if self.transitive:
+            rules.append("prp-trp")
+        if self.disjoint:
+            rules.append("cax-dw")
+        return rules
+
+
+def collapsible_properties(plan):
+    """Propriedades simétricas e transitivas cujo fechamento pode deixar de ser materializado."""
+    # Só é seguro omitir o fechamento se nenhuma superpropriedade depender dele
+    return frozenset(p for p in plan.symmetric & plan.transitive if not plan.superproperties.get(p))
+
+
+def disjointness_errors(graph, plan):
+    """Mensagens de cax-dw / cls-nothing2 para um grafo fechado, no formato do owlrl."""
+    errors = []
+    for c1, c2 in plan.disjoint:
+        for x in graph.subjects(RDF.type, c1):
+            if (x, RDF.type, c2) in graph:
+                errors.append("Disjoint classes %s and %s have a common individual %s" % (c1, c2, x))
+    for x in graph.subjects(RDF.type, OWL.Nothing):
+        errors.append("%s is defined of type 'Nothing'" % x)
+    return errors
+
+
+def add_error_messages(graph, errors):
+    """Registra as inconsistências no grafo como nós err:ErrorMessage, como o owlrl faz."""
+    if errors:
+        graph.bind("err", ERRNS)
+    for m in errors:
+        message = BNode()
+        graph.add((message, RDF.type, ERRNS.ErrorMessage))
+        graph.add((message, ERRNS.error, Literal(m)))
+
+
+def refresh_error_messages(graph):
+    """
+    Refaz os nós de inconsistência de um grafo fechado após uma edição (ex: retração).
+
+    Os nós antigos são removidos e os atuais, recalculados pela TBox do próprio grafo.
+
+    Returns:
+        list[str]: As inconsistências atuais.
+    """
+    for message in list(graph.subjects(RDF.type, ERRNS.ErrorMessage)):
+        graph.remove((message, None, None))
+    errors = disjointness_errors(graph, RulePlan(graph))
+    add_error_messages(graph, errors)
+    return errors
+
+
+def instance_consequences(plan, triple, collapsed=frozenset()):
+    """
+    Conclusões de uma única premissa para uma tripla de instância.
+
+    Com a TBox compilada no RulePlan, todas as regras de instância (cax-sco,
+    prp-spo1, prp-symp, prp-dom, prp-rng) dependem só da própria tripla; a
+    única junção entre triplas de instância que resta é prp-trp.
+    """
+    s, p, o = triple
+    if p == RDF.type:
+        for c in plan.superclasses.get(o, ()):
+            yield (s, RDF.type, c)
+        return
+    for p2 in plan.superproperties.get(p, ()):
+        yield (s, p2, o)
+    if p in collapsed:
+        # No fechamento, todo membro do grupo é sujeito e objeto da propriedade
+        for c in plan.domains.get(p, frozenset()) | plan.ranges.get(p, frozenset()):
+            yield (s, RDF.type, c)
+            yield (o, RDF.type, c)
+        return
+    if p in plan.symmetric:
+        yield (o, p, s)
+    for c in plan.domains.get(p, ()):
+        yield (s, RDF.type, c)
+    for c in plan.ranges.get(p, ()):
+        yield (o, RDF.type, c)
+
+
+def instance_justification(plan, triple, new, collapsed=frozenset()):
+    """
+    (regra, premissas) de uma conclusão `new` produzida por `instance_consequences(triple)`.
+
+    Reconstrói a premissa de schema usada sem refazer a busca: todas estão na
+    TBox fechada (ex: C rdfs:subClassOf D também para classes equivalentes).
+    """
+    s, p, o = triple
+    if p == RDF.type:
+        return "cax-sco", (triple, (o, RDFS.subClassOf, new[2]))
+    if new[1] != RDF.type:
+        if new[1] != p:
+            return "prp-spo1", (triple, (p, RDFS.subPropertyOf, new[1]))
+        return "prp-symp", (triple, (p, RDF.type, OWL.SymmetricProperty))
+    c = new[2]
+    if p in collapsed:
+        axiom = (p, RDFS.domain, c) if c in plan.domains.get(p, ()) else (p, RDFS.range, c)
+        return "prp-symp/dom/rng", (triple, (p, RDF.type, OWL.SymmetricProperty), axiom)
+    if new[0] == s and c in plan.domains.get(p, ()):
+        return "prp-dom", (triple, (p, RDFS.domain, c))
+    return "prp-rng", (triple, (p, RDFS.range, c))
+
+
+class CompiledReasoner:
+    """
+    Fechamento OWL-RL especializado no vocabulário do schema.
+
+    Produz as mesmas triplas que `owlrl.DeductiveClosure(owlrl.OWLRL_Semantics)`
+    para grafos que usem apenas hierarquias de classes/propriedades,
+    domínio/imagem, propriedades simétricas/transitivas e disjunção.
+    """
+
+    def __init__(self, graph, collapse_equivalences=False, justifications=None, profile=None,
+                 lean=False):
+        """
+        Args:
+            graph (rdflib.Graph): Grafo asserido; é expandido no lugar por `expand`.
+            collapse_equivalences (bool): Se True, não materializa o fechamento das
+                propriedades simétricas e transitivas (ex: coincideCom); os grupos
+                ficam representados pelas arestas asseridas e devem ser consultados
+                via `src.equivalence_index.EquivalenceIndex`.
+            justifications (JustificationStore, opcional): Se informado, registra a regra
+                e as premissas de cada tripla inferida.
+            profile (RuleProfile, opcional): Se informado, instrumenta cada regra e fase.
+            lean (bool): Modo enxuto: não roda as regras axiomáticas de execução única
+                nem eq-ref e nunca gera as entailments triviais de `is_low_value`.
+        """
+        self.graph = graph
+        self.collapse_equivalences = collapse_equivalences
+        self.justifications = justifications
+        self.profile = profile
+        self.lean = lean
+        self.plan = None
+        self.errors = []
+
+    def compile(self):
+        """Fecha a TBox e monta o RulePlan. Retorna a TBox fechada."""
+        check_supported(self.graph)
+        tbox = self.graph.__class__()
+        if not self.lean:
+            self._apply_axiomatic_rules()
+        IncrementalReasoner(tbox, justifications=self.justifications, profile=self.profile,
+                            lean=self.lean).add(t for t in self.graph if is_schema_triple(t))
+        self.plan = RulePlan(tbox)
+        return tbox
+
+    def _apply_axiomatic_rules(self):
+        """Regras axiomáticas do owlrl (cls-thing, cls-nothing, prp-ap, dt-type1/2)."""
+        # Importado aqui: só as regras axiomáticas de execução única vêm do owlrl
+        from owlrl import OWLRL_Semantics
+
+        start = time.perf_counter()
+        axiomatic = OWLRL_Semantics(self.graph, False, False, False)
+        axiomatic.one_time_rules()
+        produced = len(axiomatic.added_triples)
+        new_axioms = [t for t in axiomatic.added_triples if t not in self.graph]
+        if self.justifications is not None:
+            for t in new_axioms:
+                self.justifications.record(t, "dt-type2" if isinstance(t[0], Literal) else "axiom")
+        axiomatic.flush_stored_triples()
+        if self.profile is not None:
+            self.profile.record("axiomatic", len(new_axioms), produced - len(new_axioms),
+                                time.perf_counter() - start)
+
+    def expand(self):
+        """
+        Materializa o fechamento do grafo.
+
+        Returns:
+            int: Número de triplas inferidas.
+        """
+        g = self.graph
+        before = len(g)
+        with self._phase("tbox"):
+            tbox = self.compile()
+            for t in tbox:
+                g.add(t)
+
+        with self._phase("instances"):
+            self._materialize_instances(self._collapsed_properties())
+
+        if not self.lean:
+            with self._phase("eq-ref"):
+                self._materialize_eq_ref()
+
+        with self._phase("cax-dw"):
+            self._check_disjointness()
+        return len(g) - before
+
+    def _phase(self, name):
+        return self.profile.phase(name) if self.profile is not None else nullcontext()
+
+    def _materialize_eq_ref(self):
+        """eq-ref: todo termo do grafo é sameAs de si mesmo."""
+        g = self.graph
+        start, before = time.perf_counter(), len(g)
+        if self.justifications is None:
+            terms = {OWL.sameAs}
+            for t in g:
+                terms.update(t)
+        else:
+            terms = {}
+            for t in g:
+                for x in t:
+                    terms.setdefault(x, t)
+            for x, t in terms.items():
+                if (x, OWL.sameAs, x) not in g:
+                    self.justifications.record((x, OWL.sameAs, x), "eq-ref", (t,))
+            terms.setdefault(OWL.sameAs, None)
+        g.addN((x, OWL.sameAs, x, g) for x in terms)
+        if self.profile is not None:
+            added = len(g) - before
+            self.profile.record("eq-ref", added, len(terms) - added, time.perf_counter() - start)
+
+    def _collapsed_properties(self):
+        """Propriedades simétricas e transitivas cujo fechamento não será materializado."""
+        if not self.collapse_equivalences:
+            return frozenset()
+        return collapsible_properties(self.plan)
+
+    def _materialize_instances(self, collapsed):
+        """Ponto fixo das regras de instância com índices diretos para prp-trp."""
+        g = self.graph
+        plan = self.plan
+
+        succ = {p: defaultdict(set) for p in plan.transitive - collapsed}
+        pred = {p: defaultdict(set) for p in plan.transitive - collapsed}
+        for p in succ:
+            for x, y in g.subject_objects(p):
+                succ[p][x].add(y)
+                pred[p][y].add(x)
+
+        queue = deque()
+        justifications = self.justifications
+        profile = self.profile
+        lean = self.lean
+        clock = [time.perf_counter()]
+
+        def emit(t, premise, other=None):
+            if lean and is_low_value(t):
+                return
+            if profile is not None:
+                # Tempo desde a conclusão anterior, atribuído à regra desta
+                rule = "prp-trp" if other is not None else instance_justification(plan, premise, t, collapsed)[0]
+                now = time.perf_counter()
+                duplicate = isinstance(t[1], Literal) or t in g
+                profile.record(rule, int(not duplicate), int(duplicate), now - clock[0])
+                clock[0] = now
+            if isinstance(t[1], Literal) or t in g:
+                return
+            g.add(t)
+            queue.append(t)
+            if t[1] in succ:
+                succ[t[1]][t[0]].add(t[2])
+                pred[t[1]][t[2]].add(t[0])
+            if justifications is not None:
+                if other is None:
+                    justifications.record(t, *instance_justification(plan, premise, t, collapsed))
+                else:
+                    justifications.record(t, "prp-trp", (premise, other))
+
+        queue.extend(t for t in g if not is_schema_triple(t))
+        while queue:
+            if profile is not None:
+                profile.iteration()
+            # Uma geração por vez: as triplas novas entram no fim da fila
+            for _ in range(len(queue)):
+                s, p, o = triple = queue.popleft()
+                clock[0] = time.perf_counter()
+                for new in instance_consequences(plan, triple, collapsed):
+                    emit(new, triple)
+                if p in succ:
+                    for z in list(succ[p].get(o, ())):
+                        emit((s, p, z), triple, (o, p, z))
+                    for w in list(pred[p].get(s, ())):
+                        emit((w, p, o), (w, p, s), triple)
+
+    def _check_disjointness(self):
+        """cax-dw / cls-nothing2: registra as inconsistências como o owlrl faz."""
+        self.errors.extend(disjointness_errors(self.graph, self.plan))
+        add_error_messages(self.graph, self.errors)
+
+
+# =============================================================================
+# INFERÊNCIA PARTICIONADA EM PARALELO
+# =============================================================================
+
+# Estado de cada processo do pool: o RulePlan é difundido uma única vez
+_WORKER_STATE = None
+
+
+def _init_worker(plan, collapsed, lean=False):
+    global _WORKER_STATE
+    _WORKER_STATE = (plan, collapsed, lean)
+
+
+def _close_locally(plan, triples, collapsed, lean=False):
+    """Fecho das regras de uma premissa sobre uma partição; devolve só as derivadas."""
+    seen = set(triples)
+    queue = deque(seen)
+    derived = set()
+    while queue:
+        for new in instance_consequences(plan, queue.popleft(), collapsed):
+            if isinstance(new[1], Literal) or new in seen or (lean and is_low_value(new)):
+                continue
+            seen.add(new)
+            derived.add(new)
+            queue.append(new)
+    return derived
+
+
+def _partition_task(task):
+    """
+    Executa uma tarefa no processo do pool.
+
+    ("close", triplas): fecho local das regras de uma premissa.
+    ("join", [(p, arestas_entrada, arestas_saida)]): junção prp-trp pelo nó central
+    (x p y) + (y p z) -> (x p z), seguida do fecho local dos produtos.
+    """
+    plan, collapsed, lean = _WORKER_STATE
+    kind, payload = task
+    if kind == "close":
+        return _close_locally(plan, payload, collapsed, lean)
+
+    products = set()
+    for p, in_edges, out_edges in payload:
+        outs = defaultdict(list)
+        for y, z in out_edges:
+            outs[y].append(z)
+        for x, y in in_edges:
+            for z in outs.get(y, ()):
+                products.add((x, p, z))
+    return products | _close_locally(plan, products, collapsed, lean)
+
+
+class ParallelReasoner(CompiledReasoner):
+    """
+    Fechamento compilado distribuído em um pool de processos.
+
+    As triplas de instância são particionadas pelo hash do sujeito. Como o
+    RulePlan transforma todas as regras de instância em regras de uma premissa,
+    cada partição é fechada de forma independente; só a transitividade cruza
+    partições, e é resolvida em rodadas de junção agrupadas pelo nó central do
+    caminho até que nenhuma tripla nova surja.
+    """
+
+    def __init__(self, graph, workers=None, collapse_equivalences=False, profile=None, lean=False):
+        """
+        Args:
+            graph (rdflib.Graph): Grafo asserido; é expandido no lugar por `expand`.
+            workers (int, opcional): Número de processos (padrão: os.cpu_count()).
+                Com 1, as partições são processadas no próprio processo.
+            collapse_equivalences (bool): Ver CompiledReasoner.
+            profile (RuleProfile, opcional): Ver CompiledReasoner. As regras de instância
+                rodam nos processos do pool e são contadas em bloco, por tipo de rodada
+                ("partition-close" e "partition-join"), com uma iteração por rodada.
+            lean (bool): Ver CompiledReasoner.
+        """
+        super().__init__(graph, collapse_equivalences=collapse_equivalences, profile=profile, lean=lean)
+        self.workers = workers or os.cpu_count() or 1
+        self.rounds = 0
+
+    def _map(self, executor, tasks):
+        if executor is None:
+            return map(_partition_task, tasks)
+        return executor.map(_partition_task, tasks)
+
+    def _materialize_instances(self, collapsed):
+        g = self.graph
+        plan = self.plan
+        n = self.workers
+        transitive = plan.transitive - collapsed
+
+        def partition(node):
+            return hash(node) % n
+
+        succ = {p: defaultdict(set) for p in transitive}
+        pred = {p: defaultdict(set) for p in transitive}
+
+        def merge(results, kind):
+            start = time.perf_counter()
+            delta = set()
+            new_count = duplicates = 0
+            for derived in results:
+                for t in derived:
+                    if t in g:
+                        duplicates += 1
+                        continue
+                    new_count += 1
+                    g.add(t)
+                    if t[1] in succ:
+                        succ[t[1]][t[0]].add(t[2])
+                        pred[t[1]][t[2]].add(t[0])
+                        delta.add(t)
+            if self.profile is not None:
+                self.profile.iteration()
+                self.profile.record("partition-" + kind, new_count, duplicates, time.perf_counter() - start)
+            return delta
+
+        partitions = [[] for _ in range(n)]
+        for t in g:
+            if not is_schema_triple(t):
+                partitions[partition(t[0])].append(t)
+        for p in transitive:
+            for x, y in g.subject_objects(p):
+                succ[p][x].add(y)
+                pred[p][y].add(x)
+
+        executor = None
+        if n > 1:
+            executor = ProcessPoolExecutor(max_workers=n, initializer=_init_worker,
+                                           initargs=(plan, collapsed, self.lean))
+        else:
+            _init_worker(plan, collapsed, self.lean)
+        try:
+            # Rodada 1: fecho local de cada partição
+            self.rounds = 1
+            merge(self._map(executor, [("close", part) for part in partitions if part]), "close")
+
+            # Rodadas seguintes: junções transitivas apenas em torno das arestas novas
+            delta = {(x, p, y) for p in transitive for x, ys in succ[p].items() for y in ys}
+            while delta:
+                self.rounds += 1
+                keys = [set() for _ in range(n)]
+                for x, p, y in delta:
+                    keys[partition(x)].add((p, x))
+                    keys[partition(y)].add((p, y))
+                tasks = []
+                for part_keys in keys:
+                    payload = [
+                        (p, [(w, k) for w in pred[p].get(k, ())], [(k, z) for z in succ[p].get(k, ())])
+                        for p, k in part_keys
+                    ]
+                    if payload:
+                        tasks.append(("join", payload))
+                delta = merge(self._map(executor, tasks), "join")
+        finally:
+            if executor is not None:
+                executor.shutdown()
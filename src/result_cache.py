@@ -0,0 +1,115 @@
+# src/result_cache.py
+"""
+Cache de Resultados de Consultas, Invalidado pela Versão do Grafo.
+
+A base muda raramente em comparação com a frequência das leituras do painel.
+O `ResultCache` guarda o resultado de cada consulta sob a chave
+(consulta, ligações, versão do grafo), com despejo LRU por número de entradas
+e por total de linhas guardadas, e conta acertos e falhas.
+
+A versão vem de um `GraphVersion`, que assina os eventos de adição e remoção
+do store do grafo: qualquer alteração muda a versão, e as entradas de versões
+anteriores deixam de ser alcançáveis (e são descartadas). O store `Memory` do
+rdflib não emite evento de remoção; como remoções só diminuem o tamanho do
+grafo e adições sempre emitem evento, para ele o tamanho entra na conta.
+"""
+from collections import OrderedDict
+
+from rdflib.plugins.stores.memory import Memory
+from rdflib.store import TripleAddedEvent, TripleRemovedEvent
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_ROWS = 100000
+
+
+class GraphVersion:
+    """Contador que muda a cada adição ou remoção de triplas no grafo."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._counter = 0
+        self._size = None
+        self._track_size = isinstance(graph.store, Memory)
+        graph.store.dispatcher.subscribe(TripleAddedEvent, self._bump)
+        graph.store.dispatcher.subscribe(TripleRemovedEvent, self._bump)
+
+    def _bump(self, event):
+        self._counter += 1
+
+    def close(self):
+        """Cancela a inscrição no dispatcher do store, que de outro modo mantém este objeto vivo."""
+        handlers = self.graph.store.dispatcher.get_map() or {}
+        for event_type in (TripleAddedEvent, TripleRemovedEvent):
+            subscribed = handlers.get(event_type, [])
+            if self._bump in subscribed:
+                subscribed.remove(self._bump)
+
+    @property
+    def value(self):
+        if self._track_size:
+            size = len(self.graph)
+            if size != self._size:
+                if self._size is not None:
+                    self._counter += 1
+                self._size = size
+        return self._counter
+
+
+class ResultCache:
+    """Resultados por (consulta, ligações, versão), com despejo LRU."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_rows=DEFAULT_MAX_ROWS):
+        """
+        Args:
+            max_entries (int): Número máximo de resultados guardados.
+            max_rows (int): Total máximo de linhas somando todos os resultados; um
+                resultado maior que isso não é guardado.
+        """
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._version = None
+
+    @staticmethod
+    def key(query, bindings, version):
+        return query, tuple(sorted((bindings or {}).items())), version
+
+    def get(self, query, bindings, version):
+        """Resultado guardado, ou None (contando acerto ou falha)."""
+        if version != self._version:
+            # Entradas de versões anteriores nunca mais serão pedidas
+            self.clear()
+            self._version = version
+        key = self.key(query, bindings, version)
+        rows = self._entries.get(key)
+        if rows is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return [dict(row) for row in rows]
+
+    def put(self, query, bindings, version, rows):
+        """Guarda um resultado, despejando os menos usados recentemente se preciso."""
+        if len(rows) > self.max_rows or self.max_entries < 1:
+            return
+        key = self.key(query, bindings, version)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._rows -= len(old)
+        self._entries[key] = [dict(row) for row in rows]
+        self._rows += len(rows)
+        while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+            _, evicted = self._entries.popitem(last=False)
+            self._rows -= len(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self._rows = 0
+
+    def stats(self):
+        """Acertos, falhas, entradas e linhas guardadas."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "rows": self._rows}
@@ -0,0 +1,280 @@
+# src/snapshot.py
+"""
+Snapshot Binário da Base Inferida, aberto via mmap.
+
+O Turtle é o formato de troca, mas interpretá-lo é o passo mais lento da
+partida de cada consumidor. O snapshot guarda o mesmo grafo como:
+
+- um dicionário de termos ordenado (id = posição), com os termos codificados
+  em UTF-8 num único bloco de bytes e um array de deslocamentos;
+- três permutações ordenadas das triplas como arrays de inteiros de 32 bits
+  (SPO, POS e OSP), de modo que qualquer padrão com termos fixos vira uma
+  busca binária seguida de uma varredura contígua;
+- os prefixos do grafo.
+
+Abrir o arquivo é só mapear a memória e ler o cabeçalho: nada é decodificado
+até ser consultado. O `SnapshotStore` expõe esse conteúdo como um store
+somente-leitura do rdflib, então um `Graph` sobre ele serve diretamente ao
+`SPARQLQueryEngine`. `load_graph` recorre ao Turtle quando o snapshot não
+existe ou está desatualizado em relação a ele.
+"""
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.store import Store
+
+try:
+    from src.array_store import PERMUTATIONS, NamespaceBindings, range_scan, select_permutation, to_spo
+except ImportError:  # execução direta: python src/build_knowledge_base.py
+    from array_store import PERMUTATIONS, NamespaceBindings, range_scan, select_permutation, to_spo
+
+MAGIC = b"KBSNAP01"
+VERSION = 1
+# magic, versão, nº de termos, nº de triplas, mtime_ns e tamanho do Turtle de origem,
+# posições das seções: deslocamentos dos termos, bloco de termos, triplas, prefixos
+HEADER = struct.Struct("<8sIIQqQQQQQ")
+
+
+def encode_term(term):
+    """Codificação binária de um termo; a ordem dos bytes define a ordem do dicionário."""
+    if isinstance(term, Literal):
+        return ("L" + (term.language or "") + "\x00" + (term.datatype or "") + "\x00"
+                + str(term)).encode("utf-8")
+    if isinstance(term, BNode):
+        return ("B" + str(term)).encode("utf-8")
+    return ("U" + str(term)).encode("utf-8")
+
+
+def decode_term(data):
+    """Inverso de `encode_term`."""
+    text = data.decode("utf-8")
+    kind, value = text[0], text[1:]
+    if kind == "U":
+        return URIRef(value)
+    if kind == "B":
+        return BNode(value)
+    language, datatype, lexical = value.split("\x00", 2)
+    return Literal(lexical, lang=language or None, datatype=URIRef(datatype) if datatype else None)
+
+
+def _pad(f):
+    f.write(b"\x00" * (-f.tell() % 8))
+
+
+def source_signature(path):
+    """(mtime_ns, tamanho) do arquivo de origem, usados para detectar snapshots desatualizados."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def write_snapshot(graph, path, source_path=None):
+    """
+    Grava o grafo como snapshot binário.
+
+    Args:
+        graph (rdflib.Graph): Grafo a gravar (ex: o grafo inferido).
+        path (str): Caminho do snapshot.
+        source_path (str, opcional): Turtle do qual o snapshot é uma cópia; sua
+            assinatura é gravada no cabeçalho para `is_fresh`.
+
+    Returns:
+        str: O caminho gravado.
+    """
+    encoded = {}
+    for triple in graph:
+        for term in triple:
+            if term not in encoded:
+                encoded[term] = encode_term(term)
+    ordered = sorted(encoded, key=encoded.__getitem__)
+    ids = {term: i for i, term in enumerate(ordered)}
+    rows = [(ids[s], ids[p], ids[o]) for s, p, o in graph]
+    mtime, size = source_signature(source_path) if source_path else (0, 0)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\x00" * HEADER.size)
+        _pad(f)
+
+        offsets_pos = f.tell()
+        offsets = array("Q", [0])
+        for term in ordered:
+            offsets.append(offsets[-1] + len(encoded[term]))
+        offsets.tofile(f)
+
+        blob_pos = f.tell()
+        for term in ordered:
+            f.write(encoded[term])
+        _pad(f)
+
+        triples_pos = f.tell()
+        for order in PERMUTATIONS.values():
+            flat = array("I")
+            for row in sorted(tuple(r[i] for i in order) for r in rows):
+                flat.extend(row)
+            flat.tofile(f)
+
+        ns_pos = f.tell()
+        f.write("\n".join(f"{prefix}\t{ns}" for prefix, ns in graph.namespaces()).encode("utf-8"))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(ordered), len(rows), mtime, size,
+                            offsets_pos, blob_pos, triples_pos, ns_pos))
+    os.replace(tmp_path, path)
+    return path
+
+
+def is_fresh(path, source_path):
+    """Indica se o snapshot existe e corresponde à versão atual do Turtle de origem."""
+    if not os.path.exists(path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return False
+    magic, version, _, _, mtime, size = HEADER.unpack(header)[:6]
+    return magic == MAGIC and version == VERSION and (mtime, size) == source_signature(source_path)
+
+
+class SnapshotStore(NamespaceBindings, Store):
+    """Store rdflib somente-leitura sobre um snapshot mapeado em memória."""
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Caminho do snapshot gravado por `write_snapshot`.
+        """
+        super().__init__()
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.n_terms, self.n_triples, _, _,
+         offsets_pos, blob_pos, triples_pos, ns_pos) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Snapshot inválido ou de versão incompatível: {path}")
+
+        view = memoryview(self._mmap)
+        self._offsets = view[offsets_pos:offsets_pos + 8 * (self.n_terms + 1)].cast("Q")
+        self._blob_pos = blob_pos
+        size = 4 * 3 * self.n_triples
+        self._index = {}
+        for k, name in enumerate(PERMUTATIONS):
+            start = triples_pos + k * size
+            self._index[name] = view[start:start + size].cast("I")
+
+        self._init_namespaces()
+        for line in bytes(view[ns_pos:]).decode("utf-8").splitlines():
+            prefix, ns = line.split("\t", 1)
+            self.bind(prefix, URIRef(ns))
+
+        # Termos já decodificados / ids já resolvidos (crescem com o uso)
+        self._terms = {}
+        self._ids = {}
+
+    # -------------------------------------------------------------------------
+    # Dicionário de termos
+    # -------------------------------------------------------------------------
+
+    def _encoded(self, i):
+        start = self._blob_pos
+        return self._mmap[start + self._offsets[i]:start + self._offsets[i + 1]]
+
+    def term(self, i):
+        """Termo RDF de id `i`."""
+        term = self._terms.get(i)
+        if term is None:
+            term = self._terms[i] = decode_term(self._encoded(i))
+        return term
+
+    def term_id(self, term):
+        """Id de `term` por busca binária no dicionário, ou None se ausente."""
+        i = self._ids.get(term)
+        if i is None:
+            key = encode_term(term)
+            i = bisect_left(range(self.n_terms), key, key=self._encoded)
+            if i == self.n_terms or self._encoded(i) != key:
+                return None
+            self._ids[term] = i
+        return i
+
+    # -------------------------------------------------------------------------
+    # Interface de store
+    # -------------------------------------------------------------------------
+
+    def triples(self, triple_pattern, context=None):
+        ids = []
+        for term in triple_pattern:
+            if term is None:
+                ids.append(None)
+            else:
+                i = self.term_id(term)
+                if i is None:
+                    return
+                ids.append(i)
+        name, prefix = select_permutation(*ids)
+        term = self.term
+        for row in range_scan(self._index[name], self.n_triples, prefix):
+            s, p, o = to_spo(name, row)
+            yield (term(s), term(p), term(o)), iter(())
+
+    def __len__(self, context=None):
+        return self.n_triples
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def add(self, triple, context, quoted=False):
+        raise TypeError("O snapshot é somente leitura; grave um novo com write_snapshot.")
+
+    def remove(self, triple, context=None):
+        raise TypeError("O snapshot é somente leitura; grave um novo com write_snapshot.")
+
+    def close(self, commit_pending_transaction=False):
+        self._offsets.release()
+        for index in self._index.values():
+            index.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def open_snapshot(path):
+    """Abre um snapshot como `rdflib.Graph` somente-leitura."""
+    return Graph(store=SnapshotStore(path))
+
+
+def snapshot_path_for(ttl_path):
+    """Caminho convencional do snapshot de um arquivo Turtle (mesmo nome, extensão .kbsnap)."""
+    return os.path.splitext(ttl_path)[0] + ".kbsnap"
+
+
+def load_graph(ttl_path, snapshot_path=None, store="default"):
+    """
+    Carrega um grafo pelo snapshot, se estiver em dia, ou pelo Turtle.
+
+    Args:
+        ttl_path (str): Caminho do Turtle (ex: data/kb_conflito_v5_inferido.ttl).
+        snapshot_path (str, opcional): Caminho do snapshot (padrão: `snapshot_path_for`).
+        store (str): Store rdflib usado ao recorrer ao Turtle (ex: "ArrayStore",
+            ver `src.array_store`).
+
+    Returns:
+        rdflib.Graph: Grafo somente-leitura sobre o snapshot, ou grafo em memória.
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(ttl_path)
+    if is_fresh(snapshot_path, ttl_path):
+        try:
+            return open_snapshot(snapshot_path)
+        except (OSError, ValueError, struct.error):
+            pass
+    g = Graph(store=store)
+    g.parse(ttl_path, format="turtle")
+    return g
@@ -1,26 +1,229 @@
 # src/sparql_queries.py
 """
 Motor de Consultas SPARQL para a Ontologia de Conflitos Urbanos.
+
+Cada consulta predefinida é interpretada e traduzida para a álgebra SPARQL
+uma única vez por processo (`prepare`); parâmetros, como o dano de
+`query_causality_chain`, entram como ligações de variáveis (`initBindings`),
+nunca interpolados no texto da consulta. Os resultados ficam num cache
+invalidado pela versão do grafo (ver `src.result_cache`). Com `native=True`,
+as consultas rodam como planos de junção escritos à mão sobre os índices do
+store (ver `src.native_queries`), com as mesmas linhas; `run_batch` executa
+várias consultas sobre varreduras compartilhadas. Com `labels="preferred"`,
+a estrutura de cada consulta é resolvida só com URIs e um rótulo por recurso
+é anexado no fim (ver `src.label_index`); com `labels="none"`, só as URIs.
 """
+from rdflib import Namespace, URIRef
+from rdflib.plugins.sparql import prepareQuery
+
+from src.equivalence_index import EquivalenceIndex
+from src.label_index import DEFAULT_LANGUAGES, LabelIndex
+from src.native_queries import EXECUTORS, Scans, materialize
+from src.result_cache import DEFAULT_MAX_ENTRIES, GraphVersion, ResultCache
+
+REC = Namespace("http://recife.leg.br/ontologia-conflito#")
+
+# Consultas já compiladas, por texto completo (prefixos incluídos)
+_PREPARED = {}
+
+
+def prepare(query):
+    """Consulta compilada (parse + tradução para a álgebra), reaproveitada entre chamadas."""
+    compiled = _PREPARED.get(query)
+    if compiled is None:
+        compiled = _PREPARED[query] = prepareQuery(query)
+    return compiled
+
 
 class SPARQLQueryEngine:
     """Encapsula a lógica para executar consultas SPARQL predefinidas."""
 
-    def __init__(self, graph):
+    def __init__(self, graph, backward_chaining=False, cache_size=DEFAULT_MAX_ENTRIES, native=False,
+                 labels="all", label_languages=DEFAULT_LANGUAGES):
         """
         Inicializa o motor com um grafo RDFLib.
         
         Args:
             graph (rdflib.Graph): O grafo (preferencialmente inferido) a ser consultado.
-        """
+            backward_chaining (bool): Se True, `graph` é o grafo asserido
+                (kb_conflito_v5_final.ttl) e as entailments necessárias a cada
+                padrão de consulta são derivadas sob demanda, sem materialização.
+            cache_size (int): Número máximo de resultados guardados no cache (0 desativa).
+            native (bool): Se True, executa as consultas predefinidas pelos planos
+                nativos de `src.native_queries` em vez do avaliador SPARQL.
+            labels (str): "all" junta todos os rótulos de cada recurso, como o SPARQL;
+                "preferred" resolve a consulta só com URIs e anexa no fim o rótulo
+                preferido de cada recurso; "none" devolve as URIs sem rótulos
+                (chaves sem o sufixo "_label", ex: 'norma1').
+            label_languages (tuple): Idiomas em ordem de preferência para "preferred".
+        """
+        if labels not in ("all", "preferred", "none"):
+            raise ValueError(f"labels deve ser 'all', 'preferred' ou 'none': {labels!r}")
+        if backward_chaining:
+            from src.backward_chaining import BackwardChainingGraph
+            graph = BackwardChainingGraph(graph)
         self.graph = graph
+        self.backward_chaining = backward_chaining
         self.namespace_prefix = "PREFIX rec: <http://recife.leg.br/ontologia-conflito#>\nPREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>"
+        self._equivalences = {}
+        self.version = GraphVersion(graph)
+        self._indexed_version = self.version.value
+        self._chained_version = self.version.value
+        self.cache = ResultCache(max_entries=cache_size)
+        self.native = native
+        self._scans = None
+        self.labels = labels
+        self.label_languages = label_languages
+        self._label_index = None
+        self._label_version = None
+
+    @classmethod
+    def from_file(cls, ttl_path, snapshot_path=None, revision=None, **options):
+        """
+        Cria o motor a partir do grafo inferido salvo em disco.
+
+        Usa o snapshot binário gravado por `run_inference` quando ele está em dia
+        com o Turtle (abertura via mmap, sem parsing) e recorre ao Turtle caso
+        contrário. Ver `src.snapshot.load_graph`. Uma base SQLite (`.sqlite`,
+        ver `src.sqlite_store`) é aberta diretamente, somente para leitura, e um
+        arquivo N-Triples/N-Quads é interpretado em paralelo (ver `src.parallel_load`).
+
+        Args:
+            revision (int | str, opcional): Em uma base versionada (ver
+                `src.versioning`), consulta esta revisão (id ou nome) em vez da head. A
+                revisão é reconstruída em memória e a base é fechada em seguida.
+            **options: Repassados ao construtor (ex: `native=True`).
+        """
+        from src.sqlite_store import is_sqlite_path, open_kb
+        if revision is not None:
+            from src.versioning import open_versioned
+            # A revisão é reconstruída em memória; a conexão SQLite não é mais necessária
+            store = open_versioned(ttl_path, read_only=True)
+            try:
+                graph = store.revision_graph(revision)
+            finally:
+                store.close()
+            return cls(graph, **options)
+        if is_sqlite_path(ttl_path):
+            return cls(open_kb(ttl_path, read_only=True), **options)
+        from src.streaming import is_line_based
+        if is_line_based(ttl_path):
+            from src.parallel_load import parallel_load
+            return cls(parallel_load(ttl_path), **options)
+        from src.snapshot import load_graph
+        return cls(load_graph(ttl_path, snapshot_path), **options)
+
+    def close(self):
+        """
+        Desliga o motor do grafo: o store deixa de notificar a versão do motor e o
+        cache é esvaziado. O motor não deve ser usado depois de fechado.
+        """
+        self.version.close()
+        self.cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _execute_query(self, query, bindings=None, native=None, options=None):
+        """
+        Método auxiliar para executar uma consulta e retornar uma lista de dicionários.
+
+        Args:
+            query (str): Consulta sem os prefixos; é compilada na primeira execução.
+            bindings (dict, opcional): Valores fixos de variáveis da consulta (`initBindings`).
+            native (str, opcional): Nome do plano equivalente em `src.native_queries`,
+                usado no lugar do SPARQL quando o motor tem `native=True`.
+            options (dict, opcional): Argumentos do plano nativo (ex: `use_index`). Com
+                `use_index=True` o plano nativo é usado mesmo sem `native=True`, pois o
+                índice de equivalência não existe no avaliador SPARQL.
+        """
+        options = options or {}
+        late = self.labels != "all" and native is not None
+        use_native = native is not None and (self.native or bool(options.get("use_index")))
+        key = (query, self.labels if late else use_native) + tuple(sorted(options.items()))
+        version = self.version.value
+        self._sync_backward_chaining(version)
+        rows = self.cache.get(key, bindings, version)
+        if rows is not None:
+            return rows
+        if late:
+            label_index = self.label_index() if self.labels == "preferred" else None
+            rows = materialize(native, self._scans or Scans(self.graph, self.equivalence_index), label_index,
+                               **options, **(bindings or {}))
+        elif use_native:
+            rows = EXECUTORS[native](self._scans or Scans(self.graph, self.equivalence_index),
+                                     **options, **(bindings or {}))
+        else:
+            full_query = f"{self.namespace_prefix}\n{query}"
+            results = self.graph.query(prepare(full_query), initBindings=bindings or {})
+            rows = [row.asdict() for row in results]
+        self.cache.put(key, bindings, version, rows)
+        return rows
 
-    def _execute_query(self, query):
-        """Método auxiliar para executar uma consulta e retornar uma lista de dicionários."""
-        full_query = f"{self.namespace_prefix}\n{query}"
-        results = self.graph.query(full_query)
-        return [row.asdict() for row in results]
+    def _sync_backward_chaining(self, version):
+        """Descarta os subobjetivos memoizados do encadeamento para trás quando o grafo muda."""
+        if self.backward_chaining and version != self._chained_version:
+            self.graph.reset()
+            self._chained_version = version
+
+    def label_index(self):
+        """Rótulo preferido por recurso, reconstruído quando o grafo muda."""
+        version = self.version.value
+        self._sync_backward_chaining(version)
+        if self._label_index is None or version != self._label_version:
+            self._label_index = LabelIndex(self.graph, self.label_languages)
+            self._label_version = version
+        return self._label_index
+
+    def run_batch(self, queries):
+        """
+        Executa várias consultas predefinidas em conjunto, com varreduras compartilhadas.
+
+        Todas usam os planos nativos sobre um mesmo `Scans` (ver
+        `src.native_queries`): cada padrão de tripla comum (instâncias de uma
+        classe, pares de `executaAcao`, rótulos de um recurso) é varrido uma
+        só vez, e os agrupamentos construídos para uma consulta servem às demais.
+
+        Args:
+            queries (list): Nomes das consultas ("normative_conflict" ou
+                "query_normative_conflict") ou pares (nome, kwargs), ex:
+                ("causality_chain", {"dano_uri": ...}).
+
+        Returns:
+            list[list[dict]]: Os resultados, na ordem pedida.
+        """
+        previous = self.native, self._scans
+        self.native, self._scans = True, Scans(self.graph, self.equivalence_index)
+        try:
+            results = []
+            for query in queries:
+                name, kwargs = (query, {}) if isinstance(query, str) else query
+                if not name.startswith("query_"):
+                    name = f"query_{name}"
+                results.append(getattr(self, name)(**kwargs))
+            return results
+        finally:
+            self.native, self._scans = previous
+
+    def equivalence_index(self, prop):
+        """
+        Retorna o índice union-find de uma propriedade simétrica e transitiva.
+
+        O índice é construído na primeira chamada a partir das arestas do grafo e
+        funciona tanto sobre o grafo inferido quanto sobre o asserido, e é
+        reconstruído quando o grafo muda.
+        """
+        version = self.version.value
+        self._sync_backward_chaining(version)
+        if version != self._indexed_version:
+            self._equivalences = {}
+            self._indexed_version = version
+        if prop not in self._equivalences:
+            self._equivalences[prop] = EquivalenceIndex.from_graph(self.graph, prop)
+        return self._equivalences[prop]
 
     def query_normative_conflict(self):
         """
@@ -37,7 +240,7 @@ class SPARQLQueryEngine:
                 FILTER(STR(?norma1) < STR(?norma2))
             }
         """
-        return self._execute_query(query)
+        return self._execute_query(query, native="normative_conflict")
 
     def query_ambiguous_actors(self):
         """
@@ -58,17 +261,18 @@ class SPARQLQueryEngine:
                                  rdfs:label ?acao_impeditiva_label .
             }
         """
-        return self._execute_query(query)
+        return self._execute_query(query, native="ambiguous_actors")
 
     def query_causality_chain(self, dano_uri=None):
         """
         Rastreia a cadeia de causalidade de um dano.
+
+        Args:
+            dano_uri (str, opcional): Restringe a cadeia a este dano.
         """
-        filter_clause = f"FILTER(?dano = <{dano_uri}>)" if dano_uri else ""
-        
-        query = f"""
+        query = """
             SELECT ?agente_label ?acao_label ?dano_label
-            WHERE {{
+            WHERE {
                 ?acao a rec:Acao_Impeditiva ;
                       rec:causa_direta ?dano ;
                       rdfs:label ?acao_label .
@@ -77,16 +281,20 @@ class SPARQLQueryEngine:
                         rdfs:label ?agente_label .
                 
                 ?dano rdfs:label ?dano_label .
-
-                {filter_clause}
-            }}
+            }
         """
-        return self._execute_query(query)
+        return self._execute_query(query, {"dano": URIRef(dano_uri)} if dano_uri else None,
+                                   native="causality_chain")
     
-    def query_spatial_overlap(self):
+    def query_spatial_overlap(self, use_index=True):
         """
         Detecta sobreposição de zonas legais (explora propriedade transitiva).
         Encontra espaços que coincidem através de múltiplas camadas.
+
+        Args:
+            use_index (bool): Se True, percorre os grupos do índice de equivalência de
+                'coincideCom' em vez de varrer o fechamento materializado via SPARQL
+                (também com rótulos tardios, ver `labels`).
         """
         query = """
             SELECT DISTINCT ?espaco1_label ?espaco2_label
@@ -97,7 +305,7 @@ class SPARQLQueryEngine:
                 FILTER(STR(?espaco1) < STR(?espaco2))
             }
         """
-        return self._execute_query(query)
+        return self._execute_query(query, native="spatial_overlap", options={"use_index": use_index})
     
     def query_legal_breaches(self):
         """
@@ -117,7 +325,7 @@ class SPARQLQueryEngine:
                 ?dano rdfs:label ?dano_label .
             }
         """
-        return self._execute_query(query)
+        return self._execute_query(query, native="legal_breaches")
     
     def query_institutional_fragmentation(self):
         """
@@ -141,7 +349,7 @@ class SPARQLQueryEngine:
             }
             ORDER BY ?tipo
         """
-        return self._execute_query(query)
+        return self._execute_query(query, native="institutional_fragmentation")
     
     def query_benefit_damage_reversals(self):
         """
@@ -163,7 +371,7 @@ class SPARQLQueryEngine:
                                rdfs:label ?acao_negativa_label .
             }
         """
-        return self._execute_query(query)
+        return self._execute_query(query, native="benefit_damage_reversals")
     
     def query_market_pressure_on_zeis(self):
         """
@@ -186,12 +394,17 @@ class SPARQLQueryEngine:
                 }
             }
         """
-        return self._execute_query(query)
+        return self._execute_query(query, native="market_pressure_on_zeis")
     
-    def query_conflicting_jurisdictions(self):
+    def query_conflicting_jurisdictions(self, use_index=True):
         """
         Detecta conflitos de jurisdição - quando múltiplos órgãos têm tutela
         sobre o mesmo espaço (através de sobreposição espacial).
+
+        Args:
+            use_index (bool): Se True, resolve a sobreposição pelo índice de
+                equivalência de 'coincideCom' em vez do fechamento materializado
+                (também com rótulos tardios, ver `labels`).
         """
         query = """
             SELECT ?orgao1_label ?orgao2_label ?espaco_label
@@ -209,7 +422,7 @@ class SPARQLQueryEngine:
                 FILTER(STR(?orgao1) < STR(?orgao2))
             }
         """
-        return self._execute_query(query)
+        return self._execute_query(query, native="conflicting_jurisdictions", options={"use_index": use_index})
     
     def query_full_conflict_narrative(self):
         """
@@ -249,4 +462,4 @@ class SPARQLQueryEngine:
             }
             ORDER BY ?agente_label ?tipo_resultado
         """
-        return self._execute_query(query)
+        return self._execute_query(query, native="full_conflict_narrative")
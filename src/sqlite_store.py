@@ -0,0 +1,291 @@
+# src/sqlite_store.py
+"""
+Base de Conhecimento Persistente em SQLite.
+
+Cada etapa da pipeline grava um Turtle que a seguinte interpreta do zero. Com
+o `SQLiteStore`, o grafo vive num arquivo SQLite que as etapas abrem
+diretamente: nada é carregado na abertura e cada padrão de tripla vira uma
+consulta indexada, então a base pode ser maior que a memória. O esquema segue
+a mesma ideia do `ArrayStore`:
+
+- `terms`: dicionário de termos (id inteiro ↔ termo codificado por
+  `src.snapshot.encode_term`);
+- `triples`: ids (s, p, o) com chave primária SPO e índices POS e OSP, de modo
+  que qualquer padrão com termos fixos é resolvido por um prefixo de índice;
+- `namespaces`: os prefixos do grafo.
+
+As escritas acontecem numa transação implícita, confirmada por `commit` (ou
+`Graph.commit`) e desfeita por `rollback`; `batch` agrupa um lote inteiro numa
+transação. O store é registrado como plugin do rdflib:
+
+    g = Graph(store="SQLiteStore")
+    g.open("data/kb_conflito_v5_final.sqlite", create=True)
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+from rdflib import Graph, URIRef, plugin
+from rdflib.store import NO_STORE, VALID_STORE, Store
+
+try:
+    from src.array_store import NamespaceBindings
+    from src.snapshot import decode_term, encode_term
+except ImportError:  # execução direta: python src/build_knowledge_base.py
+    from array_store import NamespaceBindings
+    from snapshot import decode_term, encode_term
+
+SQLITE_SUFFIXES = (".sqlite", ".db")
+
+# Triplas por executemany em `addN`
+BATCH_SIZE = 5000
+
+# Termos decodificados / ids resolvidos mantidos em memória (o cache é esvaziado ao encher)
+TERM_CACHE_SIZE = 100000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, key BLOB NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS triples (
+    s INTEGER NOT NULL, p INTEGER NOT NULL, o INTEGER NOT NULL,
+    PRIMARY KEY (s, p, o)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS triples_pos ON triples (p, o, s);
+CREATE INDEX IF NOT EXISTS triples_osp ON triples (o, s, p);
+CREATE TABLE IF NOT EXISTS namespaces (prefix TEXT PRIMARY KEY, uri TEXT NOT NULL UNIQUE);
+"""
+
+
+def is_sqlite_path(path):
+    """Indica se o caminho é de uma base SQLite (.sqlite ou .db)."""
+    return str(path).endswith(SQLITE_SUFFIXES)
+
+
+class SQLiteStore(NamespaceBindings, Store):
+    """Store rdflib não contextual e transacional sobre um arquivo SQLite."""
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = True
+    graph_aware = False
+
+    def __init__(self, configuration=None, identifier=None, read_only=False):
+        """
+        Args:
+            configuration (str, opcional): Caminho do arquivo SQLite; se dado, é aberto
+                (e criado, se não existir e o store não for somente leitura).
+            read_only (bool): Abre o arquivo em modo somente leitura (camada de consultas).
+        """
+        self.read_only = read_only
+        self._conn = None
+        self._init_namespaces()
+        self._ids = {}
+        self._terms = {}
+        super().__init__(configuration, identifier)
+
+    def open(self, configuration, create=True):
+        path = str(configuration)
+        if not os.path.exists(path) and (self.read_only or not create):
+            return NO_STORE
+        if self.read_only:
+            self._conn = sqlite3.connect(Path(path).absolute().as_uri() + "?mode=ro", uri=True)
+        else:
+            self._conn = sqlite3.connect(path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        for prefix, ns in self._conn.execute("SELECT prefix, uri FROM namespaces"):
+            NamespaceBindings.bind(self, prefix, URIRef(ns))
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction=False):
+        if self._conn is None:
+            return
+        if commit_pending_transaction and not self.read_only:
+            self._conn.commit()
+        self._conn.close()
+        self._conn = None
+
+    # -------------------------------------------------------------------------
+    # Transações
+    # -------------------------------------------------------------------------
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+        # Ids atribuídos na transação desfeita não existem mais
+        self._ids.clear()
+        self._terms.clear()
+
+    @contextmanager
+    def batch(self):
+        """Executa o bloco numa única transação: confirmada ao final, desfeita se houver erro."""
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    # -------------------------------------------------------------------------
+    # Dicionário de termos
+    # -------------------------------------------------------------------------
+
+    def _cache(self, i, term):
+        if len(self._ids) >= TERM_CACHE_SIZE:
+            self._ids.clear()
+            self._terms.clear()
+        self._ids[term] = i
+        self._terms[i] = term
+
+    def _intern(self, term):
+        i = self.term_id(term)
+        if i is None:
+            i = self._conn.execute("INSERT INTO terms (key) VALUES (?)", (encode_term(term),)).lastrowid
+            self._cache(i, term)
+        return i
+
+    def _terms_by_id(self, ids):
+        """Termos de vários ids, consultados em blocos (usado para montar grafos a partir de ids)."""
+        result, missing = {}, []
+        for i in set(ids):
+            term = self._terms.get(i)
+            if term is None:
+                missing.append(i)
+            else:
+                result[i] = term
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT id, key FROM terms WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            for i, key in rows:
+                result[i] = self._decode(i, key)
+        return result
+
+    def term(self, i):
+        """Termo RDF de id `i`."""
+        term = self._terms.get(i)
+        if term is None:
+            key, = self._conn.execute("SELECT key FROM terms WHERE id = ?", (i,)).fetchone()
+            term = self._decode(i, key)
+        return term
+
+    def term_id(self, term):
+        """Id de `term`, ou None se ele não está na base."""
+        i = self._ids.get(term)
+        if i is None:
+            row = self._conn.execute("SELECT id FROM terms WHERE key = ?", (encode_term(term),)).fetchone()
+            if row is None:
+                return None
+            i = row[0]
+            self._cache(i, term)
+        return i
+
+    def _decode(self, i, key):
+        term = self._terms.get(i)
+        if term is None:
+            term = decode_term(key)
+            self._cache(i, term)
+        return term
+
+    def _where(self, triple_pattern):
+        """Cláusula WHERE e parâmetros de um padrão, ou None se algum termo não existe."""
+        clauses, params = [], []
+        for column, term in zip("spo", triple_pattern):
+            if term is not None:
+                i = self.term_id(term)
+                if i is None:
+                    return None
+                clauses.append(f"t.{column} = ?")
+                params.append(i)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    # -------------------------------------------------------------------------
+    # Interface de store
+    # -------------------------------------------------------------------------
+
+    def bind(self, prefix, namespace, override=True):
+        super().bind(prefix, namespace, override)
+        if not self.read_only and self._conn is not None and self._namespace.get(prefix) == namespace:
+            self._conn.execute("DELETE FROM namespaces WHERE prefix = ? OR uri = ?", (prefix, str(namespace)))
+            self._conn.execute("INSERT INTO namespaces VALUES (?, ?)", (prefix, str(namespace)))
+
+    def add(self, triple, context=None, quoted=False):
+        row = tuple(self._intern(t) for t in triple)
+        self._conn.execute("INSERT OR IGNORE INTO triples VALUES (?, ?, ?)", row)
+        super().add(triple, context, quoted)
+
+    def addN(self, quads):
+        quads = iter(quads)
+        while True:
+            batch = list(islice(quads, BATCH_SIZE))
+            if not batch:
+                return
+            self._conn.executemany("INSERT OR IGNORE INTO triples VALUES (?, ?, ?)",
+                                   [tuple(self._intern(t) for t in quad[:3]) for quad in batch])
+            for s, p, o, c in batch:
+                super().add((s, p, o), c)
+
+    def remove(self, triple_pattern, context=None):
+        where = self._where(triple_pattern)
+        if where is not None:
+            self._conn.execute(f"DELETE FROM triples AS t{where[0]}", where[1])
+        super().remove(triple_pattern, context)
+
+    def triples(self, triple_pattern, context=None):
+        where = self._where(triple_pattern)
+        if where is None:
+            return
+        cursor = self._conn.execute(
+            "SELECT t.s, t.p, t.o, a.key, b.key, c.key FROM triples t"
+            " JOIN terms a ON a.id = t.s JOIN terms b ON b.id = t.p JOIN terms c ON c.id = t.o"
+            + where[0], where[1])
+        # Lidas em blocos: o resultado não é materializado, e escritas feitas pelo
+        # chamador entre dois blocos não invalidam a varredura
+        decode = self._decode
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                return
+            for s, p, o, ks, kp, ko in rows:
+                yield (decode(s, ks), decode(p, kp), decode(o, ko)), iter(())
+
+    def __len__(self, context=None):
+        return self._conn.execute("SELECT COUNT(*) FROM triples").fetchone()[0]
+
+    def contexts(self, triple=None):
+        return iter(())
+
+
+plugin.register("SQLiteStore", Store, "src.sqlite_store", "SQLiteStore")
+
+
+def open_kb(path, read_only=False):
+    """
+    Abre (ou cria) uma base SQLite como `rdflib.Graph`.
+
+    Args:
+        path (str): Caminho do arquivo (ex: data/kb_conflito_v5_final.sqlite).
+        read_only (bool): Abre somente para leitura; o arquivo deve existir.
+
+    Returns:
+        rdflib.Graph: Grafo sobre o `SQLiteStore`; escritas exigem `commit`.
+    """
+    store = SQLiteStore(read_only=read_only)
+    if store.open(path) != VALID_STORE:
+        raise FileNotFoundError(path)
+    return Graph(store=store)
+
+
+def copy_kb(path, destination):
+    """Copia uma base SQLite (incluindo o que ainda está no WAL) pela API de backup."""
+    source = sqlite3.connect(path)
+    target = sqlite3.connect(destination)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
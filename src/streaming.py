@@ -0,0 +1,152 @@
+# src/streaming.py
+"""
+Importação e Exportação em Fluxo (N-Triples / N-Quads).
+
+O `Graph.serialize(format="turtle")` precisa do grafo inteiro de uma vez para
+agrupar sujeitos e escolher prefixos. Os formatos orientados a linha não têm
+esse custo: cada tripla vira uma linha independente. Aqui a exportação grava
+as triplas à medida que são produzidas e a importação lê o arquivo em blocos
+de tamanho fixo, então a memória de pico não depende do tamanho da base.
+Arquivos terminados em `.gz` são (des)comprimidos com gzip no próprio fluxo.
+
+Formato N-Quads: quando os itens exportados têm quatro termos, o quarto é o
+grafo nomeado; na leitura, cada item traz o grafo (ou None, se omitido).
+"""
+import gzip
+from itertools import islice
+
+from rdflib import BNode, Literal
+from rdflib.plugins.parsers.ntriples import ParseError, W3CNTriplesParser, r_tail, r_wspace, r_wspaces
+
+DEFAULT_CHUNK_SIZE = 10000
+LINE_FORMATS = (".nt", ".nq", ".nt.gz", ".nq.gz")
+
+
+def is_line_based(path):
+    """Indica se o caminho é de um arquivo N-Triples/N-Quads (comprimido ou não)."""
+    return str(path).endswith(LINE_FORMATS)
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="\n")
+    return open(path, mode, encoding="utf-8", newline="\n")
+
+
+def _escape(text):
+    return (text.replace("\\", "\\\\").replace('"', '\\"')
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def term_to_nt(term):
+    """Forma N-Triples de um termo RDF."""
+    if isinstance(term, Literal):
+        quoted = '"' + _escape(str(term)) + '"'
+        if term.language:
+            return f"{quoted}@{term.language}"
+        if term.datatype:
+            return f"{quoted}^^<{term.datatype}>"
+        return quoted
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    return f"<{term}>"
+
+
+def write_ntriples(items, path):
+    """
+    Grava triplas (N-Triples) ou quádruplas (N-Quads) linha a linha.
+
+    Args:
+        items (iterable): Triplas (s, p, o) ou quádruplas (s, p, o, g); pode ser um
+            gerador ou um `rdflib.Graph`, consumido uma única vez.
+        path (str): Arquivo de saída (.nt, .nq, com `.gz` opcional).
+
+    Returns:
+        int: Número de linhas gravadas.
+    """
+    count = 0
+    with _open(path, "w") as f:
+        for item in items:
+            if len(item) == 4 and item[3] is not None:
+                graph = item[3]
+                graph = getattr(graph, "identifier", graph)
+                f.write(" ".join(term_to_nt(t) for t in item[:3]) + f" {term_to_nt(graph)} .\n")
+            else:
+                f.write(" ".join(term_to_nt(t) for t in item[:3]) + " .\n")
+            count += 1
+    return count
+
+
+class _LineParser(W3CNTriplesParser):
+    """Parser de N-Triples/N-Quads que devolve a declaração em vez de enviá-la a um sink."""
+
+    def statement(self, line, bnode_context):
+        self.line = line
+        self.eat(r_wspace)
+        if not self.line or self.line.startswith("#"):
+            return None
+        # O fechamento OWL-RL produz triplas RDF generalizadas (literais como sujeito,
+        # ex: tipagem de literais), que o Turtle do rdflib também aceita
+        subject = self.object(bnode_context)
+        self.eat(r_wspaces)
+        predicate = self.predicate()
+        self.eat(r_wspaces)
+        obj = self.object(bnode_context)
+        self.eat(r_wspace)
+        graph = self.uriref() or self.nodeid(bnode_context) or None
+        self.eat(r_tail)
+        if self.line:
+            raise ParseError(f"Conteúdo inesperado no fim da linha: {self.line}")
+        return subject, predicate, obj, graph
+
+
+def iter_statements(path):
+    """
+    Lê um arquivo N-Triples/N-Quads linha a linha.
+
+    Yields:
+        tuple: (s, p, o, g), com g None para linhas sem grafo nomeado. Nós em
+        branco com o mesmo rótulo resolvem para o mesmo `BNode` em todo o arquivo.
+    """
+    parser = _LineParser()
+    bnodes = {}
+    with _open(path, "r") as f:
+        for number, line in enumerate(f, 1):
+            try:
+                statement = parser.statement(line.rstrip("\r\n"), bnodes)
+            except ParseError as e:
+                raise ParseError(f"{path}:{number}: {e}") from None
+            if statement is not None:
+                yield statement
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Agrupa `iter_statements` em listas de até `chunk_size` declarações."""
+    statements = iter_statements(path)
+    while True:
+        chunk = list(islice(statements, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_ntriples(graph, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Carrega um arquivo N-Triples/N-Quads em `graph`, um bloco por vez.
+
+    Em grafos com store contextual, as quádruplas vão para o grafo nomeado
+    correspondente; nos demais, o grafo nomeado é ignorado.
+
+    Returns:
+        int: Número de declarações lidas.
+    """
+    count = 0
+    context_aware = graph.store.context_aware
+    for chunk in iter_chunks(path, chunk_size):
+        if context_aware and hasattr(graph, "get_context"):
+            graph.addN((s, p, o, graph.get_context(g) if g is not None else graph.default_context)
+                       for s, p, o, g in chunk)
+        else:
+            graph.addN((s, p, o, graph) for s, p, o, _ in chunk)
+        count += len(chunk)
+    return count
@@ -22,6 +22,16 @@ class OntologyValidator:
         self.graph = graph
         self.REC = Namespace("http://recife.leg.br/ontologia-conflito#")
 
+    @classmethod
+    def from_file(cls, path):
+        """Cria o validador a partir de um Turtle ou de uma base SQLite (aberta somente para leitura)."""
+        from src.sqlite_store import is_sqlite_path, open_kb
+        if is_sqlite_path(path):
+            return cls(open_kb(path, read_only=True))
+        graph = Graph()
+        graph.parse(path, format="turtle")
+        return cls(graph)
+
     def validate_classes(self, expected_classes: list) -> ValidationResult:
         """Verifica se uma lista de classes esperadas existe no schema."""
         
@@ -90,3 +100,25 @@ class OntologyValidator:
         }
         
         return ValidationResult(is_valid, message, details)
+
+    def validate_instance_consistency(self) -> ValidationResult:
+        """Verifica se algum indivíduo pertence a duas classes declaradas disjuntas."""
+        from src.consistency import ConsistencyChecker
+
+        checker = ConsistencyChecker(self.graph)
+        violations = [
+            {
+                "individual": v.individual.split('#')[-1],
+                "classes": (v.class1.split('#')[-1], v.class2.split('#')[-1]),
+            }
+            for v in checker.violations
+        ]
+
+        is_valid = checker.is_consistent
+        message = "Nenhuma violação de disjunção encontrada." if is_valid else f"Encontradas {len(violations)} violações de disjunção."
+        details = {
+            "total_violations": len(violations),
+            "violations": violations
+        }
+
+        return ValidationResult(is_valid, message, details)
@@ -0,0 +1,246 @@
+# src/versioning.py
+"""
+Base de Conhecimento Versionada por Revisão Legislativa.
+
+Cada lei, emenda ou PL gera uma nova versão da base; guardar uma cópia
+completa do grafo inferido por versão desperdiça espaço, pois de uma revisão
+para a seguinte muda uma fração mínima das triplas. O `VersionedStore` estende
+o `SQLiteStore` (ver `src.sqlite_store`) com o histórico:
+
+- cada revisão é um grafo nomeado (`urn:kb:revisao:<id>`) com uma revisão-pai,
+  um nome (ex: "Lei_do_Remembramento_2020") e o delta em relação ao pai
+  (triplas adicionadas e removidas), guardado em ids do dicionário de termos;
+- a cada `checkpoint_interval` revisões ao longo de uma cadeia, a revisão é
+  também materializada por inteiro (checkpoint). Reconstruir qualquer revisão
+  é carregar o checkpoint mais próximo e aplicar no máximo
+  `checkpoint_interval - 1` deltas, ou seja, tempo limitado;
+- a tabela de triplas do próprio store guarda a revisão mais recente (head),
+  então `Graph(store=...)` consulta a versão atual sem reconstrução.
+
+    store = open_versioned("data/kb_historico.sqlite")
+    store.commit_revision(grafo_inferido, name="Lei_do_PREZEIS_1995")
+    SPARQLQueryEngine.from_file("data/kb_historico.sqlite", revision="Lei_do_PREZEIS_1995")
+"""
+import time
+
+from rdflib import Graph, URIRef
+from rdflib.store import VALID_STORE
+
+try:
+    from src.sqlite_store import SQLiteStore
+except ImportError:  # execução direta: python src/build_knowledge_base.py
+    from sqlite_store import SQLiteStore
+
+DEFAULT_CHECKPOINT_INTERVAL = 10
+
+REVISION_NAMESPACE = "urn:kb:revisao:"
+
+VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS revisions (
+    id INTEGER PRIMARY KEY, parent INTEGER REFERENCES revisions (id), name TEXT UNIQUE,
+    created REAL NOT NULL, depth INTEGER NOT NULL, checkpoint INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    rev INTEGER NOT NULL, added INTEGER NOT NULL, s INTEGER NOT NULL, p INTEGER NOT NULL, o INTEGER NOT NULL,
+    PRIMARY KEY (rev, s, p, o)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS checkpoints (
+    rev INTEGER NOT NULL, s INTEGER NOT NULL, p INTEGER NOT NULL, o INTEGER NOT NULL,
+    PRIMARY KEY (rev, s, p, o)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+
+def revision_uri(rev):
+    """Nome do grafo de uma revisão."""
+    return URIRef(f"{REVISION_NAMESPACE}{rev}")
+
+
+class VersionedStore(SQLiteStore):
+    """`SQLiteStore` cuja tabela de triplas é a revisão head, com o histórico em deltas e checkpoints."""
+
+    def __init__(self, configuration=None, identifier=None, read_only=False,
+                 checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Args:
+            configuration (str, opcional): Caminho do arquivo SQLite.
+            read_only (bool): Abre somente para leitura.
+            checkpoint_interval (int): Revisões entre dois checkpoints de uma cadeia.
+        """
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval deve ser >= 1")
+        self.checkpoint_interval = checkpoint_interval
+        super().__init__(configuration, identifier, read_only=read_only)
+
+    def open(self, configuration, create=True):
+        result = super().open(configuration, create)
+        if result == VALID_STORE and not self.read_only:
+            self._conn.executescript(VERSION_SCHEMA)
+        return result
+
+    def add(self, triple, context=None, quoted=False):
+        raise TypeError("A head de uma base versionada só muda por commit_revision.")
+
+    def addN(self, quads):
+        raise TypeError("A head de uma base versionada só muda por commit_revision.")
+
+    def remove(self, triple_pattern, context=None):
+        raise TypeError("A head de uma base versionada só muda por commit_revision.")
+
+    # -------------------------------------------------------------------------
+    # Revisões
+    # -------------------------------------------------------------------------
+
+    @property
+    def head(self):
+        """Id da revisão mais recente, ou None se ainda não há revisões."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'head'").fetchone()
+        return row[0] if row else None
+
+    def resolve(self, ref=None):
+        """
+        Id de uma revisão a partir do id, do nome ou do grafo nomeado (None = head).
+
+        Raises:
+            KeyError: Se a revisão não existe.
+        """
+        if ref is None:
+            ref = self.head
+        elif isinstance(ref, str) and ref.startswith(REVISION_NAMESPACE):
+            ref = int(ref[len(REVISION_NAMESPACE):])
+        column = "id" if isinstance(ref, int) else "name"
+        row = self._conn.execute(f"SELECT id FROM revisions WHERE {column} = ?", (ref,)).fetchone()
+        if row is None:
+            raise KeyError(f"Revisão inexistente: {ref}")
+        return row[0]
+
+    def revisions(self):
+        """Histórico em ordem de criação: id, pai, nome, checkpoint e tamanho do delta."""
+        rows = self._conn.execute(
+            "SELECT r.id, r.parent, r.name, r.created, r.checkpoint,"
+            " (SELECT COUNT(*) FROM deltas d WHERE d.rev = r.id AND d.added = 1),"
+            " (SELECT COUNT(*) FROM deltas d WHERE d.rev = r.id AND d.added = 0)"
+            " FROM revisions r ORDER BY r.id")
+        return [{"id": rev, "parent": parent, "name": name, "created": created, "checkpoint": bool(cp),
+                 "added": added, "removed": removed, "graph": revision_uri(rev)}
+                for rev, parent, name, created, cp, added, removed in rows]
+
+    def _rows(self, rev):
+        """Triplas (em ids) de uma revisão: checkpoint mais próximo + deltas até ela."""
+        if rev == self.head:
+            return set(self._conn.execute("SELECT s, p, o FROM triples"))
+        chain = []
+        while True:
+            parent, checkpoint = self._conn.execute(
+                "SELECT parent, checkpoint FROM revisions WHERE id = ?", (rev,)).fetchone()
+            if checkpoint:
+                break
+            chain.append(rev)
+            rev = parent
+        rows = set(self._conn.execute("SELECT s, p, o FROM checkpoints WHERE rev = ?", (rev,)))
+        for delta in reversed(chain):
+            for added, s, p, o in self._conn.execute(
+                    "SELECT added, s, p, o FROM deltas WHERE rev = ?", (delta,)):
+                if added:
+                    rows.add((s, p, o))
+                else:
+                    rows.discard((s, p, o))
+        return rows
+
+    def _graph(self, rows, identifier):
+        terms = self._terms_by_id(i for row in rows for i in row)
+        g = Graph(identifier=identifier)
+        for prefix, ns in self.namespaces():
+            g.bind(prefix, ns, override=True, replace=True)
+        g.addN((terms[s], terms[p], terms[o], g) for s, p, o in rows)
+        return g
+
+    def revision_graph(self, ref=None):
+        """
+        Reconstrói uma revisão como grafo em memória, nomeado por `revision_uri`.
+
+        Args:
+            ref (int | str, opcional): Id, nome ou grafo nomeado da revisão (padrão: head).
+
+        Returns:
+            rdflib.Graph: O grafo da revisão.
+        """
+        rev = self.resolve(ref)
+        return self._graph(self._rows(rev), revision_uri(rev))
+
+    def diff(self, ref=None):
+        """Triplas adicionadas e removidas por uma revisão em relação ao pai."""
+        rev = self.resolve(ref)
+        result = {True: [], False: []}
+        rows = list(self._conn.execute("SELECT added, s, p, o FROM deltas WHERE rev = ?", (rev,)))
+        terms = self._terms_by_id(i for row in rows for i in row[1:])
+        for added, s, p, o in rows:
+            result[bool(added)].append((terms[s], terms[p], terms[o]))
+        return {"added": result[True], "removed": result[False]}
+
+    def commit_revision(self, graph=None, added=(), removed=(), name=None, parent=None):
+        """
+        Grava uma nova revisão, que passa a ser a head.
+
+        Args:
+            graph (iterable, opcional): Conteúdo completo da revisão (ex: o grafo inferido);
+                o delta é calculado em relação ao pai.
+            added, removed (iterable): Alternativa a `graph`: as triplas que mudam em
+                relação ao pai.
+            name (str, opcional): Nome único da revisão (ex: a lei que a originou).
+            parent (int | str, opcional): Revisão-pai (padrão: head).
+
+        Returns:
+            int: Id da revisão criada.
+        """
+        with self.batch():
+            parent = self.resolve(parent) if parent is not None or self.head is not None else None
+            old = self._rows(parent) if parent is not None else set()
+            if graph is not None:
+                new = {tuple(self._intern(t) for t in triple) for triple in graph}
+                plus, minus = new - old, old - new
+                if hasattr(graph, "namespaces"):
+                    for prefix, ns in graph.namespaces():
+                        self.bind(prefix, ns, override=False)
+            else:
+                plus = {tuple(self._intern(t) for t in triple) for triple in added} - old
+                minus = {tuple(self._intern(t) for t in triple) for triple in removed} & old
+                new = (old - minus) | plus
+
+            depth = 0
+            if parent is not None:
+                depth = self._conn.execute("SELECT depth FROM revisions WHERE id = ?", (parent,)).fetchone()[0] + 1
+            checkpoint = parent is None or depth >= self.checkpoint_interval
+            if checkpoint:
+                depth = 0
+            rev = self._conn.execute(
+                "INSERT INTO revisions (parent, name, created, depth, checkpoint) VALUES (?, ?, ?, ?, ?)",
+                (parent, name, time.time(), depth, int(checkpoint))).lastrowid
+            self._conn.executemany("INSERT INTO deltas VALUES (?, 1, ?, ?, ?)", ((rev,) + row for row in plus))
+            self._conn.executemany("INSERT INTO deltas VALUES (?, 0, ?, ?, ?)", ((rev,) + row for row in minus))
+            if checkpoint:
+                self._conn.executemany("INSERT INTO checkpoints VALUES (?, ?, ?, ?)", ((rev,) + row for row in new))
+
+            # A tabela de triplas acompanha a head
+            if parent is not None and parent == self.head:
+                self._conn.executemany("DELETE FROM triples WHERE s = ? AND p = ? AND o = ?", minus)
+                self._conn.executemany("INSERT OR IGNORE INTO triples VALUES (?, ?, ?)", plus)
+            else:
+                self._conn.execute("DELETE FROM triples")
+                self._conn.executemany("INSERT INTO triples VALUES (?, ?, ?)", new)
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('head', ?)", (rev,))
+        return rev
+
+
+def open_versioned(path, read_only=False, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL):
+    """
+    Abre (ou cria) uma base versionada.
+
+    Returns:
+        VersionedStore: O store; `Graph(store=store)` é a revisão head.
+    """
+    store = VersionedStore(read_only=read_only, checkpoint_interval=checkpoint_interval)
+    if store.open(path) != VALID_STORE:
+        raise FileNotFoundError(path)
+    return store
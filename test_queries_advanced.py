@@ -3,9 +3,14 @@ Script de Demonstração das Consultas SPARQL Avançadas
 Executa todas as 10 consultas e mostra os resultados formatados
 """
 
-from rdflib import Graph
 from src.sparql_queries import SPARQLQueryEngine
 
+REPORT_QUERIES = [
+    "normative_conflict", "ambiguous_actors", "causality_chain", "spatial_overlap",
+    "legal_breaches", "institutional_fragmentation", "benefit_damage_reversals",
+    "market_pressure_on_zeis", "conflicting_jurisdictions", "full_conflict_narrative",
+]
+
 def print_section(title):
     """Imprime um cabeçalho de seção formatado"""
     print("\n" + "=" * 80)
@@ -15,12 +20,12 @@ def print_section(title):
 def main():
     # Carregar grafo inferido
     print("Carregando base de conhecimento inferida...")
-    g = Graph()
-    g.parse("data/kb_conflito_v5_inferido.ttl", format="turtle")
+    engine = SPARQLQueryEngine.from_file("data/kb_conflito_v5_inferido.ttl")
+    g = engine.graph
     print(f"✓ Grafo carregado com {len(g)} triplas")
-    
-    # Criar engine
-    engine = SPARQLQueryEngine(g)
+
+    # As dez consultas em um único lote, com varreduras compartilhadas
+    report = dict(zip(REPORT_QUERIES, engine.run_batch(REPORT_QUERIES)))
     
     # =========================================================================
     # CONSULTA 1: CONFLITOS NORMATIVOS
@@ -28,7 +33,7 @@ def main():
     print_section("1. CONFLITOS NORMATIVOS (Propriedade Simétrica)")
     print("Detecta leis que estão em conflito direto\n")
     
-    results = engine.query_normative_conflict()
+    results = report["normative_conflict"]
     if results:
         for r in results:
             print(f"  ⚠️  {r['norma1_label']} ↔ {r['norma2_label']}")
@@ -42,7 +47,7 @@ def main():
     print_section("2. AGENTES AMBÍGUOS (Contradições Políticas)")
     print("Identifica agentes que executam ações propositivas E impeditivas\n")
     
-    results = engine.query_ambiguous_actors()
+    results = report["ambiguous_actors"]
     if results:
         for r in results:
             print(f"  🔄 {r['ator_label']}")
@@ -59,7 +64,7 @@ def main():
     print_section("3. CADEIA DE CAUSALIDADE (Agente → Ação → Dano)")
     print("Rastreia quem causou quais danos\n")
     
-    results = engine.query_causality_chain()
+    results = report["causality_chain"]
     if results:
         for r in results:
             print(f"  📍 {r['agente_label']}")
@@ -76,7 +81,7 @@ def main():
     print_section("4. SOBREPOSIÇÃO ESPACIAL (Propriedade Transitiva)")
     print("Detecta zonas que coincidem (sobreposição legal)\n")
     
-    results = engine.query_spatial_overlap()
+    results = report["spatial_overlap"]
     if results:
         for r in results:
             print(f"  🗺️  {r['espaco1_label']}")
@@ -92,7 +97,7 @@ def main():
     print_section("5. BRECHAS LEGAIS (Norma → Ação Impeditiva → Dano)")
     print("Identifica normas que permitem ações que causam danos\n")
     
-    results = engine.query_legal_breaches()
+    results = report["legal_breaches"]
     if results:
         for r in results:
             print(f"  ⚖️  {r['norma_label']}")
@@ -109,7 +114,7 @@ def main():
     print_section("6. FRAGMENTAÇÃO INSTITUCIONAL (Mapeamento do Poder Público)")
     print("Mapeia todas as agências do poder público e suas atribuições\n")
     
-    results = engine.query_institutional_fragmentation()
+    results = report["institutional_fragmentation"]
     if results:
         current_type = None
         for r in results:
@@ -131,7 +136,7 @@ def main():
     print_section("7. REVERSÕES (Benefício reverte Dano)")
     print("Mostra pares de benefício-dano e as ações que os geram\n")
     
-    results = engine.query_benefit_damage_reversals()
+    results = report["benefit_damage_reversals"]
     if results:
         for r in results:
             print(f"  ✅ {r['beneficio_label']}")
@@ -149,7 +154,7 @@ def main():
     print_section("8. PRESSÃO IMOBILIÁRIA SOBRE ZEIS")
     print("Identifica ZEIS sob pressão e se permitem remembramento\n")
     
-    results = engine.query_market_pressure_on_zeis()
+    results = report["market_pressure_on_zeis"]
     if results:
         for r in results:
             print(f"  🏘️  {r['zeis_label']}")
@@ -170,7 +175,7 @@ def main():
     print_section("9. CONFLITOS DE JURISDIÇÃO")
     print("Detecta quando múltiplos órgãos têm tutela sobre o mesmo espaço\n")
     
-    results = engine.query_conflicting_jurisdictions()
+    results = report["conflicting_jurisdictions"]
     if results:
         for r in results:
             print(f"  ⚠️  Conflito de jurisdição em: {r['espaco_label']}")
@@ -188,7 +193,7 @@ def main():
     print_section("10. NARRATIVA COMPLETA DO CONFLITO")
     print("Reconstrói a história completa: Agente → Ação → Instrumento → Resultado\n")
     
-    results = engine.query_full_conflict_narrative()
+    results = report["full_conflict_narrative"]
     if results:
         current_agent = None
         for r in results:
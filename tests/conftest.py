@@ -0,0 +1,36 @@
+import os
+import sys
+from collections import Counter
+
+import pytest
+from rdflib import Graph
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.build_knowledge_base import DATA_DIR
+
+
+@pytest.fixture(scope="module")
+def asserted_graph():
+    """Base com os fatos declarados, antes da inferência."""
+    g = Graph()
+    g.parse(os.path.join(DATA_DIR, 'kb_conflito_v5_final.ttl'), format="turtle")
+    return g
+
+
+@pytest.fixture(scope="module")
+def inferred_graph():
+    """Base inferida gerada pela pipeline."""
+    g = Graph()
+    g.parse(os.path.join(DATA_DIR, 'kb_conflito_v5_inferido.ttl'), format="turtle")
+    return g
+
+
+def sorted_rows(results):
+    """Linhas de uma consulta comparáveis por texto, sem depender da ordem nem do tipo dos termos."""
+    return sorted(tuple(sorted((k, str(v)) for k, v in r.items())) for r in results)
+
+
+def row_bag(rows):
+    """Multiconjunto das linhas de uma consulta (semântica de bag do SPARQL)."""
+    return Counter(tuple(sorted(row.items())) for row in rows)
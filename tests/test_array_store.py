@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+from rdflib import Graph, RDF
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.array_store import ArrayStore
+from src.build_knowledge_base import DATA_DIR, REC
+from src.reasoner import CompiledReasoner
+from src.sparql_queries import SPARQLQueryEngine
+
+
+@pytest.fixture
+def array_graph():
+    g = Graph(store="ArrayStore")
+    g.parse(os.path.join(DATA_DIR, 'kb_conflito_v5_inferido.ttl'), format="turtle")
+    return g
+
+
+class TestArrayStore:
+    """O store codificado por dicionário deve se comportar como o store em memória."""
+
+    def test_same_triples(self, inferred_graph, array_graph):
+        assert isinstance(array_graph.store, ArrayStore)
+        assert len(array_graph) == len(inferred_graph)
+        assert set(array_graph) == set(inferred_graph)
+
+    @pytest.mark.parametrize("pattern", [
+        (None, REC.executaAcao, None),
+        (None, RDF.type, REC.ZEIS),
+        (REC.Prefeitura_do_Recife, None, None),
+        (None, None, REC.Lei_do_PREZEIS_1995),
+        (REC.Prefeitura_do_Recife, None, REC.AgenteUrbano),
+        (REC.Inexistente, None, None),
+    ])
+    def test_pattern_lookups(self, inferred_graph, array_graph, pattern):
+        assert set(array_graph.triples(pattern)) == set(inferred_graph.triples(pattern))
+
+    def test_buffered_writes_are_visible(self, inferred_graph, array_graph):
+        """Inserções e remoções pendentes aparecem nas leituras antes e depois da intercalação."""
+        nova = (REC.Lei_Nova_2025, REC.conflitaCom, REC.Lei_do_PREZEIS_1995)
+        array_graph.add(nova)
+        array_graph.remove((None, RDF.type, REC.ZEIS))
+        assert nova in array_graph
+        assert not list(array_graph.triples((None, RDF.type, REC.ZEIS)))
+        assert len(array_graph) == len(inferred_graph) + 1 - len(list(inferred_graph.triples((None, RDF.type, REC.ZEIS))))
+
+        before = set(array_graph)
+        array_graph.store.flush()
+        assert set(array_graph) == before
+        assert (REC.Lei_Nova_2025, None, None) in array_graph
+
+    def test_reasoner_and_queries_run_on_store(self, inferred_graph):
+        g = Graph(store="ArrayStore")
+        g.parse(os.path.join(DATA_DIR, 'kb_conflito_v5_final.ttl'), format="turtle")
+        CompiledReasoner(g).expand()
+        assert set(g) == set(inferred_graph)
+
+        engine, reference = SPARQLQueryEngine(g), SPARQLQueryEngine(inferred_graph)
+        for name in ("query_ambiguous_actors", "query_legal_breaches", "query_causality_chain"):
+            assert sorted(map(str, getattr(engine, name)())) == sorted(map(str, getattr(reference, name)()))
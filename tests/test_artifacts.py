@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+from rdflib import Graph, RDF
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import build_knowledge_base
+from src.artifacts import ArtifactWriter
+from src.build_knowledge_base import DATA_DIR, REC
+
+
+class TestArtifactWriter:
+    """Gravações em segundo plano não devem ver alterações feitas depois do pedido."""
+
+    def test_writes_copy_taken_at_submit(self, tmp_path):
+        g = Graph()
+        g.bind("rec", REC)
+        g.add((REC.ZEIS_Coque, RDF.type, REC.ZEIS))
+        path = str(tmp_path / "g.ttl")
+        with ArtifactWriter() as writer:
+            writer.write_graph(g, path)
+            g.add((REC.Lei_X, RDF.type, REC.LegislacaoUrbana))
+        written = Graph()
+        written.parse(path, format="turtle")
+        assert set(written) == {(REC.ZEIS_Coque, RDF.type, REC.ZEIS)}
+        assert "rec:ZEIS_Coque" in open(path, encoding="utf-8").read()
+
+    def test_errors_surface_on_wait(self, tmp_path):
+        writer = ArtifactWriter()
+        writer.write_graph(Graph(), str(tmp_path / "inexistente" / "g.ttl"))
+        with pytest.raises(OSError):
+            writer.close()
+
+    def test_in_memory_pipeline_matches_files(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(build_knowledge_base, "DATA_DIR", str(tmp_path))
+        monkeypatch.setattr(build_knowledge_base, "BUILD_CACHE_PATH", str(tmp_path / "build_cache.json"))
+        build_knowledge_base.main(use_cache=False)
+        for name in ("ontologia_conflito_urbano_schema_v5.ttl", "kb_conflito_v5_final.ttl",
+                     "kb_conflito_v5_inferido.ttl"):
+            produced, expected = Graph(), Graph()
+            produced.parse(str(tmp_path / name), format="turtle")
+            expected.parse(os.path.join(DATA_DIR, name), format="turtle")
+            assert set(produced) == set(expected), name
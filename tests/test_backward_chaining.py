@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+from rdflib import Graph, Literal, RDF, RDFS
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import sorted_rows
+from src.build_knowledge_base import REC
+from src.sparql_queries import SPARQLQueryEngine
+
+QUERIES = [
+    "query_normative_conflict", "query_ambiguous_actors", "query_causality_chain",
+    "query_spatial_overlap", "query_legal_breaches", "query_institutional_fragmentation",
+    "query_benefit_damage_reversals", "query_market_pressure_on_zeis",
+    "query_conflicting_jurisdictions", "query_full_conflict_narrative",
+]
+
+
+class TestBackwardChaining:
+    """Consultas sobre o grafo asserido devem igualar as consultas sobre o grafo materializado."""
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_query_matches_materialized(self, asserted_graph, inferred_graph, query):
+        backward = SPARQLQueryEngine(asserted_graph, backward_chaining=True)
+        materialized = SPARQLQueryEngine(inferred_graph)
+        assert sorted_rows(getattr(backward, query)()) == sorted_rows(getattr(materialized, query)())
+
+    def test_entailments_on_demand(self, asserted_graph):
+        engine = SPARQLQueryEngine(asserted_graph, backward_chaining=True)
+        g = engine.graph
+
+        assert (REC.Prefeitura_do_Recife, RDF.type, REC.AgenteUrbano) in g
+        assert (REC.Lei_do_Remembramento_2020, REC.conflitaCom, REC.Lei_do_PREZEIS_1995) in g
+        assert (REC.IEP_Edificio_Caixa_Dagua, REC.coincideCom, REC.Area_Recentro_Centro) in g
+        # Somente os subobjetivos tocados foram memoizados; nada foi gravado no grafo asserido
+        assert set(g._edges) == {REC.conflitaCom, REC.coincideCom}
+        assert len(asserted_graph) == len(g.asserted)
+        assert (REC.Prefeitura_do_Recife, RDF.type, REC.AgenteUrbano) not in asserted_graph
+
+    def test_memos_follow_graph_changes(self, asserted_graph):
+        g = Graph()
+        g += asserted_graph
+        engine = SPARQLQueryEngine(g, backward_chaining=True)
+        before = engine.query_normative_conflict()
+        assert engine.graph._edges
+
+        g.add((REC.Lei_Nova_2025, REC.conflitaCom, REC.Lei_do_PREZEIS_1995))
+        g.add((REC.Lei_Nova_2025, RDFS.label, Literal("Lei Nova (2025)")))
+        after = engine.query_normative_conflict()
+        assert len(after) == len(before) + 1
+        assert engine.equivalence_index(REC.conflitaCom).same(REC.Lei_Nova_2025, REC.Lei_do_PREZEIS_1995)
+        assert (REC.Lei_do_PREZEIS_1995, REC.conflitaCom, REC.Lei_Nova_2025) in engine.graph
@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import build_knowledge_base
+from src.build_cache import BuildCache
+
+
+def _stage(cache, stage, inputs, path, text, calls):
+    """Uma etapa como em `build_knowledge_base.main`: check, refaz se falhou, record e log."""
+    key, hit = cache.check(stage, inputs)
+    if not hit:
+        calls.append(text)
+        with open(path, "w") as f:
+            f.write(text)
+        cache.record(stage, key, [path])
+    cache.log(stage, key, hit, 0.0)
+    return hit
+
+
+class TestBuildCache:
+    """Etapas com as mesmas entradas e artefatos intactos não devem ser refeitas."""
+
+    def test_hit_and_miss(self, tmp_path):
+        out, calls = str(tmp_path / "a.txt"), []
+        manifest = str(tmp_path / "cache.json")
+        first = BuildCache(manifest)
+        _stage(first, "a", ["v1"], out, "v1", calls)
+        first.save()
+        cache = BuildCache(manifest)
+        assert _stage(cache, "a", ["v1"], out, "v1", calls) is True
+        assert calls == ["v1"]
+        assert _stage(cache, "a", ["v2"], out, "v2", calls) is False
+        assert calls == ["v1", "v2"]
+        assert [e["status"] for e in cache.report] == ["hit", "miss"]
+        assert "a            miss" in cache.format_report()
+
+    def test_record_takes_effect_on_save(self, tmp_path):
+        out, calls = str(tmp_path / "a.txt"), []
+        manifest = str(tmp_path / "cache.json")
+        cache = BuildCache(manifest)
+        _stage(cache, "a", ["v1"], out, "v1", calls)
+        assert "a" not in cache.manifest and not os.path.exists(manifest)
+        cache.save()
+        assert _stage(BuildCache(manifest), "a", ["v1"], out, "v1", calls) is True
+
+    def test_modified_artifact_is_rebuilt(self, tmp_path):
+        out, calls = str(tmp_path / "a.txt"), []
+        manifest = str(tmp_path / "cache.json")
+        cache = BuildCache(manifest)
+        _stage(cache, "a", ["v1"], out, "v1", calls)
+        cache.save()
+        with open(out, "w") as f:
+            f.write("editado à mão")
+        assert _stage(BuildCache(manifest), "a", ["v1"], out, "v1", calls) is False
+        assert calls == ["v1", "v1"]
+        key = BuildCache(manifest).manifest["a"]["key"]
+        assert BuildCache(manifest, enabled=False).is_hit("a", key) is False
+
+    def test_pipeline_second_run_hits(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(build_knowledge_base, "DATA_DIR", str(tmp_path))
+        monkeypatch.setattr(build_knowledge_base, "BUILD_CACHE_PATH", str(tmp_path / "build_cache.json"))
+        build_knowledge_base.main()
+        capsys.readouterr()
+        build_knowledge_base.main()
+        report = capsys.readouterr().out
+        for stage in ("schema", "instances", "inference"):
+            assert f"{stage:<12} hit" in report
@@ -0,0 +1,81 @@
+import os
+import sys
+from collections import Counter
+
+from rdflib import Graph, RDF, RDFS
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.build_knowledge_base import REC
+from src.consistency import ConsistencyChecker
+from src.reasoner import CompiledReasoner
+from src.validators import OntologyValidator
+
+
+class _CountingGraph(Graph):
+    """Grafo que conta as varreduras por padrão de tripla."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scans = Counter()
+
+    def triples(self, triple):
+        self.scans[triple] += 1
+        return super().triples(triple)
+
+
+class TestConsistencyChecker:
+    """Violações de owl:disjointWith devem ser detectadas no momento da adição."""
+
+    def test_kb_is_consistent(self, asserted_graph):
+        checker = ConsistencyChecker(asserted_graph)
+        assert checker.is_consistent
+        assert checker.members[REC.Acao_Propositiva]
+
+    def test_direct_typing_violation(self, asserted_graph):
+        checker = ConsistencyChecker(asserted_graph)
+        triple = (REC.Acao_Aplicar_PEUC, RDF.type, REC.Acao_Impeditiva)
+        violations = checker.add([triple])
+
+        assert len(violations) == 1
+        v = violations[0]
+        assert v.individual == REC.Acao_Aplicar_PEUC
+        assert {v.class1, v.class2} == {REC.Acao_Propositiva, REC.Acao_Impeditiva}
+        assert v.triple == triple
+
+    def test_violation_through_property_domain(self, asserted_graph):
+        """Usar uma propriedade cujo domínio é a classe disjunta também é uma violação."""
+        checker = ConsistencyChecker(asserted_graph)
+        prop = next(asserted_graph.subjects(RDFS.domain, REC.Acao_Impeditiva))
+        violations = checker.add([(REC.Acao_Aplicar_PEUC, prop, REC.Lei_do_PREZEIS_1995)])
+        assert [v.individual for v in violations] == [REC.Acao_Aplicar_PEUC]
+
+    def test_matches_full_closure_check(self, asserted_graph):
+        """Os indivíduos reportados coincidem com o cax-dw do fechamento completo."""
+        triple = (REC.Acao_Aplicar_PEUC, RDF.type, REC.Acao_Impeditiva)
+        g = Graph()
+        for t in list(asserted_graph) + [triple]:
+            g.add(t)
+        engine = CompiledReasoner(g)
+        engine.expand()
+
+        checker = ConsistencyChecker(asserted_graph)
+        checker.add([triple])
+        assert len(engine.errors) == len(checker.violations) == 1
+        assert str(checker.violations[0].individual) in engine.errors[0]
+
+    def test_materialized_graph_is_not_walked(self, asserted_graph, inferred_graph):
+        """Sobre a base inferida, a pertinência vem das tipagens, sem varrer o grafo inteiro."""
+        g = _CountingGraph()
+        g += inferred_graph
+        g.scans.clear()
+        checker = ConsistencyChecker(g, materialized=True)
+        assert g.scans[(None, None, None)] == 0
+        assert checker.is_consistent
+        assert checker.members == ConsistencyChecker(asserted_graph).members
+
+        triple = (REC.Acao_Aplicar_PEUC, RDF.type, REC.Acao_Impeditiva)
+        assert [v.individual for v in checker.add([triple])] == [REC.Acao_Aplicar_PEUC]
+
+    def test_validator_reports_violations(self, asserted_graph):
+        assert OntologyValidator(asserted_graph).validate_instance_consistency().is_valid
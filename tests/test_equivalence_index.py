@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+from rdflib import Graph, Literal, RDFS
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import sorted_rows
+from src.build_knowledge_base import DATA_DIR, REC
+from src.equivalence_index import EquivalenceIndex, symmetric_transitive_properties
+from src.reasoner import CompiledReasoner
+from src.sparql_queries import SPARQLQueryEngine
+
+
+@pytest.fixture(scope="module")
+def inferred_graph(inferred_graph):
+    # Segundo órgão com tutela sobre o grupo IEP/ZEPH/Recentro
+    inferred_graph.add((REC.IPHAN, RDFS.label, Literal("IPHAN")))
+    inferred_graph.add((REC.IPHAN, REC.exerceTutelaSobre, REC.IEP_Edificio_Caixa_Dagua))
+    return inferred_graph
+
+
+class TestEquivalenceIndex:
+
+    def test_union_find_groups(self):
+        index = EquivalenceIndex([("a", "b"), ("c", "d"), ("b", "c"), ("x", "y")])
+        assert len(index) == 2
+        assert index.same("a", "d")
+        assert index.same("a", "a")
+        assert not index.same("a", "x")
+        assert not index.same("a", "z")
+        assert index.members("d") == {"a", "b", "c", "d"}
+        assert index.members("z") == frozenset()
+
+    def test_detects_coincide_com(self, inferred_graph):
+        assert REC.coincideCom in symmetric_transitive_properties(inferred_graph)
+
+    def test_queries_match_sparql(self, inferred_graph):
+        """O caminho via índice deve devolver as mesmas linhas que o SPARQL sobre o fechamento."""
+        engine = SPARQLQueryEngine(inferred_graph)
+        assert sorted_rows(engine.query_spatial_overlap()) == sorted_rows(engine.query_spatial_overlap(use_index=False))
+
+        jurisdicoes = engine.query_conflicting_jurisdictions()
+        assert len(jurisdicoes) > 0
+        assert sorted_rows(jurisdicoes) == sorted_rows(engine.query_conflicting_jurisdictions(use_index=False))
+
+    def test_collapsed_materialization(self, inferred_graph):
+        """Sem materializar o fechamento de coincideCom, o índice ainda responde igual."""
+        g = Graph()
+        g.parse(os.path.join(DATA_DIR, 'kb_conflito_v5_final.ttl'), format="turtle")
+        CompiledReasoner(g, collapse_equivalences=True).expand()
+
+        assert (REC.IEP_Edificio_Caixa_Dagua, REC.coincideCom, REC.Area_Recentro_Centro) not in g
+        collapsed = SPARQLQueryEngine(g)
+        full = SPARQLQueryEngine(inferred_graph)
+        assert sorted_rows(collapsed.query_spatial_overlap()) == sorted_rows(full.query_spatial_overlap())
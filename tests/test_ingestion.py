@@ -0,0 +1,96 @@
+import gzip
+import json
+import os
+import sys
+
+import pytest
+from rdflib import Graph, Literal, RDF, RDFS, XSD
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import ingestion
+from src.build_knowledge_base import DATA_DIR, REC
+from src.ingestion import SchemaIndex, ingest
+
+
+@pytest.fixture
+def schema_graph():
+    g = Graph()
+    g.parse(os.path.join(DATA_DIR, 'ontologia_conflito_urbano_schema_v5.ttl'), format="turtle")
+    return g
+
+
+@pytest.fixture
+def data_files(tmp_path):
+    entities = tmp_path / "entidades.csv"
+    entities.write_text(
+        "id,class,label\n"
+        "ZEIS_Brasilia_Teimosa,ZEIS,ZEIS Brasília Teimosa\n"
+        "Lei_X,LegislacaoUrbana,Lei X\n"
+        "Lote_1,ClasseInexistente,Lote 1\n",
+        encoding="utf-8")
+    relations = tmp_path / "relacoes.jsonl.gz"
+    with gzip.open(relations, "wt", encoding="utf-8") as f:
+        for record in [
+            {"subject": "ZEIS_Brasilia_Teimosa", "property": "permiteRemembramento", "object": False},
+            {"subject": "ZEIS_Brasilia_Teimosa", "property": "estaSobPressaoImobiliaria",
+             "object": "Mercado_Imobiliario_Especulativo"},
+            {"subject": "Lei_X", "property": "conflitaCom", "object": "Lei_do_PREZEIS_1995"},
+            {"subject": "Lei_X", "property": "temAtribuicaoLegal", "object": "Regular lotes"},
+            {"subject": "Lei_X", "property": "propriedadeInexistente", "object": "Y"},
+            {"subject": "ZEIS_Brasilia_Teimosa", "property": "permiteRemembramento", "object": "talvez"},
+        ]:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return [str(entities), str(relations)]
+
+
+class TestIngestion:
+    """Registros tabulares viram triplas validadas contra o schema."""
+
+    def test_valid_records_are_loaded(self, schema_graph, data_files):
+        before = len(schema_graph)
+        report = ingest(schema_graph, data_files)
+        assert report["records"] == 9
+        assert report["rejected"] == 3
+        assert report["triples"] == len(schema_graph) - before == 8
+        assert (REC.ZEIS_Brasilia_Teimosa, RDF.type, REC.ZEIS) in schema_graph
+        assert (REC.ZEIS_Brasilia_Teimosa, RDFS.label, Literal("ZEIS Brasília Teimosa")) in schema_graph
+        assert (REC.ZEIS_Brasilia_Teimosa, REC.permiteRemembramento,
+                Literal("false", datatype=XSD.boolean)) in schema_graph
+        assert (REC.Lei_X, REC.temAtribuicaoLegal, Literal("Regular lotes")) in schema_graph
+        assert (REC.Lei_X, REC.conflitaCom, REC.Lei_do_PREZEIS_1995) in schema_graph
+
+    def test_errors_point_to_file_and_line(self, schema_graph, data_files):
+        report = ingest(schema_graph, data_files)
+        assert report["errors"][0] == f"{data_files[0]}:4: Classe desconhecida no schema: ClasseInexistente"
+        assert report["errors"][1].startswith(f"{data_files[1]}:5: Propriedade desconhecida")
+        with pytest.raises(ValueError, match="ClasseInexistente"):
+            ingest(schema_graph, data_files, strict=True)
+
+    def test_malformed_lines_are_rejected(self, schema_graph, tmp_path):
+        path = tmp_path / "ruins.jsonl"
+        path.write_text(
+            '{"id": "Lote_1", "class": "ZEIS"}\n'
+            '{"id": "Lote_2", "class": \n'
+            '["x"]\n'
+            '{"id": 5, "class": "ZEIS"}\n'
+            '{"subject": "Lote_1", "property": 7, "object": "Y"}\n',
+            encoding="utf-8")
+        report = ingest(schema_graph, [str(path)])
+        assert (report["records"], report["triples"], report["rejected"]) == (5, 1, 4)
+        assert [e.split(": ", 1)[0] for e in report["errors"]] == [f"{path}:{n}" for n in (2, 3, 4, 5)]
+        assert "JSON inválido" in report["errors"][0]
+        assert "objeto" in report["errors"][1]
+        assert "5" in report["errors"][2]
+        with pytest.raises(ValueError, match=f"{path}:2: JSON inválido"):
+            ingest(schema_graph, [str(path)], strict=True)
+
+    def test_writes_in_batches(self, schema_graph, tmp_path, monkeypatch):
+        path = tmp_path / "lotes.csv"
+        path.write_text("id,class\n" + "".join(f"Lote_{i},ZEIS\n" for i in range(25)), encoding="utf-8")
+        batches = []
+        monkeypatch.setattr(ingestion, "BATCH_SIZE", 10)
+        monkeypatch.setattr(schema_graph, "addN", lambda quads: batches.append(len(quads)))
+        report = ingest(schema_graph, [str(path)], schema=SchemaIndex(schema_graph))
+        assert batches == [10, 10, 5]
+        assert report["triples"] == 25
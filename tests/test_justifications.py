@@ -0,0 +1,101 @@
+import os
+import sys
+
+from rdflib import Graph, RDF, OWL
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.build_knowledge_base import REC
+from src.justifications import JustificationStore
+from src.reasoner import CompiledReasoner, IncrementalReasoner
+
+
+def _expand(asserted, store):
+    g = Graph()
+    for t in asserted:
+        g.add(t)
+    CompiledReasoner(g, justifications=store).expand()
+    return g
+
+
+def _leaves(node):
+    if not node["premises"]:
+        return [node]
+    return [leaf for child in node["premises"] for leaf in _leaves(child)]
+
+
+class TestJustificationStore:
+    """Toda tripla inferida deve ter uma prova que termina em asserções ou axiomas."""
+
+    def test_every_inferred_triple_is_explained(self, asserted_graph):
+        store = JustificationStore()
+        g = _expand(asserted_graph, store)
+
+        inferred = set(g) - set(asserted_graph)
+        assert inferred and all(t in store for t in inferred)
+        for t in inferred:
+            for leaf in _leaves(store.explain(t)):
+                assert leaf["triple"] in g
+                assert leaf["triple"] in asserted_graph or leaf["rule"] in ("axiom", "dt-type2", "eq-ref")
+
+    def test_explain_audit_questions(self, asserted_graph):
+        store = JustificationStore()
+        _expand(asserted_graph, store)
+
+        conflito = store.explain((REC.Lei_do_Remembramento_2020, REC.conflitaCom, REC.Lei_do_PREZEIS_1995))
+        assert conflito["rule"] == "prp-symp"
+        assert (REC.conflitaCom, RDF.type, OWL.SymmetricProperty) in [p["triple"] for p in conflito["premises"]]
+
+        agente = store.explain((REC.Prefeitura_do_Recife, RDF.type, REC.AgenteUrbano))
+        assert agente["rule"] is not None
+        assert store.explain((REC.Lei_do_PREZEIS_1995, RDF.type, REC.LegislacaoUrbana))["rule"] is None
+
+    def test_incremental_and_retraction_keep_store_consistent(self, asserted_graph):
+        store = JustificationStore()
+        g = _expand(asserted_graph, store)
+        reasoner = IncrementalReasoner(g, asserted=asserted_graph, justifications=store)
+        nova = (REC.Lei_Nova_2025, REC.conflitaCom, REC.Lei_do_PREZEIS_1995)
+
+        delta = reasoner.add([nova])
+        assert all(t in store for t in delta["inferred"])
+
+        result = reasoner.retract([nova])
+        assert not any(t in store for t in result["removed"])
+
+    def test_readded_triple_is_explained_again(self):
+        a, b, c, d = [(REC[f"s{i}"], REC.p, REC.o) for i in range(4)]
+        store = JustificationStore()
+        store.record(b, "r1", (a,))
+        store.record(c, "r2", (b,))
+        store.discard(b)
+        assert b not in store and store.explain(c)["premises"][0]["rule"] is None
+        store.record(b, "r3", (d,))
+        assert store.explain(c)["premises"][0] == {
+            "triple": b, "rule": "r3", "premises": [{"triple": d, "rule": None, "premises": []}]}
+        assert len(store) == 2
+
+    def test_retract_then_readd(self, asserted_graph):
+        store = JustificationStore()
+        g = _expand(asserted_graph, store)
+        asserted = Graph()
+        asserted += asserted_graph
+        reasoner = IncrementalReasoner(g, asserted=asserted, justifications=store)
+        nova = (REC.Lei_Nova_2025, REC.conflitaCom, REC.Lei_do_PREZEIS_1995)
+
+        inferred = reasoner.add([nova])["inferred"]
+        reasoner.retract([nova])
+        reasoner.add([nova])
+        for t in inferred:
+            assert store.explain(t)["rule"] is not None
+            for leaf in _leaves(store.explain(t)):
+                assert leaf["triple"] in asserted or leaf["triple"] == nova or leaf["rule"] is not None
+
+    def test_bounded_memory(self, asserted_graph):
+        full = JustificationStore()
+        _expand(asserted_graph, full)
+        bounded = JustificationStore(max_entries=100)
+        _expand(asserted_graph, bounded)
+
+        assert bounded.dropped > 0
+        assert len(bounded._triples) <= 100
+        assert 0 < bounded.memory_usage() < full.memory_usage()
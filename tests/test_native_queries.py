@@ -0,0 +1,115 @@
+import os
+import sys
+from collections import Counter
+
+import pytest
+from rdflib import Graph, Literal, RDF, RDFS
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import row_bag
+from src.build_knowledge_base import REC
+from src.sparql_queries import SPARQLQueryEngine
+
+QUERIES = [
+    ("query_normative_conflict", {}),
+    ("query_ambiguous_actors", {}),
+    ("query_causality_chain", {}),
+    ("query_causality_chain", {"dano_uri": str(REC.Risco_de_Gentrificacao)}),
+    ("query_spatial_overlap", {"use_index": False}),
+    ("query_legal_breaches", {}),
+    ("query_institutional_fragmentation", {}),
+    ("query_benefit_damage_reversals", {}),
+    ("query_market_pressure_on_zeis", {}),
+    ("query_conflicting_jurisdictions", {"use_index": False}),
+    ("query_full_conflict_narrative", {}),
+]
+
+# Variáveis de ORDER BY: empates podem sair em outra ordem, o resto não
+ORDER = {
+    "query_institutional_fragmentation": ("tipo",),
+    "query_full_conflict_narrative": ("agente_label", "tipo_resultado"),
+}
+
+
+@pytest.fixture(scope="module")
+def edge_case_graph(inferred_graph):
+    """Base inferida com rótulos múltiplos, OPTIONALs sem par e ações sem instrumento."""
+    g = Graph()
+    g += inferred_graph
+    for resource in list(g.subjects(RDFS.label, None))[::3]:
+        g.add((resource, RDFS.label, Literal(f"{resource.split('#')[-1]} (en)", lang="en")))
+    g.add((REC.Agente_Extra, RDF.type, REC.AgenteUrbano))
+    g.add((REC.Agente_Extra, RDFS.label, Literal("Agente Extra")))
+    g.add((REC.Agente_Extra, REC.executaAcao, REC.Acao_Sem_Instrumento))
+    g.add((REC.Acao_Sem_Instrumento, RDF.type, REC.Acao_Impeditiva))
+    g.add((REC.Acao_Sem_Instrumento, RDFS.label, Literal("Ação sem instrumento")))
+    g.add((REC.Acao_Sem_Instrumento, REC.causa_direta, REC.Risco_de_Gentrificacao))
+    g.add((REC.Acao_Sem_Instrumento, REC.utilizaInstrumento, REC.Instrumento_Sem_Rotulo))
+    for a, b in [(REC.Espaco_A, REC.Espaco_B), (REC.Espaco_B, REC.Espaco_A), (REC.Espaco_A, REC.Espaco_C)]:
+        g.add((a, REC.coincideCom, b))
+    for orgao, espaco in [(REC.Orgao_1, REC.Espaco_A), (REC.Orgao_2, REC.Espaco_B), (REC.Orgao_3, REC.Espaco_C)]:
+        g.add((orgao, REC.exerceTutelaSobre, espaco))
+        g.add((orgao, RDFS.label, Literal(orgao.split('#')[-1])))
+        g.add((espaco, RDFS.label, Literal(espaco.split('#')[-1])))
+    g.add((REC.ZEIS_Vazia, RDF.type, REC.ZEIS))
+    g.add((REC.ZEIS_Vazia, RDFS.label, Literal("ZEIS sem pressão")))
+    return g
+
+
+class TestNativeEquivalence:
+    """Os planos nativos devem devolver exatamente as linhas das consultas SPARQL."""
+
+    @pytest.mark.parametrize("graph_name", ["inferred_graph", "edge_case_graph"])
+    @pytest.mark.parametrize("method, kwargs", QUERIES)
+    def test_samesorted_rows(self, request, graph_name, method, kwargs):
+        graph = request.getfixturevalue(graph_name)
+        expected = getattr(SPARQLQueryEngine(graph, cache_size=0), method)(**kwargs)
+        native = getattr(SPARQLQueryEngine(graph, cache_size=0, native=True), method)(**kwargs)
+        assert row_bag(native) == row_bag(expected)
+        keys = ORDER.get(method, ())
+        assert [tuple(r.get(k) for k in keys) for r in native] == [tuple(r.get(k) for k in keys) for r in expected]
+
+    def test_edge_cases_are_exercised(self, edge_case_graph):
+        engine = SPARQLQueryEngine(edge_case_graph, native=True)
+        narrative = engine.query_full_conflict_narrative()
+        sem_instrumento = [r for r in narrative if str(r['acao_label']) == "Ação sem instrumento"]
+        assert sem_instrumento and all('instrumento_label' not in r for r in sem_instrumento)
+        zeis = [r for r in engine.query_market_pressure_on_zeis() if str(r['zeis_label']) == "ZEIS sem pressão"]
+        assert zeis == [{'zeis_label': Literal("ZEIS sem pressão")}]
+        assert engine.query_spatial_overlap(use_index=False)
+        assert engine.query_conflicting_jurisdictions(use_index=False)
+
+
+class _CountingGraph(Graph):
+    """Grafo que conta as varreduras por padrão de tripla."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scans = Counter()
+
+    def triples(self, triple):
+        self.scans[triple] += 1
+        return super().triples(triple)
+
+
+class TestRunBatch:
+    """O lote deve devolver os mesmos resultados varrendo cada padrão uma só vez."""
+
+    def test_matches_individual_queries(self, edge_case_graph):
+        batch = SPARQLQueryEngine(edge_case_graph, cache_size=0).run_batch(
+            [(method, kwargs) for method, kwargs in QUERIES])
+        for (method, kwargs), rows in zip(QUERIES, batch):
+            expected = getattr(SPARQLQueryEngine(edge_case_graph, cache_size=0), method)(**kwargs)
+            assert row_bag(rows) == row_bag(expected), method
+
+    def test_each_pattern_scanned_once(self, inferred_graph):
+        g = _CountingGraph()
+        g += inferred_graph
+        engine = SPARQLQueryEngine(g, cache_size=0)
+        engine.run_batch(["normative_conflict", "ambiguous_actors", "causality_chain",
+                          "full_conflict_narrative", "legal_breaches"])
+        assert g.scans and max(g.scans.values()) == 1
+        assert g.scans[(None, REC.executaAcao, None)] == 1
+        # Fora do lote, o motor volta ao modo configurado
+        assert engine.native is False
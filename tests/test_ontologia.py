@@ -1,7 +1,7 @@
 # tests/test_ontologia.py
 import pytest
 import os
-from rdflib import Graph, Namespace, RDF, RDFS
+from rdflib import Namespace, RDF, RDFS
 import subprocess
 
 # Adiciona o diretório raiz ao path para encontrar os módulos em src
@@ -9,6 +9,7 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.build_knowledge_base import BASE_DIR
+from src.snapshot import load_graph
 from src.sparql_queries import SPARQLQueryEngine
 
 REC = Namespace("http://recife.leg.br/ontologia-conflito#")
@@ -31,9 +32,8 @@ def inferred_graph():
    
 
     # Passo 2: Carregar o grafo gerado
-    g = Graph()
     try:
-        g.parse(inferred_kb_path, format="turtle")
+        g = load_graph(inferred_kb_path)
     except FileNotFoundError:
         pytest.fail(f"O script de build não gerou o arquivo esperado: {inferred_kb_path}")
     
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.build_knowledge_base import REC
+from src.parallel_load import byte_ranges, parallel_load
+from src.sparql_queries import SPARQLQueryEngine
+from src.streaming import write_ntriples
+
+
+class TestParallelLoad:
+    """A carga em faixas paralelas deve produzir o mesmo grafo que o parse sequencial."""
+
+    def test_ranges_cover_file_on_line_boundaries(self, inferred_graph, tmp_path):
+        path = str(tmp_path / "kb.nt")
+        write_ntriples(inferred_graph, path)
+        ranges = byte_ranges(path, 7)
+        assert ranges[0][0] == 0 and ranges[-1][1] == os.path.getsize(path)
+        data = open(path, "rb").read()
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start and data[end - 1:end] == b"\n"
+
+    @pytest.mark.parametrize("name", ["kb.nt", "kb.nt.gz"])
+    def test_matches_sequential_parse(self, inferred_graph, tmp_path, name):
+        path = str(tmp_path / name)
+        write_ntriples(inferred_graph, path)
+        g = parallel_load(path, workers=3, chunk_bytes=4096)
+        assert len(g) == len(inferred_graph)
+        assert set(g) == set(inferred_graph)
+        assert set(g.triples((None, REC.conflitaCom, None))) == set(
+            inferred_graph.triples((None, REC.conflitaCom, None)))
+
+    def test_blank_nodes_shared_across_ranges(self, tmp_path):
+        """O mesmo rótulo em faixas diferentes resolve ao mesmo nó em branco."""
+        b = BNode()
+        expected = Graph()
+        for i in range(200):
+            expected.add((b, REC.temParte, URIRef(f"{REC}parte_{i}")))
+            expected.add((URIRef(f"{REC}parte_{i}"), REC.nota, Literal(f"linha\n{i} \"citada\"", lang="pt")))
+        path = str(tmp_path / "bnodes.nt")
+        write_ntriples(expected, path)
+        g = parallel_load(path, workers=4, chunk_bytes=1024)
+        assert isomorphic(g, expected)
+        assert len(set(g.subjects(REC.temParte))) == 1
+
+    def test_query_engine_from_ntriples(self, inferred_graph, tmp_path):
+        path = str(tmp_path / "kb.nt")
+        write_ntriples(inferred_graph, path)
+        engine = SPARQLQueryEngine.from_file(path)
+        assert engine.query_normative_conflict() == SPARQLQueryEngine(inferred_graph).query_normative_conflict()
@@ -0,0 +1,159 @@
+import os
+import sys
+
+import pytest
+from rdflib import Graph, Literal, RDFS
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import sparql_queries
+from src.build_knowledge_base import REC
+from src.reasoner import CompiledReasoner
+from src.sparql_queries import SPARQLQueryEngine
+
+
+class TestPreparedQueries:
+    """Consultas compiladas uma vez, com parâmetros passados como ligações."""
+
+    def test_queries_are_compiled_once(self, inferred_graph):
+        engine = SPARQLQueryEngine(inferred_graph)
+        first = engine.query_legal_breaches()
+        compiled = dict(sparql_queries._PREPARED)
+        assert engine.query_legal_breaches() == first
+        assert SPARQLQueryEngine(inferred_graph).query_legal_breaches() == first
+        assert sparql_queries._PREPARED == compiled
+
+    def test_damage_is_a_binding(self, inferred_graph):
+        engine = SPARQLQueryEngine(inferred_graph)
+        chain = engine.query_causality_chain(str(REC.Risco_de_Gentrificacao))
+        assert chain and all(str(row['dano_label']) == 'Risco de Gentrificação' for row in chain)
+        assert len(engine.query_causality_chain()) >= len(chain)
+        assert engine.query_causality_chain(str(REC.Dano_Inexistente)) == []
+        # Um "URI" com sintaxe SPARQL não altera a consulta
+        assert engine.query_causality_chain(f"{REC.Risco_de_Gentrificacao}> || true) #") == []
+
+
+class TestResultCache:
+    """Resultados repetidos vêm da memória até o grafo mudar."""
+
+    def test_hits_until_graph_changes(self, inferred_graph):
+        g = Graph()
+        g += inferred_graph
+        engine = SPARQLQueryEngine(g)
+        first = engine.query_normative_conflict()
+        first[0]['norma1_label'] = "alterado pelo chamador"
+        assert engine.query_normative_conflict() != first
+        assert engine.cache.stats()["hits"] == 1 and engine.cache.stats()["misses"] == 1
+
+        conflitos = list(g.triples((None, REC.conflitaCom, None)))
+        for t in conflitos:
+            g.remove(t)
+        assert engine.query_normative_conflict() == []
+        g.addN((s, p, o, g) for s, p, o in conflitos)
+        assert len(engine.query_normative_conflict()) == 1
+        assert engine.cache.stats()["misses"] == 3
+
+    def test_lru_eviction(self, inferred_graph):
+        engine = SPARQLQueryEngine(inferred_graph, cache_size=2)
+        engine.query_normative_conflict()
+        engine.query_legal_breaches()
+        engine.query_normative_conflict()
+        engine.query_causality_chain()
+        assert engine.cache.stats()["entries"] == 2
+        engine.query_normative_conflict()
+        engine.query_legal_breaches()
+        # query_legal_breaches foi despejada ao entrar query_causality_chain
+        stats = engine.cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 4, 2)
+
+    @pytest.mark.parametrize("native", [False, True])
+    def test_index_plans_are_cached(self, inferred_graph, native):
+        engine = SPARQLQueryEngine(inferred_graph, native=native)
+        for method in (engine.query_spatial_overlap, engine.query_conflicting_jurisdictions):
+            hits = engine.cache.stats()["hits"]
+            first = method()
+            assert method() == first
+            assert engine.cache.stats()["hits"] == hits + 1
+        # Sem o índice a chave é outra, mas as linhas são as mesmas
+        key = lambda row: sorted(row.items())
+        assert sorted(engine.query_spatial_overlap(use_index=False), key=key) == \
+            sorted(engine.query_spatial_overlap(), key=key)
+        assert engine.cache.stats()["entries"] == 3
+
+    def test_close_unsubscribes_from_store(self, inferred_graph):
+        dispatcher = inferred_graph.store.dispatcher
+        handlers = lambda: sum(len(lst) for lst in (dispatcher.get_map() or {}).values())
+        before = handlers()
+        with SPARQLQueryEngine(inferred_graph) as engine:
+            assert handlers() == before + 2
+            engine.query_normative_conflict()
+        assert handlers() == before
+        assert engine.cache.stats()["entries"] == 0
+
+    def test_sqlite_store_invalidates(self, inferred_graph, tmp_path):
+        from src.sqlite_store import open_kb
+        g = open_kb(str(tmp_path / "kb.sqlite"))
+        engine = SPARQLQueryEngine(g)
+        assert engine.query_normative_conflict() == []
+        g.addN((s, p, o, g) for s, p, o in inferred_graph)
+        assert len(engine.query_normative_conflict()) == 1
+
+
+class TestLateLabels:
+    """Estrutura resolvida só com URIs, com um rótulo preferido anexado no fim."""
+
+    def test_preferred_matches_single_label_kb(self, inferred_graph):
+        late = SPARQLQueryEngine(inferred_graph, labels="preferred")
+        full = SPARQLQueryEngine(inferred_graph)
+        for method in ("query_normative_conflict", "query_ambiguous_actors", "query_causality_chain",
+                       "query_legal_breaches", "query_institutional_fragmentation",
+                       "query_market_pressure_on_zeis"):
+            assert sorted(map(sorted, (r.items() for r in getattr(late, method)()))) == \
+                sorted(map(sorted, (r.items() for r in getattr(full, method)()))), method
+
+    def test_language_preference_and_sync(self, inferred_graph):
+        g = Graph()
+        g += inferred_graph
+        g.add((REC.Lei_do_PREZEIS_1995, RDFS.label, Literal("PREZEIS Law", lang="en")))
+        g.add((REC.Lei_do_PREZEIS_1995, RDFS.label, Literal("Lei do PREZEIS", lang="pt")))
+        assert len(SPARQLQueryEngine(g).query_normative_conflict()) == 3
+
+        engine = SPARQLQueryEngine(g, labels="preferred")
+        assert engine.query_normative_conflict() == [
+            {'norma1_label': Literal("Lei do PREZEIS", lang="pt"),
+             'norma2_label': Literal("Lei do Remembramento (2020)")}]
+        english = SPARQLQueryEngine(g, labels="preferred", label_languages=("en",))
+        assert english.query_normative_conflict()[0]['norma1_label'] == Literal("PREZEIS Law", lang="en")
+
+        g.remove((REC.Lei_do_PREZEIS_1995, RDFS.label, Literal("Lei do PREZEIS", lang="pt")))
+        assert engine.query_normative_conflict()[0]['norma1_label'] == Literal("Lei do PREZEIS (1995)")
+
+    def test_spatial_queries_on_collapsed_graph(self, asserted_graph):
+        """Com o fechamento de coincideCom colapsado, os planos tardios usam o índice de equivalência."""
+        g = Graph()
+        g += asserted_graph
+        # Segundo órgão com tutela sobre o grupo IEP/ZEPH/Recentro
+        g.add((REC.IPHAN, RDFS.label, Literal("IPHAN")))
+        g.add((REC.IPHAN, REC.exerceTutelaSobre, REC.IEP_Edificio_Caixa_Dagua))
+        CompiledReasoner(g, collapse_equivalences=True).expand()
+        full = SPARQLQueryEngine(g)
+        for labels in ("preferred", "none"):
+            late = SPARQLQueryEngine(g, labels=labels)
+            for method in ("query_spatial_overlap", "query_conflicting_jurisdictions"):
+                rows = getattr(late, method)()
+                assert len(rows) == len(getattr(full, method)()), (labels, method)
+                assert len(rows) > len(getattr(late, method)(use_index=False)), (labels, method)
+        late = SPARQLQueryEngine(g, labels="preferred")
+        for method in ("query_spatial_overlap", "query_conflicting_jurisdictions"):
+            assert sorted(map(sorted, (r.items() for r in getattr(late, method)()))) == \
+                sorted(map(sorted, (r.items() for r in getattr(full, method)()))), method
+
+    def test_uris_only(self, inferred_graph):
+        engine = SPARQLQueryEngine(inferred_graph, labels="none")
+        assert engine.query_normative_conflict() == [
+            {'norma1': REC.Lei_do_PREZEIS_1995, 'norma2': REC.Lei_do_Remembramento_2020}]
+        chain = engine.query_causality_chain(str(REC.Risco_de_Gentrificacao))
+        assert chain and all(row['dano'] == REC.Risco_de_Gentrificacao for row in chain)
+        assert engine._label_index is None
+        with pytest.raises(ValueError):
+            SPARQLQueryEngine(inferred_graph, labels="todos")
@@ -0,0 +1,295 @@
+import os
+import sys
+from collections import Counter
+
+import owlrl
+import pytest
+from rdflib import Graph, Literal, RDF, RDFS, OWL, XSD
+from rdflib.compare import isomorphic
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import sorted_rows
+from src import build_knowledge_base
+from src.build_knowledge_base import REC
+from src.profiling import RuleProfile
+from src.reasoner import (
+    CompiledReasoner, IncrementalReasoner, ParallelReasoner, UnsupportedConstructError, is_low_value,
+)
+from src.snapshot import is_fresh, load_graph, snapshot_path_for
+from src.sparql_queries import SPARQLQueryEngine
+from src.sqlite_store import open_kb
+from src.versioning import open_versioned
+
+NOVAS_TRIPLAS = [
+    (REC.Lei_Nova_2025, RDF.type, REC.LegislacaoUrbana),
+    (REC.Lei_Nova_2025, RDFS.label, Literal("Lei Nova (2025)")),
+    (REC.Lei_Nova_2025, REC.conflitaCom, REC.Lei_do_PREZEIS_1995),
+    (REC.ZEIS_Nova, REC.coincideCom, REC.IEP_Edificio_Caixa_Dagua),
+    (REC.ZEIS_Nova, REC.permiteRemembramento, Literal(True, datatype=XSD.boolean)),
+    (REC.ZEIS_Especial, RDF.type, OWL.Class),
+    (REC.ZEIS_Especial, RDFS.subClassOf, REC.ZEIS),
+    (REC.ZEIS_Nova, RDF.type, REC.ZEIS_Especial),
+]
+
+
+class _CountingGraph(Graph):
+    """Grafo que conta as varreduras por padrão de tripla."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scans = Counter()
+
+    def triples(self, triple):
+        self.scans[triple] += 1
+        return super().triples(triple)
+
+
+def _closure(triples):
+    g = Graph()
+    for t in triples:
+        g.add(t)
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+    return g
+
+
+class TestIncrementalReasoner:
+    """Compara a materialização incremental com o fechamento completo do owlrl."""
+
+    def test_incremental_matches_full_closure(self, asserted_graph):
+        """Grafo anterior + delta deve ser idêntico ao fechamento de (asserções + delta)."""
+        previous = _closure(asserted_graph)
+        IncrementalReasoner(previous).add(NOVAS_TRIPLAS)
+
+        full = _closure(list(asserted_graph) + NOVAS_TRIPLAS)
+        assert set(previous) == set(full)
+
+    def test_only_new_consequences_are_reported(self, asserted_graph):
+        """O delta retornado contém as conclusões novas e ignora triplas já presentes."""
+        previous = _closure(asserted_graph)
+        delta = IncrementalReasoner(previous).add(NOVAS_TRIPLAS[:3] + [
+            (REC.Lei_do_PREZEIS_1995, REC.conflitaCom, REC.Lei_do_Remembramento_2020),
+        ])
+
+        assert len(delta["asserted"]) == 3
+        assert (REC.Lei_do_PREZEIS_1995, REC.conflitaCom, REC.Lei_Nova_2025) in delta["inferred"]
+        assert (REC.Lei_Nova_2025, RDF.type, REC.Norma) in delta["inferred"]
+
+    def test_retraction_matches_full_closure(self, asserted_graph):
+        """Revogar uma lei remove só o que perdeu suporte: igual ao fechamento do restante."""
+        lei = REC.Lei_do_Remembramento_2020
+        revogadas = list(asserted_graph.triples((lei, None, None))) + \
+            list(asserted_graph.triples((None, None, lei)))
+        previous = _closure(asserted_graph)
+        result = IncrementalReasoner(previous, asserted=asserted_graph).retract(revogadas)
+
+        restante = [t for t in asserted_graph if t not in set(revogadas)]
+        assert set(previous) == set(_closure(restante))
+        assert (lei, RDF.type, REC.Norma) in result["removed"]
+
+    def test_retraction_keeps_triples_with_other_support(self, asserted_graph):
+        """Uma asserção redundante com a simetria continua entailed após ser retirada."""
+        g = _closure(asserted_graph)
+        reasoner = IncrementalReasoner(g, asserted=asserted_graph)
+        reasoner.add([(REC.Lei_Nova_2025, REC.conflitaCom, REC.Lei_do_PREZEIS_1995),
+                      (REC.Lei_do_PREZEIS_1995, REC.conflitaCom, REC.Lei_Nova_2025)])
+        result = reasoner.retract([(REC.Lei_do_PREZEIS_1995, REC.conflitaCom, REC.Lei_Nova_2025)])
+
+        assert (REC.Lei_do_PREZEIS_1995, REC.conflitaCom, REC.Lei_Nova_2025) in g
+        assert (REC.Lei_do_PREZEIS_1995, REC.conflitaCom, REC.Lei_Nova_2025) in result["rederived"]
+        assert not result["removed"]
+
+    def test_rederivation_uses_indexed_lookups(self, asserted_graph):
+        """A rederivação busca as premissas regra a regra, sem varrer tudo o que toca um termo."""
+        lei = REC.Lei_do_Remembramento_2020
+        revogadas = list(asserted_graph.triples((lei, None, None))) + \
+            list(asserted_graph.triples((None, None, lei)))
+        g = _CountingGraph()
+        g += asserted_graph
+        CompiledReasoner(g, lean=True).expand()
+        g.scans.clear()
+        result = IncrementalReasoner(g, asserted=asserted_graph, lean=True).retract(revogadas)
+
+        assert result["removed"] and result["rederived"]
+        assert not [pattern for pattern in g.scans if pattern[1] is None]
+        fresh = Graph()
+        fresh += [t for t in asserted_graph if t not in set(revogadas)]
+        CompiledReasoner(fresh, lean=True).expand()
+        assert set(g) == set(fresh)
+
+    def test_retraction_requires_asserted_set(self, asserted_graph):
+        with pytest.raises(ValueError):
+            IncrementalReasoner(Graph()).retract([])
+
+
+class TestCompiledReasoner:
+    """O motor compilado deve reproduzir exatamente o fechamento do owlrl."""
+
+    def test_matches_owlrl_on_kb(self, asserted_graph):
+        g = Graph()
+        for t in asserted_graph:
+            g.add(t)
+        CompiledReasoner(g).expand()
+        assert set(g) == set(_closure(asserted_graph))
+
+    def test_matches_owlrl_with_disjointness_violation(self, asserted_graph):
+        """Também as mensagens de erro de cax-dw devem coincidir."""
+        triples = list(asserted_graph) + NOVAS_TRIPLAS + [
+            (REC.Acao_Aplicar_PEUC, RDF.type, REC.Acao_Impeditiva),
+        ]
+        g = Graph()
+        for t in triples:
+            g.add(t)
+        reasoner = CompiledReasoner(g)
+        reasoner.expand()
+
+        assert len(reasoner.errors) == 1
+        assert isomorphic(g, _closure(triples))
+
+    def test_unsupported_construct_is_rejected(self, asserted_graph):
+        g = Graph()
+        for t in asserted_graph:
+            g.add(t)
+        g.add((REC.executaAcao, OWL.inverseOf, REC.executadaPor))
+        with pytest.raises(UnsupportedConstructError):
+            CompiledReasoner(g).expand()
+        assert len(g) == len(asserted_graph) + 1
+
+
+class TestParallelReasoner:
+    """A inferência particionada deve coincidir com o motor compilado serial."""
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_matches_compiled(self, asserted_graph, workers):
+        # Cadeia longa de coincideCom atravessando partições diferentes
+        cadeia = [(REC[f"Lote_{i}"], REC.coincideCom, REC[f"Lote_{i + 1}"]) for i in range(12)]
+        triples = list(asserted_graph) + NOVAS_TRIPLAS + cadeia
+
+        serial, parallel = Graph(), Graph()
+        for t in triples:
+            serial.add(t)
+            parallel.add(t)
+        CompiledReasoner(serial).expand()
+        reasoner = ParallelReasoner(parallel, workers=workers)
+        reasoner.expand()
+
+        assert set(parallel) == set(serial)
+        assert (REC.Lote_0, REC.coincideCom, REC.Lote_12) in parallel
+        assert reasoner.rounds > 2
+
+
+class TestRuleProfile:
+    """O perfil deve contabilizar exatamente as triplas inferidas."""
+
+    def test_incremental_profile_counts_new_triples(self, asserted_graph):
+        profile = RuleProfile()
+        reasoner = IncrementalReasoner(_closure(asserted_graph), profile=profile)
+        with profile.phase("incremental"):
+            delta = reasoner.add(NOVAS_TRIPLAS)
+
+        report = profile.as_dict()
+        assert sum(r["new"] for r in report["rules"].values()) == len(delta["inferred"])
+        assert all(r["fired"] == r["new"] + r["duplicate"] for r in report["rules"].values())
+        assert report["iterations"] == report["phases"]["incremental"]["iterations"] >= 2
+
+    def test_compiled_profile_phases(self, asserted_graph):
+        g = Graph()
+        for t in asserted_graph:
+            g.add(t)
+        profile = RuleProfile()
+        CompiledReasoner(g, profile=profile).expand()
+
+        report = profile.as_dict()
+        assert set(report["phases"]) == {"tbox", "instances", "eq-ref", "cax-dw"}
+        assert {"cax-sco", "prp-dom", "prp-symp", "prp-trp"} <= set(report["rules"])
+        assert report["rules"]["axiomatic"]["duplicate"] >= 0
+
+
+class TestLeanMode:
+    """O modo enxuto omite só entailments triviais, sem mudar o resultado das consultas."""
+
+    @staticmethod
+    def _expand(asserted_graph, **kwargs):
+        g = Graph()
+        for t in asserted_graph:
+            g.add(t)
+        CompiledReasoner(g, **kwargs).expand()
+        return g
+
+    def test_lean_closure_has_no_low_value_triples(self, asserted_graph):
+        full = self._expand(asserted_graph)
+        lean = self._expand(asserted_graph, lean=True)
+
+        assert set(lean) < set(full)
+        assert not any(is_low_value(t) for t in lean if t not in asserted_graph)
+        assert (XSD.string, RDF.type, RDFS.Datatype) not in lean
+        assert (REC.Prefeitura_do_Recife, RDF.type, REC.AgenteUrbano) in lean
+
+    def test_queries_unchanged(self, asserted_graph):
+        full = SPARQLQueryEngine(self._expand(asserted_graph))
+        lean = SPARQLQueryEngine(self._expand(asserted_graph, lean=True))
+        queries = [name for name in dir(SPARQLQueryEngine) if name.startswith("query_")]
+
+        assert len(queries) >= 10
+        for name in queries:
+            assert sorted_rows(getattr(lean, name)()) == sorted_rows(getattr(full, name)()), name
+
+    def test_incremental_lean(self, asserted_graph):
+        previous = self._expand(asserted_graph, lean=True)
+        delta = IncrementalReasoner(previous, lean=True).add(NOVAS_TRIPLAS)
+
+        assert delta["inferred"]
+        assert not any(is_low_value(t) for t in delta["inferred"])
+
+
+class TestRetractAssertions:
+    """Retirar asserções da base construída deve dar a mesma base que construí-la sem elas."""
+
+    VIOLACAO = (REC.Acao_Aplicar_PEUC, RDF.type, REC.Acao_Impeditiva)
+
+    @staticmethod
+    def _fresh(triples, **options):
+        g = Graph()
+        g += triples
+        CompiledReasoner(g, **options).expand()
+        return g
+
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(build_knowledge_base, "DATA_DIR", str(tmp_path))
+        monkeypatch.setattr(build_knowledge_base, "JUSTIFICATIONS_PATH", str(tmp_path / "justificativas.pkl"))
+        return tmp_path
+
+    def test_lean_turtle(self, asserted_graph, data_dir):
+        kb_path = str(data_dir / "kb.ttl")
+        kb = Graph()
+        kb += asserted_graph
+        kb.add(self.VIOLACAO)
+        kb.serialize(destination=kb_path, format="turtle")
+        output_path = build_knowledge_base.run_inference(kb_path, lean=True)
+
+        result = build_knowledge_base.retract_assertions([self.VIOLACAO], kb_path, lean=True)
+        assert result["errors"] == []
+        retracted = load_graph(output_path)
+        assert isomorphic(retracted, self._fresh(asserted_graph, lean=True))
+        assert is_fresh(snapshot_path_for(output_path), output_path)
+
+    def test_collapsed_sqlite_with_history(self, asserted_graph, data_dir):
+        kb_path = str(data_dir / "kb.sqlite")
+        kb = open_kb(kb_path)
+        kb.addN((s, p, o, kb) for s, p, o in asserted_graph)
+        kb.add(self.VIOLACAO)
+        kb.commit()
+        kb.close()
+        output_path = build_knowledge_base.run_inference(kb_path, lean=True, collapse_equivalences=True)
+        aresta = next(asserted_graph.triples((None, REC.coincideCom, None)))
+
+        history_path = str(data_dir / "historico.sqlite")
+        build_knowledge_base.retract_assertions([self.VIOLACAO, aresta], kb_path, lean=True,
+                                                collapse_equivalences=True, history_path=history_path,
+                                                revision_name="revogacao")
+        expected = self._fresh([t for t in asserted_graph if t != aresta], lean=True,
+                               collapse_equivalences=True)
+        assert isomorphic(open_kb(output_path, read_only=True), expected)
+        history = open_versioned(history_path, read_only=True)
+        assert isomorphic(history.revision_graph("revogacao"), expected)
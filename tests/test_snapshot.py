@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+from rdflib import Literal, RDF, URIRef, XSD
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.build_knowledge_base import REC
+from src.snapshot import SnapshotStore, is_fresh, load_graph, open_snapshot, snapshot_path_for, write_snapshot
+from src.sparql_queries import SPARQLQueryEngine
+
+
+@pytest.fixture
+def snapshot_files(tmp_path, inferred_graph):
+    ttl = str(tmp_path / "kb.ttl")
+    inferred_graph.serialize(destination=ttl, format="turtle")
+    return ttl, write_snapshot(inferred_graph, snapshot_path_for(ttl), source_path=ttl)
+
+
+class TestSnapshot:
+    """O snapshot deve reproduzir o grafo inferido e servir às consultas."""
+
+    def test_roundtrip(self, inferred_graph, snapshot_files):
+        g = open_snapshot(snapshot_files[1])
+        assert isinstance(g.store, SnapshotStore)
+        assert len(g) == len(inferred_graph)
+        assert set(g) == set(inferred_graph)
+        assert str(dict(g.namespaces())["rec"]) == str(REC)
+
+    @pytest.mark.parametrize("pattern", [
+        (None, REC.executaAcao, None),
+        (None, RDF.type, REC.ZEIS),
+        (REC.Prefeitura_do_Recife, None, None),
+        (None, None, REC.Lei_do_PREZEIS_1995),
+        (REC.Prefeitura_do_Recife, None, REC.AgenteUrbano),
+        (REC.Prefeitura_do_Recife, RDF.type, REC.AgenteUrbano),
+        (None, None, Literal(True, datatype=XSD.boolean)),
+        (REC.Inexistente, None, None),
+    ])
+    def test_pattern_lookups(self, inferred_graph, snapshot_files, pattern):
+        g = open_snapshot(snapshot_files[1])
+        assert set(g.triples(pattern)) == set(inferred_graph.triples(pattern))
+
+    def test_queries_match_turtle(self, inferred_graph, snapshot_files):
+        from_snapshot = SPARQLQueryEngine.from_file(snapshot_files[0])
+        from_turtle = SPARQLQueryEngine(inferred_graph)
+        assert isinstance(from_snapshot.graph.store, SnapshotStore)
+        for name in ("query_normative_conflict", "query_spatial_overlap", "query_full_conflict_narrative"):
+            assert sorted(map(str, getattr(from_snapshot, name)())) == sorted(map(str, getattr(from_turtle, name)()))
+
+    def test_stale_snapshot_falls_back_to_turtle(self, snapshot_files):
+        ttl, snap = snapshot_files
+        assert is_fresh(snap, ttl)
+        with open(ttl, "a", encoding="utf-8") as f:
+            f.write("\n<urn:x> <urn:y> <urn:z> .\n")
+        assert not is_fresh(snap, ttl)
+
+        g = load_graph(ttl)
+        assert not isinstance(g.store, SnapshotStore)
+        assert (URIRef("urn:x"), URIRef("urn:y"), URIRef("urn:z")) in g
+
+    def test_read_only(self, snapshot_files):
+        g = open_snapshot(snapshot_files[1])
+        with pytest.raises(TypeError):
+            g.add((REC.a, REC.b, REC.c))
@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+from rdflib import Graph, Literal, RDF
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import build_knowledge_base
+from src.build_knowledge_base import DATA_DIR, REC
+from src.sparql_queries import SPARQLQueryEngine
+from src.sqlite_store import SQLiteStore, open_kb
+from src.validators import OntologyValidator
+
+ASSERTED = os.path.join(DATA_DIR, 'kb_conflito_v5_final.ttl')
+
+
+@pytest.fixture
+def kb_path(tmp_path):
+    path = str(tmp_path / "kb.sqlite")
+    g = open_kb(path)
+    with g.store.batch():
+        g.parse(ASSERTED, format="turtle")
+    g.close()
+    return path
+
+
+class TestSQLiteStore:
+    """A base SQLite deve se comportar como o store em memória e persistir entre processos."""
+
+    def test_same_triples_after_reopen(self, kb_path):
+        expected = Graph()
+        expected.parse(ASSERTED, format="turtle")
+        g = open_kb(kb_path, read_only=True)
+        assert isinstance(g.store, SQLiteStore)
+        assert len(g) == len(expected)
+        assert set(g) == set(expected)
+        assert str(dict(g.namespaces())["rec"]) == str(REC)
+
+    @pytest.mark.parametrize("pattern", [
+        (None, REC.executaAcao, None),
+        (None, RDF.type, REC.ZEIS),
+        (REC.Prefeitura_do_Recife, None, None),
+        (None, None, REC.Categoria_ZEIS),
+        (REC.Prefeitura_do_Recife, RDF.type, None),
+        (None, None, Literal("nao existe")),
+    ])
+    def test_patterns(self, kb_path, pattern):
+        expected = Graph()
+        expected.parse(ASSERTED, format="turtle")
+        g = open_kb(kb_path, read_only=True)
+        assert set(g.triples(pattern)) == set(expected.triples(pattern))
+
+    def test_transactions(self, kb_path):
+        g = open_kb(kb_path)
+        before = len(g)
+        g.add((REC.Lei_X, RDF.type, REC.LegislacaoUrbana))
+        g.rollback()
+        assert len(g) == before
+        with pytest.raises(RuntimeError):
+            with g.store.batch():
+                g.remove((None, RDF.type, None))
+                raise RuntimeError
+        assert len(g) == before
+        with g.store.batch():
+            g.add((REC.Lei_X, RDF.type, REC.LegislacaoUrbana))
+        g.close()
+        assert (REC.Lei_X, RDF.type, REC.LegislacaoUrbana) in open_kb(kb_path, read_only=True)
+
+    def test_pipeline_on_sqlite(self, kb_path, inferred_graph, tmp_path, monkeypatch):
+        """run_inference expande a base SQLite; consultas e validador a abrem sem carga."""
+        monkeypatch.setattr(build_knowledge_base, "DATA_DIR", str(tmp_path))
+        output_path = build_knowledge_base.run_inference(kb_path)
+        assert output_path.endswith(".sqlite")
+        assert set(open_kb(output_path, read_only=True)) == set(inferred_graph)
+
+        engine = SPARQLQueryEngine.from_file(output_path)
+        expected = SPARQLQueryEngine(inferred_graph)
+        assert engine.query_normative_conflict() == expected.query_normative_conflict()
+        assert engine.query_causality_chain() == expected.query_causality_chain()
+        assert OntologyValidator.from_file(output_path).validate_instance_consistency().is_valid
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.query import HEAVY_MODULES, format_benchmark, startup_benchmark
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _fresh_modules(code):
+    """Módulos pesados importados ao executar `code` em um interpretador novo."""
+    probe = f"import sys\n{code}\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+class TestStartup:
+    """Consultar uma base pronta não deve importar o reasoner nem a visualização."""
+
+    def test_query_path_skips_heavy_modules(self):
+        code = ("from src.sparql_queries import SPARQLQueryEngine\n"
+                "engine = SPARQLQueryEngine.from_file('data/kb_conflito_v5_inferido.ttl')\n"
+                "assert engine.query_normative_conflict()")
+        assert _fresh_modules(code) == []
+
+    def test_build_and_visualization_imports_are_lazy(self):
+        assert _fresh_modules("import src.build_knowledge_base, visualize_ontology") == []
+
+    def test_benchmark(self, monkeypatch):
+        monkeypatch.chdir(ROOT)
+        results = startup_benchmark(runs=1)
+        assert results[0]["heavy"] == [] and results[0]["query"] > 0
+        assert "nenhum" in format_benchmark(results)
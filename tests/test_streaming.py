@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+from rdflib import BNode, Dataset, Graph, Literal, URIRef, XSD
+from rdflib.compare import isomorphic
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.build_knowledge_base import REC
+from src.streaming import iter_chunks, iter_statements, load_ntriples, write_ntriples
+
+
+class TestStreaming:
+    """Exportação linha a linha e importação em blocos de N-Triples/N-Quads."""
+
+    @pytest.mark.parametrize("name", ["kb.nt", "kb.nt.gz"])
+    def test_roundtrip(self, inferred_graph, tmp_path, name):
+        path = str(tmp_path / name)
+        assert write_ntriples(inferred_graph, path) == len(inferred_graph)
+        g = Graph()
+        assert load_ntriples(g, path, chunk_size=100) == len(inferred_graph)
+        assert set(g) == set(inferred_graph)
+
+    def test_chunks_are_bounded(self, inferred_graph, tmp_path):
+        path = str(tmp_path / "kb.nt.gz")
+        write_ntriples(inferred_graph, path)
+        sizes = [len(chunk) for chunk in iter_chunks(path, chunk_size=64)]
+        assert max(sizes) == 64
+        assert sum(sizes) == len(inferred_graph)
+
+    def test_literals_and_blank_nodes(self, tmp_path):
+        """Escapes, idiomas e nós em branco sobrevivem; o mesmo rótulo resolve ao mesmo nó entre blocos."""
+        b = BNode()
+        triples = [
+            (REC.Lei_X, REC.texto, Literal('Art. 1º "caput"\nparágrafo \\ único\r')),
+            (REC.Lei_X, REC.titulo, Literal("Lei do PREZEIS", lang="pt-BR")),
+            (REC.Lei_X, REC.ano, Literal("1995", datatype=XSD.integer)),
+            (REC.Lei_X, REC.autor, b),
+            (b, REC.nome, Literal("Câmara")),
+        ]
+        path = str(tmp_path / "lit.nt")
+        write_ntriples(triples, path)
+        chunks = list(iter_chunks(path, chunk_size=4))
+        assert [len(c) for c in chunks] == [4, 1]
+        assert chunks[0][3][2] == chunks[1][0][0]
+        expected = Graph()
+        for t in triples:
+            expected.add(t)
+        g = Graph()
+        load_ntriples(g, path, chunk_size=2)
+        assert isomorphic(g, expected)
+
+    def test_nquads(self, tmp_path):
+        g1, g2 = URIRef("urn:grafo:1"), URIRef("urn:grafo:2")
+        quads = [(REC.a, REC.p, REC.b, g1), (REC.b, REC.p, REC.c, g2), (REC.c, REC.p, REC.a, None)]
+        path = str(tmp_path / "kb.nq.gz")
+        write_ntriples(quads, path)
+        assert list(iter_statements(path)) == quads
+        ds = Dataset()
+        load_ntriples(ds, path)
+        assert set(ds.get_context(g2)) == {(REC.b, REC.p, REC.c)}
+        assert len(ds) == 3
@@ -0,0 +1,86 @@
+import os
+import random
+import sys
+
+import pytest
+from rdflib import Graph, RDF
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.build_knowledge_base import REC
+from src.sparql_queries import SPARQLQueryEngine
+from src.versioning import open_versioned, revision_uri
+
+
+class TestVersionedStore:
+    """Cada revisão deve ser reconstruída exatamente, a partir de deltas e checkpoints."""
+
+    def test_every_revision_is_reconstructed(self, inferred_graph, tmp_path):
+        store = open_versioned(str(tmp_path / "hist.sqlite"), checkpoint_interval=4)
+        rng = random.Random(7)
+        triples = sorted(inferred_graph)
+        current = set(triples[:600])
+        expected = {}
+        for i in range(12):
+            removed = set(rng.sample(sorted(current), 20))
+            added = set(rng.sample(triples, 30))
+            current = (current - removed) | added
+            expected[store.commit_revision(current, name=f"rev{i}")] = set(current)
+
+        history = store.revisions()
+        assert [r["checkpoint"] for r in history] == [True, False, False, False] * 3
+        for rev, content in expected.items():
+            g = store.revision_graph(rev)
+            assert g.identifier == revision_uri(rev)
+            assert set(g) == content
+        assert set(store.revision_graph("rev3")) == expected[store.resolve("rev3")]
+        assert set(Graph(store=store)) == current
+        # O histórico guarda deltas, não cópias completas
+        assert sum(r["added"] + r["removed"] for r in history[1:]) < 60 * len(history)
+
+    def test_branch_and_diff(self, tmp_path):
+        store = open_versioned(str(tmp_path / "hist.sqlite"))
+        base = store.commit_revision(added=[(REC.ZEIS_Coque, RDF.type, REC.ZEIS)], name="base")
+        lei = store.commit_revision(added=[(REC.Lei_X, RDF.type, REC.LegislacaoUrbana)], name="lei_x")
+        pl = store.commit_revision(added=[(REC.PL_Y, RDF.type, REC.ProjetoDeLei)],
+                                   removed=[(REC.ZEIS_Coque, RDF.type, REC.ZEIS)], parent=base)
+        assert store.head == pl
+        assert set(Graph(store=store)) == {(REC.PL_Y, RDF.type, REC.ProjetoDeLei)}
+        assert store.diff(pl) == {"added": [(REC.PL_Y, RDF.type, REC.ProjetoDeLei)],
+                                  "removed": [(REC.ZEIS_Coque, RDF.type, REC.ZEIS)]}
+        assert len(store.revision_graph(lei)) == 2
+        with pytest.raises(TypeError):
+            Graph(store=store).add((REC.a, REC.b, REC.c))
+        with pytest.raises(KeyError):
+            store.resolve("inexistente")
+
+    def test_query_engine_targets_revision(self, inferred_graph, tmp_path):
+        path = str(tmp_path / "hist.sqlite")
+        store = open_versioned(path)
+        antes = [t for t in inferred_graph if t[1] != REC.conflitaCom]
+        store.commit_revision(antes, name="antes_do_conflito")
+        store.commit_revision(inferred_graph, name="com_conflito")
+        store.close()
+
+        assert SPARQLQueryEngine.from_file(path, revision="antes_do_conflito").query_normative_conflict() == []
+        expected = SPARQLQueryEngine(inferred_graph).query_normative_conflict()
+        assert SPARQLQueryEngine.from_file(path, revision="com_conflito").query_normative_conflict() == expected
+        assert SPARQLQueryEngine.from_file(path).query_normative_conflict() == expected
+
+    def test_query_engine_closes_versioned_store(self, inferred_graph, tmp_path, monkeypatch):
+        from src import versioning
+        path = str(tmp_path / "hist.sqlite")
+        store = open_versioned(path)
+        store.commit_revision(inferred_graph, name="base")
+        store.close()
+
+        opened = []
+
+        def tracked(*args, **kwargs):
+            opened.append(open_versioned(*args, **kwargs))
+            return opened[-1]
+
+        monkeypatch.setattr(versioning, "open_versioned", tracked)
+        engine = SPARQLQueryEngine.from_file(path, revision="base")
+        assert [s._conn for s in opened] == [None]
+        assert engine.query_normative_conflict() == SPARQLQueryEngine(inferred_graph).query_normative_conflict()
@@ -3,19 +3,28 @@ Visualização Gráfica da Ontologia de Conflitos Urbanos
 Gera gráficos interativos e diagramas para apresentação
 """
 
-import networkx as nx
-import matplotlib
-matplotlib.use('Agg')  # Backend sem interface gráfica (para Windows)
-import matplotlib.pyplot as plt
 from rdflib import Graph, Namespace, RDF, RDFS, OWL
-from pyvis.network import Network
 import os
 
+from src.snapshot import load_graph
+
 REC = Namespace("http://recife.leg.br/ontologia-conflito#")
 
+# matplotlib, networkx e pyvis são importados por cada gráfico que os usa:
+# gerar uma única figura não deve carregar a pilha de visualização inteira
+
+def _pyplot():
+    """Importa o pyplot com backend sem interface gráfica."""
+    import matplotlib
+    matplotlib.use('Agg')  # Backend sem interface gráfica (para Windows)
+    import matplotlib.pyplot as plt
+    return plt
+
 def create_class_hierarchy_graph():
     """Cria visualização da hierarquia de classes"""
     print("Gerando gráfico de hierarquia de classes...")
+    import networkx as nx
+    plt = _pyplot()
     
     g = Graph()
     g.parse("data/ontologia_conflito_urbano_schema_v5.ttl", format="turtle")
@@ -49,9 +58,9 @@ def create_class_hierarchy_graph():
 def create_interactive_graph():
     """Cria grafo interativo HTML com pyvis"""
     print("Gerando grafo interativo...")
+    from pyvis.network import Network
     
-    g = Graph()
-    g.parse("data/kb_conflito_v5_inferido.ttl", format="turtle")
+    g = load_graph("data/kb_conflito_v5_inferido.ttl")
     
     net = Network(height="800px", width="100%", bgcolor="#222222", 
                   font_color="white", directed=True)
@@ -118,6 +127,7 @@ def create_interactive_graph():
 def create_statistics_chart():
     """Cria gráfico de estatísticas"""
     print("Gerando gráfico de estatísticas...")
+    plt = _pyplot()
     
     # Dados
     categories = ['Schema\n(Axiomas)', 'Instâncias\n(Casos)', 'Inferido\n(Total)']
@@ -154,6 +164,7 @@ def create_statistics_chart():
 def create_axioms_diagram():
     """Cria diagrama visual dos axiomas"""
     print("Gerando diagrama de axiomas...")
+    plt = _pyplot()
     
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
     fig.suptitle('Axiomas Formais da Ontologia', fontsize=16, fontweight='bold')
@@ -214,6 +225,7 @@ def create_axioms_diagram():
 def create_architecture_diagram():
     """Cria diagrama de arquitetura do sistema"""
     print("Gerando diagrama de arquitetura...")
+    plt = _pyplot()
     
     fig, ax = plt.subplots(figsize=(16, 10))
     ax.set_xlim(0, 10)